@@ -0,0 +1,374 @@
+"""Columnar monthly archive of flight prices and expired events.
+
+Each dataset is written to <ARCHIVE_DIR>/<dataset>/<YYYY-MM>.parquet
+(zstd) when pyarrow is installed, <YYYY-MM>.npz (compressed NumPy)
+otherwise. Exports are incremental: manifest.json keeps, per dataset,
+the newest timestamp already archived, and the next run only reads
+records past it, rewriting just the months they fall in.
+
+load() maps the partitions back into NumPy arrays without copying
+them through Python objects: Parquet files are memory-mapped by Arrow,
+NPZ columns are unpacked once into .npy files opened with mmap_mode.
+
+Run from backend/:
+    python -m app.analytics.archive export
+    python -m app.analytics.archive info
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+
+from app.config import settings
+from app.services.pocketbase import pb_client
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+logger = logging.getLogger(__name__)
+
+MANIFEST = "manifest.json"
+PAGE_SIZE = 500
+# Unpacked NPZ columns, opened with mmap_mode by load()
+MMAP_DIR = ".mmap"
+
+
+@dataclass(frozen=True)
+class Dataset:
+    """A PocketBase collection archived by month of `time_field`.
+
+    columns maps each archived field to its kind: "str", "float",
+    "bool", "datetime" or "list" (stored as a "|"-joined string).
+    Records newer than `lag` may still change and wait for a later run.
+    """
+
+    name: str
+    collection: str
+    time_field: str
+    columns: dict[str, str]
+    lag: timedelta
+    filter_str: str = ""
+
+
+DATASETS = {
+    "flight_prices": Dataset(
+        name="flight_prices",
+        collection="flight_prices",
+        time_field="crawled_at",
+        columns={
+            "route": "str",
+            "origin": "str",
+            "destination": "str",
+            "departure_date": "datetime",
+            "return_date": "datetime",
+            "price": "float",
+            "currency": "str",
+            "airline": "str",
+            "is_direct": "bool",
+            "crawled_at": "datetime",
+        },
+        lag=timedelta(hours=1),
+    ),
+    "events": Dataset(
+        name="events",
+        collection="events",
+        time_field="date_start",
+        columns={
+            "id": "str",
+            "title": "str",
+            "source_name": "str",
+            "location_city": "str",
+            "date_start": "datetime",
+            "price_min": "float",
+            "price_max": "float",
+            "interest_score": "float",
+            "tags_type": "list",
+            "status": "str",
+        },
+        # Past events are expired by the next crawl, at most a day later
+        lag=timedelta(days=2),
+        filter_str='status = "expired"',
+    ),
+}
+
+
+def _archive_dir(directory: str | Path | None) -> Path:
+    return Path(directory or settings.archive_dir)
+
+
+def _load_manifest(root: Path) -> dict:
+    try:
+        return json.loads((root / MANIFEST).read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _save_manifest(root: Path, manifest: dict) -> None:
+    tmp = root / f"{MANIFEST}.tmp"
+    tmp.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    os.replace(tmp, root / MANIFEST)
+
+
+def _datetime(value) -> str:
+    """PocketBase date string → NumPy datetime64 literal ("NaT" if blank)."""
+    value = str(value or "")
+    return value[:19].replace(" ", "T") if value else "NaT"
+
+
+def _column(values: list, kind: str) -> np.ndarray:
+    if kind == "datetime":
+        return np.array([_datetime(v) for v in values], dtype="datetime64[s]")
+    if kind == "float":
+        return np.array(
+            [float(v) if v not in (None, "") else np.nan for v in values],
+            dtype=np.float64,
+        )
+    if kind == "bool":
+        return np.array([bool(v) for v in values], dtype=bool)
+    if kind == "list":
+        values = ["|".join(v or []) for v in values]
+    return np.array([str(v or "") for v in values], dtype=str)
+
+
+def to_columns(dataset: Dataset, records: list[dict]) -> dict[str, np.ndarray]:
+    """Turn PocketBase records into one NumPy array per archived field."""
+    return {
+        name: _column([r.get(name) for r in records], kind)
+        for name, kind in dataset.columns.items()
+    }
+
+
+def _partitions(folder: Path) -> dict[str, Path]:
+    """Month → partition file (Parquet preferred if a month has both)."""
+    found: dict[str, Path] = {}
+    for suffix in (".npz", ".parquet"):
+        for path in folder.glob(f"*{suffix}"):
+            found[path.stem] = path
+    return dict(sorted(found.items()))
+
+
+def _read_parquet(path: Path) -> dict[str, np.ndarray]:
+    table = pq.read_table(pa.memory_map(str(path)))
+    columns = {}
+    for name in table.column_names:
+        column = table.column(name)
+        if pa.types.is_string(column.type) or pa.types.is_large_string(column.type):
+            columns[name] = np.array(column.to_pylist(), dtype=str)
+        else:
+            columns[name] = column.to_numpy()
+    return columns
+
+
+def _read_npz(path: Path, mmap: bool) -> dict[str, np.ndarray]:
+    if not mmap:
+        with np.load(path) as data:
+            return {name: data[name] for name in data.files}
+
+    # Compressed members can't be mapped: unpack each column once per
+    # partition version and map the .npy files from then on
+    unpacked = path.parent / MMAP_DIR / path.stem
+    stamp = unpacked / ".source_mtime"
+    mtime = str(path.stat().st_mtime_ns)
+    if not stamp.exists() or stamp.read_text() != mtime:
+        unpacked.mkdir(parents=True, exist_ok=True)
+        with np.load(path) as data:
+            for name in data.files:
+                np.save(unpacked / f"{name}.npy", data[name])
+        stamp.write_text(mtime)
+    return {
+        p.stem: np.load(p, mmap_mode="r") for p in sorted(unpacked.glob("*.npy"))
+    }
+
+
+def _read_partition(path: Path, mmap: bool = False) -> dict[str, np.ndarray]:
+    if path.suffix == ".parquet":
+        if pq is None:
+            raise RuntimeError(f"pyarrow is required to read {path}")
+        return _read_parquet(path)
+    return _read_npz(path, mmap)
+
+
+def _write_partition(folder: Path, month: str, columns: dict[str, np.ndarray]) -> Path:
+    """Append columns to a month's partition (rewritten atomically)."""
+    existing = _partitions(folder).get(month)
+    if existing is not None:
+        old = _read_partition(existing)
+        columns = {
+            name: np.concatenate([old[name], values]) if name in old else values
+            for name, values in columns.items()
+        }
+
+    # Keep the format a month was first written in; new months follow pyarrow
+    use_parquet = pq is not None and (existing is None or existing.suffix == ".parquet")
+    path = folder / f"{month}.{'parquet' if use_parquet else 'npz'}"
+    tmp = path.with_name(f".{path.name}.tmp")
+    if use_parquet:
+        table = pa.table(
+            {
+                name: pa.array(values.tolist(), pa.string())
+                if values.dtype.kind == "U"
+                else pa.array(values)
+                for name, values in columns.items()
+            }
+        )
+        pq.write_table(table, tmp, compression="zstd")
+    else:
+        with open(tmp, "wb") as f:
+            np.savez_compressed(f, **columns)
+    os.replace(tmp, path)
+    return path
+
+
+async def export_dataset(
+    dataset: Dataset, directory: str | Path | None = None
+) -> int:
+    """Append the dataset's records newer than its watermark. Returns count."""
+    root = _archive_dir(directory)
+    folder = root / dataset.name
+    folder.mkdir(parents=True, exist_ok=True)
+    manifest = _load_manifest(root)
+    state = manifest.setdefault(dataset.name, {})
+
+    upper = (datetime.now() - dataset.lag).isoformat()
+    filters = [f'{dataset.time_field} < "{upper}"']
+    if dataset.filter_str:
+        filters.append(dataset.filter_str)
+
+    exported = 0
+    month = ""
+    pending: list[dict] = []
+
+    def flush() -> None:
+        nonlocal exported, pending
+        if not pending:
+            return
+        _write_partition(folder, month, to_columns(dataset, pending))
+        exported += len(pending)
+        # Records come in (time, id) order: everything up to here is archived
+        state["watermark"] = pending[-1][dataset.time_field]
+        state["watermark_id"] = pending[-1]["id"]
+        state["rows"] = state.get("rows", 0) + len(pending)
+        state["updated_at"] = datetime.now().isoformat()
+        _save_manifest(root, manifest)
+        pending = []
+
+    # Keyset pagination on (time, id): records sharing the last archived
+    # timestamp, across pages or runs, are neither skipped nor repeated
+    cursor = (state.get("watermark", ""), state.get("watermark_id", ""))
+    while True:
+        after = []
+        if cursor[0]:
+            after.append(
+                f'({dataset.time_field} > "{cursor[0]}" || '
+                f'({dataset.time_field} = "{cursor[0]}" && id > "{cursor[1]}"))'
+            )
+        result = await pb_client.list_records(
+            dataset.collection,
+            page=1,
+            per_page=PAGE_SIZE,
+            sort=f"{dataset.time_field},id",
+            filter_str=" && ".join(filters + after),
+            skip_total=True,
+        )
+        items = result.get("items", [])
+        for record in items:
+            record_month = str(record.get(dataset.time_field, ""))[:7]
+            if not record_month:
+                continue
+            if record_month != month:
+                flush()
+                month = record_month
+            pending.append(record)
+        if len(items) < PAGE_SIZE:
+            break
+        cursor = (items[-1][dataset.time_field], items[-1]["id"])
+    flush()
+
+    logger.info("Archived %d %s records", exported, dataset.name)
+    return exported
+
+
+async def export_all(directory: str | Path | None = None) -> dict[str, int]:
+    return {
+        name: await export_dataset(dataset, directory)
+        for name, dataset in DATASETS.items()
+    }
+
+
+def load(
+    dataset: str,
+    months: Iterable[str] | None = None,
+    directory: str | Path | None = None,
+) -> dict[str, np.ndarray]:
+    """Archived columns of a dataset, optionally limited to some YYYY-MM months.
+
+    A single partition is returned as memory-mapped arrays; several are
+    concatenated into one array per column.
+    """
+    spec = DATASETS[dataset]
+    folder = _archive_dir(directory) / dataset
+    partitions = _partitions(folder) if folder.exists() else {}
+    if months is not None:
+        wanted = set(months)
+        partitions = {m: p for m, p in partitions.items() if m in wanted}
+
+    parts = [_read_partition(path, mmap=True) for path in partitions.values()]
+    if not parts:
+        return to_columns(spec, [])
+    if len(parts) == 1:
+        return parts[0]
+    return {
+        name: np.concatenate([part[name] for part in parts])
+        for name in spec.columns
+    }
+
+
+def info(directory: str | Path | None = None) -> dict:
+    """Partitions, sizes and watermarks of the archive."""
+    root = _archive_dir(directory)
+    manifest = _load_manifest(root)
+    summary = {}
+    for name in DATASETS:
+        folder = root / name
+        partitions = _partitions(folder) if folder.exists() else {}
+        summary[name] = {
+            "watermark": manifest.get(name, {}).get("watermark", ""),
+            "rows": manifest.get(name, {}).get("rows", 0),
+            "months": {m: p.stat().st_size for m, p in partitions.items()},
+        }
+    return summary
+
+
+async def _export(directory: str | None) -> None:
+    await pb_client.connect()
+    counts = await export_all(directory)
+    for name, count in counts.items():
+        print(f"{name}: {count} new records")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.analytics.archive")
+    parser.add_argument("command", choices=["export", "info"])
+    parser.add_argument("--dir", default=None, help="archive directory")
+    args = parser.parse_args(argv)
+
+    if args.command == "export":
+        asyncio.run(_export(args.dir))
+    else:
+        print(json.dumps(info(args.dir), indent=2))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
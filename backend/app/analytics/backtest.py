@@ -0,0 +1,325 @@
+"""Replay the flight_prices history through the deal engines.
+
+Every recorded price is scored as it would have been on its crawl day,
+using only the prices known by then, for each combination of the given
+thresholds:
+
+- "mean" (detect_deal): average of the route's last WINDOW_DAYS of
+  prices, at least min_history prices, discount >= threshold percent.
+  Rolling windows come from per-route daily cumulative sums.
+- "numpy" (deal_engine): PriceBaselines rebuilt on the history up to
+  each crawl day, then robust z-score / percentile rank thresholds.
+
+A flagged price counts as a good call when, in hindsight, it sits in the
+cheapest `hindsight` percent of all prices of its route and
+days-to-departure bucket. Alerts are counted once per route and crawl
+day, as the crawler sends one deal per route per run.
+
+Run from backend/:
+    python -m app.analytics.backtest --engine mean --threshold 20 30 40
+    python -m app.analytics.backtest --engine numpy --zscore 1.5 2 2.5
+"""
+
+import argparse
+import asyncio
+import itertools
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from app.analytics import archive
+from app.config import settings
+from app.services.deal_engine import PriceBaselines
+from app.services.price_stats import WINDOW_DAYS
+
+# Default share of the cheapest prices that count as real deals in hindsight
+HINDSIGHT_PERCENTILE = 20.0
+
+
+@dataclass
+class History:
+    """Valid flight prices in crawl order, as NumPy arrays."""
+
+    routes: np.ndarray
+    prices: np.ndarray
+    crawled_at: np.ndarray  # datetime64[s]
+    crawl_day: np.ndarray  # datetime64[D]
+    days_to_departure: np.ndarray
+
+    @classmethod
+    def from_columns(cls, columns: dict[str, np.ndarray]) -> "History":
+        crawled_at = np.asarray(columns["crawled_at"]).astype("datetime64[s]")
+        departure = np.asarray(columns["departure_date"]).astype("datetime64[D]")
+        prices = np.asarray(columns["price"], dtype=float)
+        valid = ~np.isnat(crawled_at) & ~np.isnat(departure) & (prices > 0)
+        order = np.argsort(crawled_at[valid], kind="stable")
+
+        crawled_at = crawled_at[valid][order]
+        crawl_day = crawled_at.astype("datetime64[D]")
+        return cls(
+            routes=np.asarray(columns["route"], dtype=str)[valid][order],
+            prices=prices[valid][order],
+            crawled_at=crawled_at,
+            crawl_day=crawl_day,
+            days_to_departure=(departure[valid][order] - crawl_day).astype(int),
+        )
+
+    def __len__(self) -> int:
+        return len(self.prices)
+
+    @property
+    def weeks(self) -> float:
+        if not len(self):
+            return 0.0
+        span = (self.crawl_day[-1] - self.crawl_day[0]).astype(int) + 1
+        return max(span / 7, 1.0)
+
+
+@dataclass
+class BacktestResult:
+    engine: str
+    params: dict[str, float]
+    flagged: int  # prices flagged as deals
+    alerts: int  # distinct (route, crawl day) deals
+    alerts_per_week: float
+    precision: float | None  # flagged prices that were good in hindsight
+    recall: float | None  # good-in-hindsight prices that were flagged
+    runtime_seconds: float
+
+
+def hindsight_labels(
+    history: History, percentile: float = HINDSIGHT_PERCENTILE
+) -> np.ndarray:
+    """Prices in the cheapest `percentile`% of their group over all time."""
+    if not len(history):
+        return np.zeros(0, dtype=bool)
+    full = PriceBaselines(history.routes, history.days_to_departure, history.prices)
+    scores = full.score(
+        history.routes,
+        history.days_to_departure,
+        history.prices,
+        zscore_threshold=np.inf,
+        percentile_threshold=percentile,
+        min_samples=1,
+    )
+    return np.array([s.is_deal for s in scores], dtype=bool)
+
+
+def mean_engine_signals(history: History) -> tuple[np.ndarray, np.ndarray]:
+    """(count, average) of each price's route window, as detect_deal sees it.
+
+    The window covers the crawl day and the WINDOW_DAYS before it, and
+    includes the prices of the crawl itself (they are stored first).
+    """
+    if not len(history):
+        return np.zeros(0, dtype=int), np.zeros(0)
+    route_names, route_idx = np.unique(history.routes, return_inverse=True)
+    day = (history.crawl_day - history.crawl_day.min()).astype(int)
+    shape = (len(route_names), day.max() + 2)
+
+    # Column k of the cumulative grids holds the totals of days < k
+    counts = np.zeros(shape)
+    sums = np.zeros(shape)
+    np.add.at(counts, (route_idx, day + 1), 1)
+    np.add.at(sums, (route_idx, day + 1), history.prices)
+    counts = np.cumsum(counts, axis=1)
+    sums = np.cumsum(sums, axis=1)
+
+    lo = np.maximum(day - WINDOW_DAYS, 0)
+    count = counts[route_idx, day + 1] - counts[route_idx, lo]
+    total = sums[route_idx, day + 1] - sums[route_idx, lo]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return count.astype(int), np.where(count > 0, total / count, np.nan)
+
+
+def numpy_engine_signals(
+    history: History, min_samples: int
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(zscore, percentile rank, discount) of each price, NaN without baseline.
+
+    Baselines are rebuilt at the end of every crawl day from the prices
+    crawled up to then, as evaluate_deals sees them after storing a crawl.
+    """
+    n = len(history)
+    zscore, rank, discount = np.full(n, np.nan), np.full(n, np.nan), np.full(n, np.nan)
+    days, starts = np.unique(history.crawl_day, return_index=True)
+    ends = np.append(starts[1:], n)
+    for start, end in zip(starts, ends):
+        baselines = PriceBaselines(
+            history.routes[:end],
+            history.days_to_departure[:end],
+            history.prices[:end],
+        )
+        scores = baselines.score(
+            history.routes[start:end],
+            history.days_to_departure[start:end],
+            history.prices[start:end],
+            zscore_threshold=np.inf,
+            percentile_threshold=0.0,
+            min_samples=min_samples,
+        )
+        for i, score in enumerate(scores, start=start):
+            if score.baseline is not None:
+                zscore[i] = score.zscore
+                rank[i] = score.percentile_rank
+                discount[i] = score.discount_percent
+    return zscore, rank, discount
+
+
+def _summarize(
+    history: History,
+    labels: np.ndarray,
+    flagged: np.ndarray,
+    engine: str,
+    params: dict[str, float],
+    runtime: float,
+) -> BacktestResult:
+    alerts = len(
+        set(zip(history.routes[flagged].tolist(), history.crawl_day[flagged].tolist()))
+    )
+    weeks = history.weeks
+    return BacktestResult(
+        engine=engine,
+        params=params,
+        flagged=int(flagged.sum()),
+        alerts=alerts,
+        alerts_per_week=alerts / weeks if weeks else 0.0,
+        precision=float(labels[flagged].mean()) if flagged.any() else None,
+        recall=float(flagged[labels].mean()) if labels.any() else None,
+        runtime_seconds=runtime,
+    )
+
+
+def backtest_mean(
+    history: History,
+    labels: np.ndarray,
+    thresholds: list[float],
+    min_histories: list[int],
+) -> list[BacktestResult]:
+    start = time.perf_counter()
+    count, average = mean_engine_signals(history)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        discount = (average - history.prices) / average * 100
+    replay = time.perf_counter() - start
+
+    results = []
+    for threshold, min_history in itertools.product(thresholds, min_histories):
+        start = time.perf_counter()
+        flagged = (count >= min_history) & (average > 0) & (discount >= threshold)
+        results.append(
+            _summarize(
+                history,
+                labels,
+                flagged,
+                "mean",
+                {"threshold_percent": threshold, "min_history": min_history},
+                replay + time.perf_counter() - start,
+            )
+        )
+    return results
+
+
+def backtest_numpy(
+    history: History,
+    labels: np.ndarray,
+    zscores: list[float],
+    percentiles: list[float],
+    min_histories: list[int],
+) -> list[BacktestResult]:
+    results = []
+    for min_history in min_histories:
+        start = time.perf_counter()
+        zscore, rank, discount = numpy_engine_signals(history, min_history)
+        replay = time.perf_counter() - start
+        for z, percentile in itertools.product(zscores, percentiles):
+            start = time.perf_counter()
+            with np.errstate(invalid="ignore"):
+                flagged = (zscore <= -z) | ((rank <= percentile) & (discount > 0))
+            results.append(
+                _summarize(
+                    history,
+                    labels,
+                    flagged,
+                    "numpy",
+                    {"zscore": z, "percentile": percentile, "min_history": min_history},
+                    replay + time.perf_counter() - start,
+                )
+            )
+    return results
+
+
+async def _load_history(source: str, months: list[str] | None) -> History:
+    if source == "archive":
+        return History.from_columns(archive.load("flight_prices", months=months))
+
+    from app.services.flight_deals import load_price_history
+    from app.services.pocketbase import pb_client
+
+    await pb_client.connect()
+    records = await load_price_history()
+    if months:
+        records = [r for r in records if str(r.get("crawled_at", ""))[:7] in months]
+    return History.from_columns(
+        archive.to_columns(archive.DATASETS["flight_prices"], records)
+    )
+
+
+def _format(result: BacktestResult) -> str:
+    params = " ".join(f"{k}={v:g}" for k, v in result.params.items())
+    precision = "-" if result.precision is None else f"{result.precision:.0%}"
+    recall = "-" if result.recall is None else f"{result.recall:.0%}"
+    return (
+        f"{result.engine:6} {params:44} {result.flagged:8d} {result.alerts:7d} "
+        f"{result.alerts_per_week:8.1f} {precision:>9} {recall:>7} "
+        f"{result.runtime_seconds * 1e3:9.1f} ms"
+    )
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.analytics.backtest")
+    parser.add_argument("--engine", choices=["mean", "numpy", "both"], default="both")
+    parser.add_argument("--source", choices=["archive", "pocketbase"], default="archive")
+    parser.add_argument("--months", nargs="*", help="YYYY-MM months to replay")
+    parser.add_argument(
+        "--threshold", nargs="+", type=float,
+        default=[settings.flight_deal_threshold_percent],
+    )
+    parser.add_argument(
+        "--min-history", nargs="+", type=int,
+        default=[settings.flight_deal_min_history_days],
+    )
+    parser.add_argument(
+        "--zscore", nargs="+", type=float, default=[settings.flight_deal_zscore]
+    )
+    parser.add_argument(
+        "--percentile", nargs="+", type=float,
+        default=[settings.flight_deal_percentile],
+    )
+    parser.add_argument("--hindsight", type=float, default=HINDSIGHT_PERCENTILE)
+    args = parser.parse_args(argv)
+
+    history = asyncio.run(_load_history(args.source, args.months))
+    print(f"{len(history)} prices over {history.weeks:.1f} weeks")
+    if not len(history):
+        return
+    labels = hindsight_labels(history, args.hindsight)
+
+    results = []
+    if args.engine in ("mean", "both"):
+        results += backtest_mean(history, labels, args.threshold, args.min_history)
+    if args.engine in ("numpy", "both"):
+        results += backtest_numpy(
+            history, labels, args.zscore, args.percentile, args.min_history
+        )
+
+    print(
+        f"{'engine':6} {'params':44} {'flagged':>8} {'alerts':>7} "
+        f"{'per week':>8} {'precision':>9} {'recall':>7} {'runtime':>12}"
+    )
+    for result in results:
+        print(_format(result))
+
+
+if __name__ == "__main__":
+    main()
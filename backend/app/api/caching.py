@@ -0,0 +1,58 @@
+import hashlib
+from datetime import datetime
+
+from fastapi import Request, Response
+
+from app.config import settings
+from app.services import data_version
+
+# Read endpoints whose responses only change with the data version
+CACHED_PREFIXES = ("/api/events", "/api/dashboard")
+
+
+def compute_etag(request: Request) -> str:
+    """Weak ETag for a read request at the current data version.
+
+    The day is part of the tag because date-window endpoints (today, week,
+    ...) change at midnight without any write.
+    """
+    target = f"{request.url.path}?{request.url.query}"
+    url_hash = hashlib.sha1(target.encode()).hexdigest()[:12]
+    day = datetime.now().strftime("%Y%m%d")
+    return f'W/"{data_version.BOOT_ID}-{data_version.current()}-{day}-{url_hash}"'
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison: ignore W/ prefixes on both sides
+    opaque = etag.removeprefix("W/")
+    return any(
+        tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(",")
+    )
+
+
+def _cache_headers(etag: str) -> dict[str, str]:
+    return {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={settings.api_cache_max_age}, must-revalidate",
+    }
+
+
+async def etag_middleware(request: Request, call_next):
+    """Answer unchanged GETs with 304 before running the endpoint."""
+    if request.method != "GET" or not request.url.path.startswith(CACHED_PREFIXES):
+        return await call_next(request)
+
+    # Read the version before the handler runs: a write racing with it
+    # can only make the tag stale (extra 200), never serve stale data.
+    etag = compute_etag(request)
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=_cache_headers(etag))
+
+    response = await call_next(request)
+    if response.status_code == 200:
+        response.headers.update(_cache_headers(etag))
+    return response
@@ -1,46 +1,58 @@
 import asyncio
-import uuid
-from datetime import datetime
-
-from fastapi import APIRouter
-
-from app.models.schemas import CrawlLogRead, CrawlStatusResponse, CrawlTriggerResponse
+import json
+import time
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+from app.models.schemas import (
+    CrawlJobRead,
+    CrawlLogRead,
+    CrawlStatusResponse,
+    CrawlTriggerResponse,
+)
+from app.services import crawl_jobs
 from app.services.pocketbase import pb_client
 
 router = APIRouter()
 
-# In-memory crawl state (simple approach for single-instance)
-_crawl_state = {
-    "is_running": False,
-    "last_run": None,
-    "last_status": None,
-}
-
+# How often the progress stream re-reads the job, and sends a keep-alive
+# comment when nothing changed
+STREAM_POLL_SECONDS = 1.0
+STREAM_HEARTBEAT_SECONDS = 15.0
+
+
+def _job_read(record: dict) -> CrawlJobRead:
+    return CrawlJobRead(
+        id=record["id"],
+        trigger=record.get("trigger") or "",
+        status=record.get("status", ""),
+        sources=record.get("sources"),
+        created_at=record.get("created_at"),
+        started_at=record.get("started_at") or None,
+        finished_at=record.get("finished_at") or None,
+        error_message=record.get("error_message") or "",
+        cancel_requested=bool(record.get("cancel_requested")),
+        progress=record.get("progress") or None,
+    )
 
-async def _run_crawl_background():
-    """Run crawl pipeline in background and update state."""
-    from app.scheduler.jobs import run_crawl_pipeline
 
+async def _get_job(job_id: str) -> dict:
     try:
-        await run_crawl_pipeline()
-        _crawl_state["last_run"] = datetime.now()
-        _crawl_state["last_status"] = "success"
+        return await crawl_jobs.get_job(job_id)
     except Exception:
-        _crawl_state["last_status"] = "error"
-    finally:
-        _crawl_state["is_running"] = False
+        raise HTTPException(status_code=404, detail="Crawl job not found")
 
 
 @router.post("/trigger", response_model=CrawlTriggerResponse)
 async def trigger_crawl():
-    if _crawl_state["is_running"]:
-        return CrawlTriggerResponse(message="Crawl already in progress")
-
-    job_id = str(uuid.uuid4())[:8]
-    _crawl_state["is_running"] = True
-    asyncio.create_task(_run_crawl_background())
-
-    return CrawlTriggerResponse(message="Crawl started", job_id=job_id)
+    """Queue a crawl for the worker process."""
+    job, created = await crawl_jobs.enqueue(trigger="api")
+    if not created:
+        return CrawlTriggerResponse(
+            message="Crawl already in progress", job_id=job["id"]
+        )
+    return CrawlTriggerResponse(message="Crawl queued", job_id=job["id"])
 
 
 @router.post("/dedup")
@@ -61,10 +73,14 @@ async def trigger_url_check():
 
 @router.get("/status", response_model=CrawlStatusResponse)
 async def crawl_status():
+    active = await crawl_jobs.active_job()
+    last = await crawl_jobs.latest_job(finished=True)
     return CrawlStatusResponse(
-        is_running=_crawl_state["is_running"],
-        last_run=_crawl_state["last_run"],
-        last_status=_crawl_state["last_status"],
+        is_running=active is not None,
+        last_run=(last.get("finished_at") or None) if last else None,
+        last_status=last.get("status") if last else None,
+        job_id=active["id"] if active else None,
+        job_status=active.get("status") if active else None,
     )
 
 
@@ -87,3 +103,50 @@ async def crawl_logs():
         )
         for r in items
     ]
+
+
+@router.get("/jobs/{job_id}", response_model=CrawlJobRead)
+async def crawl_job(job_id: str):
+    return _job_read(await _get_job(job_id))
+
+
+@router.post("/jobs/{job_id}/cancel", response_model=CrawlJobRead)
+async def cancel_crawl_job(job_id: str):
+    """Stop a job: at once if queued, at the worker's next checkpoint if running."""
+    await _get_job(job_id)
+    return _job_read(await crawl_jobs.request_cancel(job_id))
+
+
+async def _job_events(request: Request, job_id: str):
+    """Server-Sent Events: a `progress` event per change, `done` at the end."""
+    last_sent = None
+    last_write = time.monotonic()
+    while not await request.is_disconnected():
+        try:
+            job = _job_read(await crawl_jobs.get_job(job_id))
+        except Exception:
+            yield "event: error\ndata: {}\n\n"
+            return
+        payload = job.model_dump_json()
+        if payload != last_sent:
+            last_sent = payload
+            last_write = time.monotonic()
+            yield f"event: progress\ndata: {payload}\n\n"
+        elif time.monotonic() - last_write >= STREAM_HEARTBEAT_SECONDS:
+            last_write = time.monotonic()
+            yield ": keep-alive\n\n"
+        if job.status in crawl_jobs.FINISHED_STATUSES:
+            yield f"event: done\ndata: {json.dumps({'status': job.status})}\n\n"
+            return
+        await asyncio.sleep(STREAM_POLL_SECONDS)
+
+
+@router.get("/jobs/{job_id}/stream")
+async def stream_crawl_job(job_id: str, request: Request):
+    """Live progress of a crawl job (text/event-stream)."""
+    await _get_job(job_id)
+    return StreamingResponse(
+        _job_events(request, job_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
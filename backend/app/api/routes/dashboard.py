@@ -2,6 +2,7 @@ from datetime import datetime
 
 from fastapi import APIRouter
 
+from app.api.responses import FastJSONResponse
 from app.models.schemas import DashboardDigest, DashboardStats
 from app.services import event_service
 from app.services.pocketbase import pb_client
@@ -17,13 +18,14 @@ async def get_digest():
     best = await event_service.get_best_events(limit=15)
     flight_deals = await event_service.get_flight_deals(limit=5)
 
-    return DashboardDigest(
+    digest = DashboardDigest(
         today_count=len(today),
         week_count=len(week),
         featured=featured[:5],
         top_upcoming=best[:15],
         deals=flight_deals,
     )
+    return FastJSONResponse(digest)
 
 
 @router.get("/stats", response_model=DashboardStats)
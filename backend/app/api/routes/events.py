@@ -1,22 +1,61 @@
 from fastapi import APIRouter, HTTPException, Query
 
+from app.api.responses import FastJSONResponse
 from app.models.schemas import EventListResponse, EventRead
 from app.services import event_service
+from app.services.geo_index import bounding_box
 
 router = APIRouter()
 
 
+def _parse_near(near: str) -> tuple[float, float]:
+    """Parse a "lat,lng" query parameter."""
+    try:
+        lat_str, lng_str = near.split(",")
+        lat, lng = float(lat_str), float(lng_str)
+    except ValueError:
+        raise HTTPException(status_code=422, detail="near must be 'lat,lng'")
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        raise HTTPException(status_code=422, detail="near is out of range")
+    return lat, lng
+
+
 @router.get("", response_model=EventListResponse)
 async def list_events(
     page: int = Query(1, ge=1),
     per_page: int = Query(50, ge=1, le=100),
-    sort: str = Query("-interest_score"),
+    sort: str | None = Query(None, description="e.g. -interest_score, distance"),
     city: str | None = None,
     tag_type: str | None = None,
     tag_vibe: str | None = None,
     min_score: int | None = None,
     search: str | None = None,
+    near: str | None = Query(None, description="lat,lng"),
+    radius_km: float = Query(10.0, gt=0, le=200),
+    cursor: str | None = Query(None, description="next_cursor of the previous page"),
 ):
+    point = _parse_near(near) if near else None
+    if (search or point) and event_service.indexes_ready():
+        if cursor:
+            raise HTTPException(
+                status_code=400,
+                detail="cursor pagination is not available with search/near, use page",
+            )
+        result = event_service.search_events(
+            search,
+            near=point,
+            radius_km=radius_km,
+            page=page,
+            per_page=per_page,
+            # Without an explicit sort: relevance for text, distance for geo
+            sort=sort,
+            city=city,
+            tag_type=tag_type,
+            tag_vibe=tag_vibe,
+            min_score=min_score,
+        )
+        return FastJSONResponse(result)
+
     filters: list[str] = ['status = "published"']
     if city:
         filters.append(f'location_city ~ "{city}"')
@@ -28,41 +67,58 @@ async def list_events(
         filters.append(f"interest_score >= {min_score}")
     if search:
         filters.append(f'(title ~ "{search}" || description ~ "{search}")')
+    if point:
+        # Index unavailable: approximate the radius with a bounding box
+        min_lat, max_lat, min_lng, max_lng = bounding_box(*point, radius_km)
+        filters.append(
+            f"latitude >= {min_lat:.5f} && latitude <= {max_lat:.5f} "
+            f"&& longitude >= {min_lng:.5f} && longitude <= {max_lng:.5f}"
+        )
+    if sort in ("distance", "-distance"):
+        sort = None
 
     filter_str = " && ".join(filters)
-    return await event_service.get_events(
-        page=page, per_page=per_page, sort=sort, filter_str=filter_str
-    )
+    try:
+        result = await event_service.get_events(
+            page=page,
+            per_page=per_page,
+            sort=sort or "-interest_score",
+            filter_str=filter_str,
+            cursor=cursor,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return FastJSONResponse(result)
 
 
 @router.get("/today", response_model=list[EventRead])
 async def today_events():
-    return await event_service.get_today_events()
+    return FastJSONResponse(await event_service.get_today_events())
 
 
 @router.get("/week", response_model=list[EventRead])
 async def week_events():
-    return await event_service.get_week_events()
+    return FastJSONResponse(await event_service.get_week_events())
 
 
 @router.get("/weekend", response_model=list[EventRead])
 async def weekend_events():
-    return await event_service.get_weekend_events()
+    return FastJSONResponse(await event_service.get_weekend_events())
 
 
 @router.get("/month", response_model=list[EventRead])
 async def month_events():
-    return await event_service.get_month_events()
+    return FastJSONResponse(await event_service.get_month_events())
 
 
 @router.get("/featured", response_model=list[EventRead])
 async def featured_events():
-    return await event_service.get_featured_events()
+    return FastJSONResponse(await event_service.get_featured_events())
 
 
 @router.get("/upcoming", response_model=list[EventRead])
 async def upcoming_events():
-    return await event_service.get_upcoming_events()
+    return FastJSONResponse(await event_service.get_upcoming_events())
 
 
 @router.post("/recalibrate-scores")
@@ -78,4 +134,4 @@ async def get_event(event_id: str):
     event = await event_service.get_event_by_id(event_id)
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
-    return event
+    return FastJSONResponse(event)
@@ -3,7 +3,7 @@ import logging
 from fastapi import APIRouter, HTTPException
 
 from app.models.schemas import FeedbackCreate, FeedbackResponse
-from app.services.event_service import _to_event_read
+from app.services.event_service import _to_event_read, index_record
 from app.services.pocketbase import pb_client
 
 logger = logging.getLogger(__name__)
@@ -50,6 +50,7 @@ async def submit_feedback(event_id: str, body: FeedbackCreate):
 
     # Update event in PocketBase
     updated_record = await pb_client.update_record("events", event_id, event_update)
+    index_record(updated_record)
 
     # If block_type: add event's tags_type to user blocked_tags
     if body.rating == "block_type":
@@ -15,19 +15,67 @@ class Settings(BaseSettings):
     telegram_chat_id: str = ""
 
     # Crawling
+    # Daily run of the post-crawl maintenance (dedup, dead URLs, compaction)
     crawl_schedule_hour: int = 7
     crawl_timeout_seconds: int = 300
     max_events_per_crawl: int = 200
+    # Sources whose interval has elapsed are crawled on their own, checked
+    # every crawl_tick_minutes; intervals adapt between min and max hours
+    # (longer after runs with no new events, halved after busy ones)
+    crawl_tick_minutes: int = 15
+    crawl_min_interval_hours: float = 1.0
+    crawl_max_interval_hours: float = 168.0
+    crawl_busy_new_events: int = 5
+    # Incremental crawlers re-fetch everything this often
+    crawl_full_resync_days: int = 7
+    # A scheduled crawl missed by less than this still runs (once)
+    crawl_misfire_grace_seconds: int = 3600
+    # How long shutdown waits for a cancelled crawl to clean up
+    crawl_shutdown_timeout_seconds: float = 30.0
+    # How often the worker (python -m app.worker) checks for queued crawls
+    worker_poll_seconds: float = 5.0
+    # On-disk HTTP/parsed-events cache for static crawler pages ("" disables)
+    crawler_cache_dir: str = ".cache/crawlers"
+    # BeautifulSoup tree builder for crawlers: "lxml" or "html.parser"
+    crawler_html_parser: str = "lxml"
+
+    # Shared Playwright browser
+    browser_max_pages: int = 2
+    browser_recycle_after_pages: int = 40
 
     # Flight deals
     flight_deal_threshold_percent: float = 30.0
     flight_deal_min_history_days: int = 7
     flight_crawl_enabled: bool = True
+    # Weekends searched per route, and how long a (route, weekend) search
+    # stays fresh before it is crawled again
+    flight_grid_weekends: int = 4
+    flight_grid_ttl_hours: float = 12.0
+    # flight_prices older than this are rolled into daily per-route rows
+    flight_price_compact_after_days: int = 90
+    # "numpy": robust baselines per route × days-to-departure over the last
+    # flight_deal_history_days; "mean": 30-day average vs flight_deal_threshold_percent
+    flight_deal_engine: str = "numpy"
+    # numpy engine: deal if robust z-score <= -zscore or the price is in
+    # the lowest percentile% of its group
+    flight_deal_zscore: float = 2.0
+    flight_deal_percentile: float = 10.0
+    # numpy engine: days of raw prices read for the scored routes' baselines
+    flight_deal_history_days: int = 60
+
+    # Monthly columnar archive of flight_prices and expired events
+    # (python -m app.analytics.archive export)
+    archive_dir: str = "archive"
 
     # API
     api_host: str = "0.0.0.0"
     api_port: int = 8000
     api_env: str = "development"
+    # Cache-Control max-age (seconds) on ETag-enabled read endpoints;
+    # 0 makes clients and proxies revalidate every time (cheap 304s)
+    api_cache_max_age: int = 0
+    # How often the API checks crawl_jobs to pick up the worker's writes
+    api_job_poll_seconds: float = 10.0
 
     model_config = {"env_file": ".env", "extra": "ignore"}
 
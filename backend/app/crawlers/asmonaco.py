@@ -3,9 +3,10 @@ import re
 from datetime import datetime
 
 import httpx
-from bs4 import BeautifulSoup
 
 from app.crawlers.base import BaseCrawler, CrawledEvent
+from app.crawlers.http_cache import crawler_cache
+from app.crawlers.parsing import make_soup
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +25,7 @@ class ASMonacoCrawler(BaseCrawler):
     """
 
     source_name = "asmonaco"
+    default_interval_hours = 168.0
 
     async def crawl(self) -> list[CrawledEvent]:
         events: list[CrawledEvent] = []
@@ -36,41 +38,18 @@ class ASMonacoCrawler(BaseCrawler):
                     "User-Agent": "Palmier/1.0 (event aggregator)",
                     "Accept-Language": "fr-FR,fr;q=0.9",
                 },
+                transport=crawler_cache.transport(),
             ) as client:
                 logger.info("Crawling AS Monaco calendar")
                 response = await client.get(CALENDAR_URL)
                 response.raise_for_status()
 
-                soup = BeautifulSoup(response.text, "html.parser")
-                now = datetime.now()
-
-                month_blocks = soup.select(".asm-calendar-month-block")
-                logger.info(
-                    "ASMonaco: found %d month blocks", len(month_blocks)
+                events = crawler_cache.parsed_events(
+                    CALENDAR_URL,
+                    response.content,
+                    lambda: _parse_calendar(response.text),
                 )
 
-                for block_idx, month_block in enumerate(month_blocks):
-                    month_num = (
-                        _SEASON_MONTHS[block_idx]
-                        if block_idx < len(_SEASON_MONTHS)
-                        else None
-                    )
-                    if month_num is None:
-                        continue
-
-                    year = _year_for_month(month_num)
-
-                    for match in month_block.select(".asm-match"):
-                        try:
-                            event = _parse_match(match, month_num, year, now)
-                            if event:
-                                events.append(event)
-                        except Exception:
-                            logger.debug(
-                                "Failed to parse ASMonaco match",
-                                exc_info=True,
-                            )
-
         except Exception:
             logger.exception("ASMonaco crawler failed")
 
@@ -78,6 +57,37 @@ class ASMonacoCrawler(BaseCrawler):
         return events
 
 
+def _parse_calendar(html: str) -> list[CrawledEvent]:
+    """Parse the home matches listed in the season calendar page."""
+    soup = make_soup(html)
+    now = datetime.now()
+    events: list[CrawledEvent] = []
+
+    month_blocks = soup.select(".asm-calendar-month-block")
+    logger.info("ASMonaco: found %d month blocks", len(month_blocks))
+
+    for block_idx, month_block in enumerate(month_blocks):
+        month_num = (
+            _SEASON_MONTHS[block_idx]
+            if block_idx < len(_SEASON_MONTHS)
+            else None
+        )
+        if month_num is None:
+            continue
+
+        year = _year_for_month(month_num)
+
+        for match in month_block.select(".asm-match"):
+            try:
+                event = _parse_match(match, month_num, year, now)
+                if event:
+                    events.append(event)
+            except Exception:
+                logger.debug("Failed to parse ASMonaco match", exc_info=True)
+
+    return events
+
+
 def _year_for_month(month: int) -> int:
     """Return calendar year for a given month in the 2025-2026 season."""
     return 2025 if month >= 7 else 2026
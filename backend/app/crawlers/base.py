@@ -1,6 +1,25 @@
-from abc import ABC, abstractmethod
+import asyncio
+import logging
+import random
+from abc import ABC
+from collections.abc import AsyncIterator, Callable, Iterable
+from contextlib import asynccontextmanager
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Responses worth retrying after a pause (rate limited / overloaded)
+RETRY_STATUSES = {429, 503}
+BACKOFF_BASE = 2.0  # seconds, doubled on each retry
+MAX_RETRY_WAIT = 60.0
+
+
+class IncompletePagesError(Exception):
+    """A strict fetch_pages() could not read every page of the listing."""
 
 
 @dataclass
@@ -25,11 +44,241 @@ class CrawledEvent:
 
 
 class BaseCrawler(ABC):
-    """Abstract base class for all event crawlers."""
+    """Abstract base class for all event crawlers.
+
+    Subclasses implement either `iter_events()`, yielding events as pages
+    are parsed, or `crawl()`, returning them all at once; each default
+    is an adapter over the other.
+    """
 
     source_name: str = "unknown"
+    # Starting crawl interval; adapted per source to its rate of new events
+    default_interval_hours: float = 24.0
+    # False keeps default_interval_hours whatever the runs find
+    adaptive_interval: bool = True
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if (
+            cls.crawl is BaseCrawler.crawl
+            and cls.iter_events is BaseCrawler.iter_events
+        ):
+            raise TypeError(
+                f"{cls.__name__} must implement crawl() or iter_events()"
+            )
+
+    async def iter_events(self) -> AsyncIterator[CrawledEvent]:
+        """Yield raw events as the source is crawled."""
+        for event in await self.crawl():
+            yield event
 
-    @abstractmethod
     async def crawl(self) -> list[CrawledEvent]:
         """Crawl the source and return a list of raw events."""
-        ...
+        return [event async for event in self.iter_events()]
+
+
+class HostRateLimiter:
+    """Per-host token bucket, concurrency cap and 429 backoff for httpx crawlers.
+
+    Each host gets a bucket refilled at `rate` requests per second holding
+    up to `burst` tokens (rate <= 0 disables the bucket), and at most
+    `max_concurrency` requests in flight. `get()` retries 429/503 responses
+    up to `max_retries` times, waiting for Retry-After when the server sends
+    one (exponential backoff otherwise); the whole host is paused meanwhile.
+    """
+
+    def __init__(
+        self,
+        rate: float = 0.0,
+        burst: int = 1,
+        max_concurrency: int = 4,
+        max_retries: int = 3,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self._buckets: dict[str, list[float]] = {}  # host -> [tokens, updated]
+        self._paused_until: dict[str, float] = {}
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+
+    async def _take_token(self, host: str) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            now = loop.time()
+            wait = self._paused_until.get(host, 0.0) - now
+            if wait <= 0:
+                if self.rate <= 0:
+                    return
+                bucket = self._buckets.setdefault(host, [float(self.burst), now])
+                tokens = min(float(self.burst), bucket[0] + (now - bucket[1]) * self.rate)
+                bucket[1] = now
+                if tokens >= 1:
+                    bucket[0] = tokens - 1
+                    return
+                bucket[0] = tokens
+                wait = (1 - tokens) / self.rate
+            await asyncio.sleep(wait)
+
+    async def wait(self, url: str) -> None:
+        """Take a token for url's host, for requests not made through get()."""
+        await self._take_token(httpx.URL(url).host)
+
+    def pause(self, host: str, seconds: float) -> None:
+        """Hold every request to host for the given time."""
+        until = asyncio.get_running_loop().time() + seconds
+        self._paused_until[host] = max(self._paused_until.get(host, 0.0), until)
+
+    @asynccontextmanager
+    async def slot(self, url: str) -> AsyncIterator[None]:
+        host = httpx.URL(url).host
+        semaphore = self._semaphores.setdefault(
+            host, asyncio.Semaphore(self.max_concurrency)
+        )
+        async with semaphore:
+            await self._take_token(host)
+            yield
+
+    async def get(
+        self, client: httpx.AsyncClient, url: str, **kwargs
+    ) -> httpx.Response:
+        host = httpx.URL(url).host
+        for attempt in range(self.max_retries + 1):
+            async with self.slot(url):
+                response = await client.get(url, **kwargs)
+            if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                return response
+            delay = retry_after_seconds(response)
+            if delay is None:
+                delay = BACKOFF_BASE * 2**attempt * random.uniform(1.0, 1.5)
+            delay = min(delay, MAX_RETRY_WAIT)
+            logger.info(
+                "%s returned %d, retrying in %.1fs (attempt %d/%d)",
+                url, response.status_code, delay, attempt + 1, self.max_retries,
+            )
+            self.pause(host, delay)
+        return response
+
+
+def retry_after_seconds(response: httpx.Response) -> float | None:
+    """Parse a Retry-After header (delay in seconds or HTTP date)."""
+    value = response.headers.get("retry-after", "").strip()
+    if not value:
+        return None
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def wp_total_pages(response: httpx.Response) -> int | None:
+    """Page count advertised by the WordPress REST API."""
+    value = response.headers.get("x-wp-totalpages")
+    return int(value) if value and value.isdigit() else None
+
+
+async def fetch_all(
+    client: httpx.AsyncClient,
+    urls: Iterable[str],
+    limiter: HostRateLimiter,
+) -> AsyncIterator[tuple[str, httpx.Response | None]]:
+    """GET urls concurrently, yielding (url, response) as they complete.
+
+    Failed requests (network error or non-2xx status) are logged and
+    yielded with a None response.
+    """
+
+    async def _fetch(url: str) -> tuple[str, httpx.Response | None]:
+        try:
+            response = await limiter.get(client, url)
+            response.raise_for_status()
+            return url, response
+        except Exception as exc:
+            logger.warning("GET %s failed: %s", url, exc)
+            return url, None
+
+    tasks = [asyncio.ensure_future(_fetch(url)) for url in urls]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def fetch_pages(
+    client: httpx.AsyncClient,
+    page_url: Callable[[int], str],
+    *,
+    max_pages: int,
+    limiter: HostRateLimiter,
+    total_pages: Callable[[httpx.Response], int | None] = wp_total_pages,
+    is_last: Callable[[httpx.Response], bool] | None = None,
+    strict: bool = False,
+) -> AsyncIterator[tuple[int, httpx.Response]]:
+    """Fetch a paginated listing, yielding (page_num, response) as pages arrive.
+
+    Page 1 is fetched first (errors propagate) and nothing more is requested
+    if `is_last` says so (empty page, items older than a watermark...).
+    When `total_pages` can read the page count from page 1, the remaining
+    pages are fetched concurrently; otherwise pages are fetched in windows
+    of `limiter.max_concurrency` until one is last or fails. Never goes
+    past `max_pages`.
+
+    Failed pages are skipped. With `strict`, IncompletePagesError is raised
+    once the pages that could be read were yielded, if any page failed or
+    the listing went on past `max_pages`: callers keeping a watermark must
+    not advance it then.
+    """
+    first = await limiter.get(client, page_url(1))
+    first.raise_for_status()
+    yield 1, first
+    if is_last is not None and is_last(first):
+        return
+
+    failed: list[int] = []
+    truncated = False
+    total = total_pages(first)
+    if total is not None:
+        last = min(total, max_pages)
+        truncated = total > max_pages
+        urls = {page_url(n): n for n in range(2, last + 1)}
+        async for url, response in fetch_all(client, urls, limiter):
+            if response is None:
+                failed.append(urls[url])
+            else:
+                yield urls[url], response
+    else:
+        next_page = 2
+        reached_end = False
+        while next_page <= max_pages:
+            window = range(
+                next_page, min(next_page + limiter.max_concurrency, max_pages + 1)
+            )
+            urls = {page_url(n): n for n in window}
+            async for url, response in fetch_all(client, urls, limiter):
+                if response is None:
+                    # Without a page count, a failure may just be the end
+                    failed.append(urls[url])
+                    reached_end = True
+                    continue
+                if is_last is not None and is_last(response):
+                    reached_end = True
+                yield urls[url], response
+            if reached_end:
+                break
+            next_page = window.stop
+        truncated = not reached_end
+
+    if strict and (failed or truncated):
+        problems = []
+        if failed:
+            problems.append(f"pages {sorted(failed)} failed")
+        if truncated:
+            problems.append(f"stopped at max_pages={max_pages}")
+        raise IncompletePagesError(", ".join(problems))
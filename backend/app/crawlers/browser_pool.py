@@ -0,0 +1,137 @@
+import asyncio
+import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from app.config import settings
+from app.crawlers.resource_filter import ResourceFilter
+
+logger = logging.getLogger(__name__)
+
+
+class BrowserPool:
+    """Shared headless Chromium for the Playwright crawlers.
+
+    Each lease gets its own browser context (cookies, geolocation, user
+    agent...) and page, so crawlers stay isolated while paying the browser
+    startup cost once. The number of live pages is capped, and the browser
+    is replaced after `recycle_after` pages to bound memory growth; the old
+    one is closed once its last page is released.
+
+    The browser is launched lazily on first use and released by `stop()`.
+    """
+
+    def __init__(self, max_pages: int, recycle_after: int):
+        self.max_pages = max_pages
+        self.recycle_after = recycle_after
+        self._playwright = None
+        self._browser = None
+        self._served = 0  # pages handed out by the current browser
+        self._live: dict[object, int] = {}  # browser -> pages in use
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._lock: asyncio.Lock | None = None
+        self._slots: asyncio.Semaphore | None = None
+
+    def _bind_loop(self) -> None:
+        """(Re)create loop-bound primitives for the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        if self._browser is not None:
+            # Playwright objects cannot be used from another loop
+            logger.warning("Browser pool used from a new event loop, relaunching")
+            self._playwright = None
+            self._browser = None
+            self._live.clear()
+        self._loop = loop
+        self._lock = asyncio.Lock()
+        self._slots = asyncio.Semaphore(self.max_pages)
+
+    async def _acquire_browser(self):
+        async with self._lock:
+            if self._browser is not None and self._served >= self.recycle_after:
+                logger.info("Recycling browser after %d pages", self._served)
+                old = self._browser
+                self._browser = None
+                if not self._live.get(old):
+                    await self._close_browser(old)
+
+            if self._browser is None:
+                if self._playwright is None:
+                    from playwright.async_api import async_playwright
+
+                    self._playwright = await async_playwright().start()
+                self._browser = await self._playwright.chromium.launch(headless=True)
+                self._served = 0
+                logger.info("Browser launched")
+
+            browser = self._browser
+            self._served += 1
+            self._live[browser] = self._live.get(browser, 0) + 1
+            return browser
+
+    async def _release_browser(self, browser) -> None:
+        async with self._lock:
+            remaining = self._live.get(browser, 0) - 1
+            if remaining > 0:
+                self._live[browser] = remaining
+                return
+            self._live.pop(browser, None)
+            if browser is not self._browser:
+                # Retired by recycling (or stop) and now idle
+                await self._close_browser(browser)
+
+    async def _close_browser(self, browser) -> None:
+        self._live.pop(browser, None)
+        try:
+            await browser.close()
+        except Exception:
+            logger.debug("Browser close failed", exc_info=True)
+
+    @asynccontextmanager
+    async def page(
+        self, resource_filter: ResourceFilter | None = None, **context_options
+    ) -> AsyncIterator:
+        """Lease a page in a fresh browser context.
+
+        Keyword arguments are passed to `browser.new_context()`. When a
+        `resource_filter` is given, every request of the context goes
+        through it.
+        """
+        self._bind_loop()
+        async with self._slots:
+            browser = await self._acquire_browser()
+            try:
+                context = await browser.new_context(**context_options)
+                try:
+                    if resource_filter is not None:
+                        await context.route("**/*", resource_filter.handle)
+                    yield await context.new_page()
+                finally:
+                    await context.close()
+            finally:
+                await self._release_browser(browser)
+
+    async def stop(self) -> None:
+        """Close every browser and the Playwright driver."""
+        if self._loop is not asyncio.get_running_loop():
+            # Nothing was started on this loop
+            return
+        async with self._lock:
+            browsers = set(self._live)
+            if self._browser is not None:
+                browsers.add(self._browser)
+            for browser in browsers:
+                await self._close_browser(browser)
+            self._browser = None
+            self._live.clear()
+            if self._playwright is not None:
+                await self._playwright.stop()
+                self._playwright = None
+                logger.info("Browser pool stopped")
+
+
+browser_pool = BrowserPool(
+    max_pages=settings.browser_max_pages,
+    recycle_after=settings.browser_recycle_after_pages,
+)
@@ -1,12 +1,18 @@
-import asyncio
 import logging
 import re
+from collections.abc import AsyncIterator
 from datetime import datetime
 
 import httpx
 from bs4 import BeautifulSoup
 
-from app.crawlers.base import BaseCrawler, CrawledEvent
+from app.crawlers.base import (
+    BaseCrawler,
+    CrawledEvent,
+    HostRateLimiter,
+    fetch_all,
+)
+from app.crawlers.parsing import iter_json_ld, make_soup
 
 logger = logging.getLogger(__name__)
 
@@ -27,8 +33,14 @@ _CITY_FROM_URL = {
     "france--monaco": "Monaco",
 }
 
-# Delay between requests (seconds) to respect rate limiting
-REQUEST_DELAY = 1.5
+# Per-host token bucket: sustained request rate and burst size. 429s
+# pause the host and are retried (see HostRateLimiter).
+REQUESTS_PER_SECOND = 2.0
+BURST = 4
+MAX_CONCURRENCY = 4
+
+# Cap on new detail pages queued from a single listing
+MAX_DETAILS_PER_LISTING = 30
 
 
 class EventbriteCrawler(BaseCrawler):
@@ -38,10 +50,13 @@ class EventbriteCrawler(BaseCrawler):
     """
 
     source_name = "eventbrite"
+    default_interval_hours = 12.0
 
-    async def crawl(self) -> list[CrawledEvent]:
-        events: list[CrawledEvent] = []
+    async def iter_events(self) -> AsyncIterator[CrawledEvent]:
+        count = 0
         seen_urls: set[str] = set()
+        # Detail pages still to fetch, across all listings: url -> default city
+        detail_urls: dict[str, str] = {}
 
         try:
             async with httpx.AsyncClient(
@@ -56,37 +71,61 @@ class EventbriteCrawler(BaseCrawler):
                     ),
                 },
             ) as client:
-                for listing_url in EVENTBRITE_URLS:
+                limiter = HostRateLimiter(
+                    rate=REQUESTS_PER_SECOND,
+                    burst=BURST,
+                    max_concurrency=MAX_CONCURRENCY,
+                )
+                # Listings are requested together and parsed as they come back
+                async for listing_url, response in fetch_all(
+                    client, EVENTBRITE_URLS, limiter
+                ):
+                    if response is None:
+                        continue
                     try:
-                        page_events = await self._crawl_listing(
-                            client, listing_url, seen_urls,
+                        listing_events = self._parse_listing(
+                            listing_url, response, seen_urls, detail_urls,
                         )
-                        events.extend(page_events)
-                        await asyncio.sleep(REQUEST_DELAY)
                     except Exception:
                         logger.exception(
                             "Failed to crawl Eventbrite listing: %s",
                             listing_url,
                         )
+                        continue
+                    for event in listing_events:
+                        count += 1
+                        yield event
+
+                # A listing parsed later may have described an event that an
+                # earlier one queued: it was yielded already
+                for url in seen_urls.intersection(detail_urls):
+                    del detail_urls[url]
+
+                async for event in self._crawl_event_pages(
+                    client, limiter, detail_urls
+                ):
+                    count += 1
+                    yield event
 
         except Exception:
             logger.exception("Eventbrite crawler failed")
 
-        logger.info("Eventbrite: returning %d events", len(events))
-        return events
+        logger.info("Eventbrite: yielded %d events", count)
 
-    async def _crawl_listing(
+    def _parse_listing(
         self,
-        client: httpx.AsyncClient,
         listing_url: str,
+        response: httpx.Response,
         seen_urls: set[str],
+        detail_urls: dict[str, str],
     ) -> list[CrawledEvent]:
-        """Crawl a single Eventbrite listing page."""
-        logger.info("Crawling Eventbrite listing: %s", listing_url)
-        response = await client.get(listing_url)
-        response.raise_for_status()
+        """Parse a listing page and queue the detail pages it links to.
 
-        soup = BeautifulSoup(response.text, "html.parser")
+        Events described by the listing's own JSON-LD are returned directly;
+        only the other linked events are queued, once across all listings.
+        """
+        logger.info("Crawling Eventbrite listing: %s", listing_url)
+        html = response.text
 
         # Determine default city from URL
         default_city = "Nice"
@@ -95,109 +134,107 @@ class EventbriteCrawler(BaseCrawler):
                 default_city = city
                 break
 
-        events: list[CrawledEvent] = []
-
-        # Strategy 1: Find event cards via links to /e/ (event detail pages)
-        event_links = soup.select('a[href*="/e/"]')
-        event_urls: list[str] = []
+        # Strategy 1: Try to extract structured data from listing page itself
+        # Eventbrite often embeds JSON-LD or uses structured card components
+        events = _extract_from_listing_page(html, default_city, seen_urls)
 
-        for link in event_links:
+        # Strategy 2: Find event cards via links to /e/ (event detail pages)
+        queued = 0
+        for link in make_soup(html).select('a[href*="/e/"]'):
             href = link.get("href", "")
             if not href or "/e/" not in href:
                 continue
-            # Normalize URL
-            if href.startswith("/"):
-                href = f"https://www.eventbrite.fr{href}"
-            # Strip query params and fragments
-            href = href.split("?")[0].split("#")[0]
-            if href not in seen_urls:
-                seen_urls.add(href)
-                event_urls.append(href)
+            href = _normalize_event_url(href)
+            if href in seen_urls or href in detail_urls:
+                continue
+            if queued >= MAX_DETAILS_PER_LISTING:
+                break
+            detail_urls[href] = default_city
+            queued += 1
 
         logger.info(
-            "Eventbrite listing %s: found %d event URLs",
-            listing_url, len(event_urls),
+            "Eventbrite listing %s: %d events from listing, %d new event URLs",
+            listing_url, len(events), queued,
         )
+        return events
 
-        # Strategy 2: Try to extract structured data from listing page itself
-        # Eventbrite often embeds JSON-LD or uses structured card components
-        listing_events = _extract_from_listing_page(soup, default_city, seen_urls)
-        events.extend(listing_events)
-
-        # Fetch individual event detail pages for any remaining URLs
-        # (only those not already found via listing extraction)
-        found_urls = {ev.source_url for ev in events}
-        remaining_urls = [u for u in event_urls if u not in found_urls]
-
-        for event_url in remaining_urls[:30]:  # cap to avoid too many requests
+    async def _crawl_event_pages(
+        self,
+        client: httpx.AsyncClient,
+        limiter: HostRateLimiter,
+        detail_urls: dict[str, str],
+    ) -> AsyncIterator[CrawledEvent]:
+        """Fetch queued detail pages concurrently, within the host limits."""
+        parsed = 0
+        async for event_url, response in fetch_all(client, detail_urls, limiter):
+            if response is None:
+                continue
             try:
-                await asyncio.sleep(REQUEST_DELAY)
-                ev = await self._crawl_event_page(
-                    client, event_url, default_city,
-                )
-                if ev:
-                    events.append(ev)
+                ev = _parse_event_page(response, event_url, detail_urls[event_url])
             except Exception:
                 logger.debug(
-                    "Failed to crawl Eventbrite event: %s",
+                    "Failed to parse Eventbrite event: %s",
                     event_url, exc_info=True,
                 )
+                continue
+            if ev:
+                parsed += 1
+                yield ev
 
-        return events
+        logger.info(
+            "Eventbrite: %d/%d detail pages parsed", parsed, len(detail_urls)
+        )
 
-    async def _crawl_event_page(
-        self,
-        client: httpx.AsyncClient,
-        event_url: str,
-        default_city: str,
-    ) -> CrawledEvent | None:
-        """Crawl an individual Eventbrite event page."""
-        response = await client.get(event_url)
-        response.raise_for_status()
 
-        soup = BeautifulSoup(response.text, "html.parser")
+def _normalize_event_url(href: str) -> str:
+    """Absolute event URL without query string or fragment."""
+    if href.startswith("/"):
+        href = f"https://www.eventbrite.fr{href}"
+    return href.split("?")[0].split("#")[0]
 
-        # Try JSON-LD first (most reliable)
-        event = _extract_jsonld_event(soup, event_url, default_city)
-        if event:
-            return event
 
-        # Fallback: parse meta tags and page content
-        return _extract_from_meta_tags(soup, event_url, default_city)
+def _parse_event_page(
+    response: httpx.Response,
+    event_url: str,
+    default_city: str,
+) -> CrawledEvent | None:
+    """Parse an individual Eventbrite event page."""
+    html = response.text
+
+    # Try JSON-LD first (most reliable, and needs no DOM)
+    event = _extract_jsonld_event(html, event_url, default_city)
+    if event:
+        return event
+
+    # Fallback: parse meta tags and page content
+    return _extract_from_meta_tags(make_soup(html), event_url, default_city)
 
 
 def _extract_from_listing_page(
-    soup: BeautifulSoup,
+    html: str,
     default_city: str,
     seen_urls: set[str],
 ) -> list[CrawledEvent]:
     """Extract events from structured data on the listing page."""
     events: list[CrawledEvent] = []
 
-    # Try JSON-LD scripts
-    for script in soup.select('script[type="application/ld+json"]'):
+    def _add(item) -> None:
+        ev = _parse_jsonld_item(item, "", default_city)
+        if ev and ev.source_url not in seen_urls:
+            seen_urls.add(ev.source_url)
+            events.append(ev)
+
+    for data in iter_json_ld(html):
         try:
-            import json
-            data = json.loads(script.string or "")
             if isinstance(data, list):
                 for item in data:
-                    ev = _parse_jsonld_item(item, "", default_city)
-                    if ev and ev.source_url not in seen_urls:
-                        seen_urls.add(ev.source_url)
-                        events.append(ev)
+                    _add(item)
             elif isinstance(data, dict):
                 if data.get("@type") == "ItemList":
                     for elem in data.get("itemListElement", []):
-                        item = elem.get("item", elem)
-                        ev = _parse_jsonld_item(item, "", default_city)
-                        if ev and ev.source_url not in seen_urls:
-                            seen_urls.add(ev.source_url)
-                            events.append(ev)
+                        _add(elem.get("item", elem))
                 else:
-                    ev = _parse_jsonld_item(data, "", default_city)
-                    if ev and ev.source_url not in seen_urls:
-                        seen_urls.add(ev.source_url)
-                        events.append(ev)
+                    _add(data)
         except Exception:
             continue
 
@@ -205,15 +242,13 @@ def _extract_from_listing_page(
 
 
 def _extract_jsonld_event(
-    soup: BeautifulSoup,
+    html: str,
     event_url: str,
     default_city: str,
 ) -> CrawledEvent | None:
     """Extract event data from JSON-LD on an event detail page."""
-    for script in soup.select('script[type="application/ld+json"]'):
+    for data in iter_json_ld(html):
         try:
-            import json
-            data = json.loads(script.string or "")
             if isinstance(data, dict) and data.get("@type") == "Event":
                 return _parse_jsonld_item(data, event_url, default_city)
             if isinstance(data, list):
@@ -342,7 +377,7 @@ def _parse_jsonld_item(
         description = description[:500] + "..."
 
     # Source URL
-    source = event_url or data.get("url", "")
+    source = event_url or _normalize_event_url(data.get("url", ""))
 
     return CrawledEvent(
         title=title,
@@ -1,16 +1,24 @@
 import asyncio
 import base64
 import logging
-import random
 from datetime import datetime, timedelta
 
 from app.config import settings
-from app.crawlers.base import BaseCrawler, CrawledEvent
+from app.crawlers.base import BaseCrawler, CrawledEvent, HostRateLimiter
+from app.crawlers.browser_pool import browser_pool
+from app.crawlers.resource_filter import ResourceFilter
+from app.crawlers.waits import (
+    Deadline,
+    first_of,
+    succeeds,
+    wait_for_network_idle,
+)
 from app.services.flight_deals import (
     DESTINATION_CITIES,
     FlightPrice,
-    detect_deal,
-    store_flight_price,
+    evaluate_deals,
+    recently_crawled_cells,
+    store_flight_prices,
 )
 
 logger = logging.getLogger(__name__)
@@ -26,6 +34,36 @@ ROUTES: list[dict[str, str]] = [
     {"origin": "NCE", "destination": "RAK", "city": "Marrakech"},
 ]
 
+BROWSER_CONTEXT = {
+    "user_agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/120.0.0.0 Safari/537.36"
+    ),
+    "locale": "fr-FR",
+    "viewport": {"width": 1280, "height": 720},
+}
+
+SEARCH_URL = "https://www.google.com/travel/flights/search"
+# Searches started per second across all pooled pages
+SEARCHES_PER_SECOND = 0.5
+
+# Max seconds to wait for a route's results to render
+ROUTE_DEADLINE = 20.0
+
+CONSENT_SELECTOR = (
+    "button[aria-label*='Accept'], "
+    "button[aria-label*='Accepter'], "
+    "button[aria-label*='Tout accepter']"
+)
+
+# Results are rendered once a list row shows both a time and a price
+RESULTS_READY_JS = r"""
+() => Array.from(document.querySelectorAll('li')).some(
+    li => /\d{1,2}:\d{2}/.test(li.innerText) && /\d\s*€/.test(li.innerText)
+)
+"""
+
 # Reasonable price bounds for short-haul round-trip flights from Nice
 MIN_PRICE_EUR = 25
 MAX_PRICE_EUR = 800
@@ -42,6 +80,15 @@ def _next_weekend() -> tuple[datetime, datetime]:
     return friday, sunday
 
 
+def _upcoming_weekends(count: int) -> list[tuple[datetime, datetime]]:
+    """The next `count` Friday–Sunday date pairs, soonest first."""
+    friday, sunday = _next_weekend()
+    return [
+        (friday + timedelta(weeks=i), sunday + timedelta(weeks=i))
+        for i in range(max(count, 1))
+    ]
+
+
 def _build_tfs(origin: str, dest: str, dep_date: str, ret_date: str) -> str:
     """Build the tfs parameter for Google Flights search URL.
 
@@ -97,65 +144,91 @@ class FlightDealsCrawler(BaseCrawler):
     actual round-trip search results. Prices are extracted via targeted JS
     evaluation that only captures prices from flight result rows.
 
-    Returns at most 3 deal events (the best discounts).
+    Searches a date grid of FLIGHT_GRID_WEEKENDS upcoming weekends per
+    route, refreshing only the cells not searched within
+    FLIGHT_GRID_TTL_HOURS.
+
+    Returns at most 5 deal events (the best discount per route).
     """
 
     source_name = "google_flights"
+    default_interval_hours = 3.0
+    # Prices are sampled on a fixed cadence, deals or not
+    adaptive_interval = False
 
     async def crawl(self) -> list[CrawledEvent]:
-        """Crawl Google Flights for all monitored routes."""
+        """Crawl Google Flights for all monitored routes and weekends."""
         if not settings.flight_crawl_enabled:
             logger.info("Flight crawl disabled, skipping")
             return []
 
-        deal_candidates: list[tuple[float, CrawledEvent]] = []
-        departure, return_date = _next_weekend()
-
+        # Date grid: each (route, weekend) cell is one search, skipped while
+        # the prices stored for it are fresher than the TTL
+        weekends = _upcoming_weekends(settings.flight_grid_weekends)
         try:
-            from playwright.async_api import async_playwright
-
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(headless=True)
-                context = await browser.new_context(
-                    user_agent=(
-                        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                        "AppleWebKit/537.36 (KHTML, like Gecko) "
-                        "Chrome/120.0.0.0 Safari/537.36"
-                    ),
-                    locale="fr-FR",
-                    viewport={"width": 1280, "height": 720},
-                )
-                page = await context.new_page()
-
-                for route in ROUTES:
-                    route_code = f"{route['origin']}-{route['destination']}"
-                    logger.info("Crawling flights: %s", route_code)
+            fresh = await recently_crawled_cells(settings.flight_grid_ttl_hours)
+        except Exception:
+            logger.warning("Failed to load recent flight searches", exc_info=True)
+            fresh = set()
+        cells = [
+            (route, departure, return_date)
+            for route in ROUTES
+            for departure, return_date in weekends
+            if (
+                f"{route['origin']}-{route['destination']}",
+                departure.date().isoformat(),
+                return_date.date().isoformat(),
+            )
+            not in fresh
+        ]
+        logger.info(
+            "Flight grid: %d/%d route × weekend cells to refresh",
+            len(cells), len(ROUTES) * len(weekends),
+        )
 
-                    try:
-                        route_deals = await self._crawl_route(
-                            page, route, departure, return_date
-                        )
-                        deal_candidates.extend(route_deals)
-                    except Exception:
-                        logger.warning(
-                            "Failed to crawl route %s", route_code, exc_info=True
-                        )
+        # Prices are read from rendered text: keep stylesheets (row widths
+        # are used to tell result rows apart) but skip images/fonts/media
+        resource_filter = ResourceFilter()
 
-                    await asyncio.sleep(random.uniform(2.0, 5.0))
+        # Cells run concurrently; the browser pool bounds how many pages
+        # are open at once, the limiter how fast searches are started
+        limiter = HostRateLimiter(rate=SEARCHES_PER_SECOND)
+        results = await asyncio.gather(
+            *(self._crawl_cell(resource_filter, limiter, *cell) for cell in cells)
+        )
+        route_prices = [
+            (route, fp)
+            for (route, _, _), prices in zip(cells, results)
+            for fp in prices
+        ]
 
-                await browser.close()
+        resource_filter.log_summary(self.source_name)
 
+        # Every price of the run is stored, then scored, in one batch
+        try:
+            await store_flight_prices([fp for _, fp in route_prices])
+            verdicts = await evaluate_deals([fp for _, fp in route_prices])
         except Exception:
-            logger.exception("Flight deals crawler failed")
+            logger.exception("Flight price storage or deal evaluation failed")
+            verdicts = []
+        deal_candidates: list[tuple[float, str, CrawledEvent]] = []
+        for (route, fp), (is_deal, avg_price, discount_pct) in zip(
+            route_prices, verdicts
+        ):
+            if is_deal and avg_price is not None and discount_pct is not None:
+                event = self._create_deal_event(
+                    fp, route, avg_price, discount_pct,
+                    fp.departure_date, fp.return_date,
+                )
+                deal_candidates.append((discount_pct, fp.route, event))
 
-        # Deduplicate by destination — keep best discount per city
-        seen_destinations: set[str] = set()
+        # Deduplicate by destination — keep best discount per route
+        seen_routes: set[str] = set()
         unique_deals: list[tuple[float, CrawledEvent]] = []
         deal_candidates.sort(key=lambda x: x[0], reverse=True)
-        for discount, event in deal_candidates:
-            dest = event.location_city or event.title
-            if dest not in seen_destinations:
-                seen_destinations.add(dest)
+        for discount, route_code, event in deal_candidates:
+            if route_code not in seen_routes:
+                seen_routes.add(route_code)
                 unique_deals.append((discount, event))
 
         # Keep top 5 deals (one per destination, best discounts first)
@@ -169,14 +242,42 @@ class FlightDealsCrawler(BaseCrawler):
         )
         return events
 
+    async def _crawl_cell(
+        self,
+        resource_filter: ResourceFilter,
+        limiter: HostRateLimiter,
+        route: dict[str, str],
+        departure: datetime,
+        return_date: datetime,
+    ) -> list[FlightPrice]:
+        """Search one (route, weekend) cell in a pooled browser page."""
+        route_code = f"{route['origin']}-{route['destination']}"
+        logger.info(
+            "Crawling flights: %s %s", route_code, departure.strftime("%Y-%m-%d")
+        )
+        try:
+            # Wait for our turn before leasing a page, so waiting cells
+            # don't hold browser slots
+            await limiter.wait(SEARCH_URL)
+            async with browser_pool.page(
+                resource_filter, **BROWSER_CONTEXT
+            ) as page:
+                return await self._crawl_route(page, route, departure, return_date)
+        except Exception:
+            logger.warning(
+                "Failed to crawl route %s for %s",
+                route_code, departure.strftime("%Y-%m-%d"), exc_info=True,
+            )
+            return []
+
     async def _crawl_route(
         self,
         page,
         route: dict[str, str],
         departure: datetime,
         return_date: datetime,
-    ) -> list[tuple[float, CrawledEvent]]:
-        """Crawl a single route and return (discount_pct, event) tuples."""
+    ) -> list[FlightPrice]:
+        """Crawl a single route and return its prices."""
         route_code = f"{route['origin']}-{route['destination']}"
         dep_str = departure.strftime("%Y-%m-%d")
         ret_str = return_date.strftime("%Y-%m-%d")
@@ -184,25 +285,53 @@ class FlightDealsCrawler(BaseCrawler):
         # Build proper Google Flights search URL with tfs protobuf parameter
         tfs = _build_tfs(route["origin"], route["destination"], dep_str, ret_str)
         url = (
-            f"https://www.google.com/travel/flights/search"
-            f"?tfs={tfs}&hl=fr&gl=fr&curr=EUR"
+            f"{SEARCH_URL}?tfs={tfs}&hl=fr&gl=fr&curr=EUR"
         )
 
         await page.goto(url, wait_until="domcontentloaded", timeout=30000)
-        await page.wait_for_timeout(random.randint(5000, 7000))
+        deadline = Deadline(ROUTE_DEADLINE)
+
+        # Either the results or the cookie dialog shows up first
+        ready = await first_of(
+            {
+                "results": succeeds(
+                    page.wait_for_function(
+                        RESULTS_READY_JS, timeout=ROUTE_DEADLINE * 1000
+                    )
+                ),
+                "consent": succeeds(
+                    page.wait_for_selector(
+                        CONSENT_SELECTOR, timeout=ROUTE_DEADLINE * 1000
+                    )
+                ),
+            },
+            timeout=deadline.remaining(),
+        )
 
         # Accept cookies dialog if present
-        try:
-            accept_btn = await page.query_selector(
-                "button[aria-label*='Accept'], "
-                "button[aria-label*='Accepter'], "
-                "button[aria-label*='Tout accepter']"
-            )
-            if accept_btn:
-                await accept_btn.click()
-                await page.wait_for_timeout(1000)
-        except Exception:
-            pass
+        if ready == "consent":
+            try:
+                accept_btn = await page.query_selector(CONSENT_SELECTOR)
+                if accept_btn:
+                    await accept_btn.click()
+                    rendered = await succeeds(
+                        page.wait_for_function(
+                            RESULTS_READY_JS,
+                            timeout=max(deadline.remaining(), 0.1) * 1000,
+                        )
+                    )
+                    ready = "results" if rendered else "deadline"
+            except Exception:
+                pass
+
+        # The first rows are in; let the rest of the list finish loading
+        if ready == "results":
+            await wait_for_network_idle(page, min(2.0, deadline.remaining()))
+
+        logger.info(
+            "Route %s: stopped waiting on %s after %.1fs",
+            route_code, ready, deadline.elapsed(),
+        )
 
         # Extract flight prices
         prices_found = await self._extract_prices(
@@ -213,31 +342,8 @@ class FlightDealsCrawler(BaseCrawler):
             logger.warning("No valid prices found for %s", route_code)
             return []
 
-        # Store all prices and check for deals
-        deal_events: list[tuple[float, CrawledEvent]] = []
-        for fp in prices_found:
-            await store_flight_price(fp)
-
-            is_deal, avg_price, discount_pct = await detect_deal(
-                fp.price,
-                route_code,
-                threshold_percent=settings.flight_deal_threshold_percent,
-                min_history_days=settings.flight_deal_min_history_days,
-            )
-
-            if is_deal and avg_price is not None and discount_pct is not None:
-                event = self._create_deal_event(
-                    fp, route, avg_price, discount_pct, departure, return_date
-                )
-                deal_events.append((discount_pct, event))
-
-        logger.info(
-            "Route %s: %d prices stored, %d deals detected",
-            route_code,
-            len(prices_found),
-            len(deal_events),
-        )
-        return deal_events
+        logger.info("Route %s: %d prices found", route_code, len(prices_found))
+        return prices_found
 
     async def _extract_prices(
         self,
@@ -369,7 +475,8 @@ class FlightDealsCrawler(BaseCrawler):
             f"Vol{direct_str} Nice (NCE) \u2192 {route['city']} "
             f"({route['destination']}){airline_str}. "
             f"Prix actuel : {fp.price:.0f}\u20ac A/R, "
-            f"soit {discount_pct:.0f}% sous la moyenne de {avg_price:.0f}\u20ac. "
+            f"soit {discount_pct:.0f}% sous le prix habituel "
+            f"de {avg_price:.0f}\u20ac. "
             f"Dates : {dep_str} \u2013 {ret_str}."
         )
 
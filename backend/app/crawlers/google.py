@@ -4,9 +4,19 @@ from datetime import datetime
 import httpx
 
 from app.crawlers.base import BaseCrawler, CrawledEvent
+from app.crawlers.browser_pool import browser_pool
+from app.crawlers.resource_filter import ResourceFilter
+from app.crawlers.waits import first_of, succeeds, wait_for_network_idle
 
 logger = logging.getLogger(__name__)
 
+# Event cards from Google's event carousel
+EVENT_CARD_SELECTOR = (
+    "[data-attrid='kc:/local/events:events'] .klitem, "
+    ".mnr-c .kno-nf, "
+    "g-scrolling-carousel .klitem"
+)
+
 
 class GoogleSearchCrawler(BaseCrawler):
     """Crawler that scrapes Google search results for local events."""
@@ -29,18 +39,13 @@ class GoogleSearchCrawler(BaseCrawler):
     async def crawl(self) -> list[CrawledEvent]:
         events: list[CrawledEvent] = []
 
-        try:
-            from playwright.async_api import async_playwright
-
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(headless=True)
-                page = await browser.new_page()
-
-                # Set a realistic user agent
-                await page.set_extra_http_headers(
-                    {"Accept-Language": "fr-FR,fr;q=0.9"}
-                )
+        resource_filter = ResourceFilter()
 
+        try:
+            async with browser_pool.page(
+                resource_filter,
+                extra_http_headers={"Accept-Language": "fr-FR,fr;q=0.9"},
+            ) as page:
                 for query in self.QUERIES:
                     logger.info("Google search: %s", query)
 
@@ -49,13 +54,22 @@ class GoogleSearchCrawler(BaseCrawler):
                         await page.goto(
                             search_url, wait_until="domcontentloaded", timeout=15000
                         )
-                        await page.wait_for_timeout(1500)
+                        ready = await first_of(
+                            {
+                                "event cards": succeeds(
+                                    page.wait_for_selector(
+                                        EVENT_CARD_SELECTOR, timeout=3000
+                                    )
+                                ),
+                                "network idle": wait_for_network_idle(page, 3.0),
+                            },
+                            timeout=3.0,
+                        )
+                        logger.info("Google search %r: stopped waiting on %s", query, ready)
 
                         # Extract event cards from Google's event carousel
                         event_cards = await page.query_selector_all(
-                            "[data-attrid='kc:/local/events:events'] .klitem, "
-                            ".mnr-c .kno-nf, "
-                            "g-scrolling-carousel .klitem"
+                            EVENT_CARD_SELECTOR
                         )
 
                         for card in event_cards:
@@ -115,11 +129,10 @@ class GoogleSearchCrawler(BaseCrawler):
                         )
                         continue
 
-                await browser.close()
-
         except Exception:
             logger.exception("Google crawler failed")
 
+        resource_filter.log_summary(self.source_name)
         logger.info("Google: found %d events", len(events))
         return events
 
@@ -0,0 +1,217 @@
+import hashlib
+import json
+import logging
+import os
+from collections.abc import Callable
+from dataclasses import asdict
+from datetime import datetime
+from pathlib import Path
+
+import httpx
+
+from app.config import settings
+from app.crawlers.base import CrawledEvent
+
+logger = logging.getLogger(__name__)
+
+# Response headers kept with a cached body
+_STORED_HEADERS = ("content-type", "etag", "last-modified")
+
+_DATE_FIELDS = ("date_start", "date_end")
+
+
+def _digest(data: str | bytes) -> str:
+    if isinstance(data, str):
+        data = data.encode()
+    return hashlib.sha256(data).hexdigest()
+
+
+def _event_to_dict(event: CrawledEvent) -> dict:
+    data = asdict(event)
+    for name in _DATE_FIELDS:
+        if data[name] is not None:
+            data[name] = data[name].isoformat()
+    return data
+
+
+def _event_from_dict(data: dict) -> CrawledEvent:
+    for name in _DATE_FIELDS:
+        if data.get(name):
+            data[name] = datetime.fromisoformat(data[name])
+    return CrawledEvent(**data)
+
+
+class HttpCache:
+    """On-disk cache for crawler pages and the events parsed from them.
+
+    Two layers, both keyed by URL (or a caller-chosen key):
+
+    - `transport()` returns an httpx transport that stores GET responses
+      carrying an ETag or Last-Modified and revalidates them with
+      conditional requests; a 304 is served as a 200 with the stored body.
+    - `parsed_events()` keeps the CrawledEvents parsed from a body and
+      returns them again, without parsing, while the body hash is unchanged.
+
+    An empty directory disables caching.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory) if directory else None
+
+    @property
+    def enabled(self) -> bool:
+        return self.directory is not None
+
+    def _path(self, kind: str, key: str, suffix: str) -> Path:
+        return self.directory / kind / f"{_digest(key)[:32]}{suffix}"
+
+    def _read_json(self, path: Path) -> dict | None:
+        try:
+            return json.loads(path.read_text())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            logger.warning("Ignoring unreadable cache file %s", path)
+            return None
+
+    def _write(self, path: Path, data: bytes) -> None:
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(path.suffix + ".tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+        except OSError:
+            logger.warning("Failed to write cache file %s", path, exc_info=True)
+
+    # ── HTTP layer ────────────────────────────────────────────────
+
+    def load_response(self, url: str) -> tuple[dict, bytes] | None:
+        if not self.enabled:
+            return None
+        meta = self._read_json(self._path("http", url, ".json"))
+        if meta is None:
+            return None
+        try:
+            body = self._path("http", url, ".body").read_bytes()
+        except OSError:
+            return None
+        if _digest(body) != meta.get("body_hash"):
+            return None
+        return meta, body
+
+    def store_response(self, url: str, headers: httpx.Headers, body: bytes) -> None:
+        if not self.enabled:
+            return
+        meta = {
+            "url": url,
+            "headers": {k: headers[k] for k in _STORED_HEADERS if k in headers},
+            "body_hash": _digest(body),
+            "stored_at": datetime.now().isoformat(),
+        }
+        self._write(self._path("http", url, ".body"), body)
+        self._write(self._path("http", url, ".json"), json.dumps(meta).encode())
+
+    def transport(self, **transport_options) -> httpx.AsyncBaseTransport:
+        """httpx transport doing conditional GETs against this cache."""
+        inner = httpx.AsyncHTTPTransport(**transport_options)
+        return CachingTransport(self, inner) if self.enabled else inner
+
+    # ── Parsed events layer ───────────────────────────────────────
+
+    def parsed_events(
+        self,
+        key: str,
+        body: str | bytes,
+        parse: Callable[[], list[CrawledEvent]],
+    ) -> list[CrawledEvent]:
+        """Return the events parsed from body, reusing them if body is unchanged.
+
+        Reused events that have ended since they were parsed are dropped,
+        as the parsers themselves skip past events.
+        """
+        if not self.enabled:
+            return parse()
+
+        body_hash = _digest(body)
+        path = self._path("events", key, ".json")
+        cached = self._read_json(path)
+        if cached and cached.get("body_hash") == body_hash:
+            try:
+                now = datetime.now()
+                events = [_event_from_dict(d) for d in cached["events"]]
+                events = [e for e in events if (e.date_end or e.date_start) >= now]
+                logger.info("%s unchanged, reusing %d parsed events", key, len(events))
+                return events
+            except (KeyError, TypeError, ValueError):
+                logger.warning("Ignoring malformed parsed-events cache for %s", key)
+
+        events = parse()
+        payload = {
+            "key": key,
+            "body_hash": body_hash,
+            "events": [_event_to_dict(e) for e in events],
+        }
+        self._write(path, json.dumps(payload).encode())
+        return events
+
+
+class CachingTransport(httpx.AsyncBaseTransport):
+    """Revalidate cached GET responses with If-None-Match/If-Modified-Since."""
+
+    def __init__(self, cache: HttpCache, transport: httpx.AsyncBaseTransport):
+        self.cache = cache
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if request.method != "GET":
+            return await self._transport.handle_async_request(request)
+
+        url = str(request.url)
+        cached = self.cache.load_response(url)
+        if cached is not None:
+            stored = cached[0]["headers"]
+            if "etag" in stored:
+                request.headers["If-None-Match"] = stored["etag"]
+            if "last-modified" in stored:
+                request.headers["If-Modified-Since"] = stored["last-modified"]
+
+        response = await self._transport.handle_async_request(request)
+
+        if response.status_code == 304 and cached is not None:
+            await response.aclose()
+            logger.info("Not modified: %s", url)
+            return httpx.Response(
+                200,
+                headers=cached[0]["headers"],
+                content=cached[1],
+                request=request,
+                extensions={"http_cache": "revalidated"},
+            )
+
+        validators = "etag" in response.headers or "last-modified" in response.headers
+        if response.status_code != 200 or not validators:
+            return response
+
+        # Buffer the body to store it; it is decoded, so content-encoding and
+        # content-length no longer apply to the rebuilt response
+        body = await response.aread()
+        await response.aclose()
+        self.cache.store_response(url, response.headers, body)
+        headers = [
+            (k, v)
+            for k, v in response.headers.multi_items()
+            if k.lower() not in ("content-encoding", "content-length", "transfer-encoding")
+        ]
+        return httpx.Response(
+            200,
+            headers=headers,
+            content=body,
+            request=request,
+            extensions={"http_cache": "stored"},
+        )
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+crawler_cache = HttpCache(settings.crawler_cache_dir)
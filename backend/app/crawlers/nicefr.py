@@ -1,11 +1,22 @@
 import logging
 import re
-from datetime import datetime
+from collections.abc import AsyncIterator
+from datetime import datetime, timedelta
+from functools import partial
 from html import unescape
 
 import httpx
 
-from app.crawlers.base import BaseCrawler, CrawledEvent
+from app.config import settings
+from app.crawlers.base import (
+    BaseCrawler,
+    CrawledEvent,
+    HostRateLimiter,
+    IncompletePagesError,
+    fetch_pages,
+)
+from app.services.sources import load_crawl_state, save_crawl_state
+from app.services.url_checker import expire_unlisted_events
 
 logger = logging.getLogger(__name__)
 
@@ -13,6 +24,9 @@ logger = logging.getLogger(__name__)
 API_BASE = "https://www.nice.fr/wp-json/wp/v2/events"
 PER_PAGE = 50
 MAX_PAGES = 10  # 500 events — covers recently modified/created events
+FULL_SYNC_MAX_PAGES = 80  # 4000 events — the whole agenda
+MAX_CONCURRENCY = 4
+REQUESTS_PER_SECOND = 5.0
 
 
 class NiceFrCrawler(BaseCrawler):
@@ -20,66 +34,151 @@ class NiceFrCrawler(BaseCrawler):
 
     Uses the WordPress REST API — no scraping needed.
     Returns concerts, exhibitions, sports, festivals, workshops, etc.
+
+    Incremental: only events modified since the last run (watermark kept in
+    the source's crawl_config) are fetched, with a full resync every
+    CRAWL_FULL_RESYNC_DAYS. A complete full resync expires the stored
+    events the agenda no longer lists.
     """
 
     source_name = "nice_fr"
-
-    async def crawl(self) -> list[CrawledEvent]:
-        events: list[CrawledEvent] = []
+    default_interval_hours = 12.0
+
+    async def iter_events(self) -> AsyncIterator[CrawledEvent]:
+        count = 0
+
+        state = await _load_state(self.source_name)
+        watermark = state.get("modified_after") or ""
+        full_sync = _needs_full_sync(state)
+        newest = watermark
+        listed_urls: set[str] = set()
+
+        def _is_last(resp: httpx.Response) -> bool:
+            # Newest-first ordering: once a page reaches the watermark,
+            # later pages only hold already-seen changes
+            items = resp.json()
+            if not items:
+                return True
+            oldest = items[-1].get("modified_gmt") or ""
+            return not full_sync and bool(watermark) and oldest <= watermark
 
         try:
             async with httpx.AsyncClient(
-                timeout=30, follow_redirects=True
+                timeout=30,
+                follow_redirects=True,
+                headers={"User-Agent": "Palmier/1.0"},
             ) as client:
-                # Fetch events sorted by recently modified first
-                # This ensures upcoming events (often updated) are fetched early
-                for page_num in range(1, MAX_PAGES + 1):
+                # Events sorted by recently modified first: upcoming events
+                # (often updated) come first. Pages after the first are
+                # fetched concurrently once X-WP-TotalPages is known.
+                async for page_num, resp in fetch_pages(
+                    client,
+                    partial(
+                        _page_url,
+                        modified_after=None if full_sync else watermark,
+                    ),
+                    max_pages=FULL_SYNC_MAX_PAGES if full_sync else MAX_PAGES,
+                    limiter=HostRateLimiter(
+                        rate=REQUESTS_PER_SECOND,
+                        max_concurrency=MAX_CONCURRENCY,
+                    ),
+                    is_last=_is_last,
+                    strict=True,
+                ):
                     logger.info("nice.fr API page %d", page_num)
-                    resp = await client.get(
-                        API_BASE,
-                        params={
-                            "per_page": PER_PAGE,
-                            "page": page_num,
-                            "orderby": "modified",
-                            "order": "desc",
-                        },
-                        headers={"User-Agent": "Palmier/1.0"},
-                    )
-
-                    if resp.status_code != 200:
-                        logger.warning(
-                            "nice.fr API returned %d on page %d",
-                            resp.status_code,
-                            page_num,
-                        )
-                        break
-
-                    items = resp.json()
-                    if not items:
-                        break
-
-                    for item in items:
+                    for item in resp.json():
+                        if full_sync and item.get("link"):
+                            listed_urls.add(item["link"])
+                        modified = item.get("modified_gmt") or ""
+                        newest = max(newest, modified)
+                        if not full_sync and watermark and modified <= watermark:
+                            continue
                         try:
                             event = _parse_event(item)
-                            if event:
-                                events.append(event)
                         except Exception:
                             logger.debug(
                                 "Failed to parse nice.fr event %s",
                                 item.get("id"),
                                 exc_info=True,
                             )
-
-                    # Stop if we've reached the last page
-                    total_pages = int(resp.headers.get("x-wp-totalpages", "1"))
-                    if page_num >= total_pages:
-                        break
-
+                            continue
+                        if event:
+                            count += 1
+                            yield event
+
+        except IncompletePagesError as exc:
+            # Changes on the missing pages would fall behind the watermark
+            logger.warning("nice.fr: %s, keeping the watermark", exc)
         except Exception:
             logger.exception("nice.fr crawler failed")
+        else:
+            # Only reached once every page up to X-WP-TotalPages was read:
+            # a run stopped early does not move the watermark
+            await _save_state(self.source_name, newest, full_sync)
+            if full_sync:
+                await _expire_unlisted(self.source_name, listed_urls)
+
+        logger.info(
+            "nice.fr: yielded %d events (%s sync, modified after %s)",
+            count,
+            "full" if full_sync else "incremental",
+            watermark or "-",
+        )
+
 
-        logger.info("nice.fr: returning %d events", len(events))
-        return events
+def _page_url(page_num: int, modified_after: str | None = None) -> str:
+    params = {
+        "per_page": PER_PAGE,
+        "page": page_num,
+        "orderby": "modified",
+        "order": "desc",
+    }
+    if modified_after:
+        # WordPress compares against the site-local modified date; passing
+        # the GMT watermark can only widen the window, never skip a change
+        params["modified_after"] = modified_after
+    return str(httpx.URL(API_BASE, params=params))
+
+
+def _needs_full_sync(state: dict) -> bool:
+    """Full resync on first run and every FULL_RESYNC_DAYS."""
+    if not state.get("modified_after") or not state.get("last_full_sync"):
+        return True
+    try:
+        last_full = datetime.fromisoformat(state["last_full_sync"])
+    except (TypeError, ValueError):
+        return True
+    return datetime.now() - last_full >= timedelta(
+        days=settings.crawl_full_resync_days
+    )
+
+
+async def _load_state(source_name: str) -> dict:
+    try:
+        return await load_crawl_state(source_name)
+    except Exception:
+        logger.warning("nice.fr: crawl state unavailable, doing a full sync")
+        return {}
+
+
+async def _save_state(source_name: str, newest: str, full_sync: bool) -> None:
+    updates: dict = {"modified_after": newest}
+    if full_sync:
+        updates["last_full_sync"] = datetime.now().isoformat()
+    try:
+        await save_crawl_state(source_name, **updates)
+    except Exception:
+        logger.warning("nice.fr: failed to save crawl state", exc_info=True)
+
+
+async def _expire_unlisted(source_name: str, listed_urls: set[str]) -> None:
+    try:
+        expired = await expire_unlisted_events(source_name, listed_urls)
+    except Exception:
+        logger.warning("nice.fr: failed to expire removed events", exc_info=True)
+        return
+    if expired:
+        logger.info("nice.fr: expired %d events removed from the agenda", expired)
 
 
 # Keywords in title/description that indicate events not matching target audience
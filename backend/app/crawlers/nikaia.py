@@ -1,16 +1,31 @@
 import logging
 import re
+from collections.abc import AsyncIterator
 from datetime import datetime
 
 import httpx
-from bs4 import BeautifulSoup
 
-from app.crawlers.base import BaseCrawler, CrawledEvent
+from app.crawlers.base import (
+    BaseCrawler,
+    CrawledEvent,
+    HostRateLimiter,
+    fetch_pages,
+)
+from app.crawlers.http_cache import crawler_cache
+from app.crawlers.parsing import make_soup
 
 logger = logging.getLogger(__name__)
 
 PROGRAMMATION_URL = "https://www.nikaia.fr/programmation"
 MAX_PAGES = 6
+MAX_CONCURRENCY = 3
+REQUESTS_PER_SECOND = 2.0
+
+
+def _page_url(page_num: int) -> str:
+    if page_num == 1:
+        return PROGRAMMATION_URL
+    return f"{PROGRAMMATION_URL}?page_programmation={page_num}"
 
 
 class NikaiaCrawler(BaseCrawler):
@@ -22,8 +37,8 @@ class NikaiaCrawler(BaseCrawler):
 
     source_name = "nikaia"
 
-    async def crawl(self) -> list[CrawledEvent]:
-        events: list[CrawledEvent] = []
+    async def iter_events(self) -> AsyncIterator[CrawledEvent]:
+        count = 0
 
         try:
             async with httpx.AsyncClient(
@@ -33,37 +48,51 @@ class NikaiaCrawler(BaseCrawler):
                     "User-Agent": "Palmier/1.0 (event aggregator)",
                     "Accept-Language": "fr-FR,fr;q=0.9",
                 },
+                transport=crawler_cache.transport(),
             ) as client:
-                for page_num in range(1, MAX_PAGES + 1):
-                    url = PROGRAMMATION_URL
-                    if page_num > 1:
-                        url = f"{PROGRAMMATION_URL}?page_programmation={page_num}"
-
+                # No page count is advertised: pages are fetched a few at
+                # a time until one comes back without event cards
+                async for page_num, response in fetch_pages(
+                    client,
+                    _page_url,
+                    max_pages=MAX_PAGES,
+                    limiter=HostRateLimiter(
+                        rate=REQUESTS_PER_SECOND,
+                        max_concurrency=MAX_CONCURRENCY,
+                    ),
+                    total_pages=lambda r: None,
+                    is_last=lambda r: "bloc-event" not in r.text,
+                ):
                     logger.info("Crawling Nikaia page %d", page_num)
-                    response = await client.get(url)
-                    response.raise_for_status()
+                    for event in crawler_cache.parsed_events(
+                        _page_url(page_num),
+                        response.content,
+                        lambda: _parse_page(response.text),
+                    ):
+                        count += 1
+                        yield event
 
-                    soup = BeautifulSoup(response.text, "html.parser")
-                    cards = soup.select("article.bloc-event")
+        except Exception:
+            logger.exception("Nikaia crawler failed")
 
-                    if not cards:
-                        break
+        logger.info("Nikaia: yielded %d events", count)
 
-                    now = datetime.now()
 
-                    for card in cards:
-                        try:
-                            event = _parse_card(card, now)
-                            if event:
-                                events.append(event)
-                        except Exception:
-                            logger.debug("Failed to parse Nikaia card", exc_info=True)
+def _parse_page(html: str) -> list[CrawledEvent]:
+    """Parse the event cards of a programme page."""
+    soup = make_soup(html)
+    now = datetime.now()
+    events: list[CrawledEvent] = []
 
+    for card in soup.select("article.bloc-event"):
+        try:
+            event = _parse_card(card, now)
+            if event:
+                events.append(event)
         except Exception:
-            logger.exception("Nikaia crawler failed")
+            logger.debug("Failed to parse Nikaia card", exc_info=True)
 
-        logger.info("Nikaia: returning %d events", len(events))
-        return events
+    return events
 
 
 def _parse_card(card, now: datetime) -> CrawledEvent | None:
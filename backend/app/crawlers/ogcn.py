@@ -3,9 +3,10 @@ import re
 from datetime import datetime
 
 import httpx
-from bs4 import BeautifulSoup
 
 from app.crawlers.base import BaseCrawler, CrawledEvent
+from app.crawlers.http_cache import crawler_cache
+from app.crawlers.parsing import make_soup
 
 logger = logging.getLogger(__name__)
 
@@ -37,6 +38,7 @@ class OGCNCrawler(BaseCrawler):
     """
 
     source_name = "ogcn"
+    default_interval_hours = 168.0
 
     async def crawl(self) -> list[CrawledEvent]:
         events: list[CrawledEvent] = []
@@ -49,26 +51,17 @@ class OGCNCrawler(BaseCrawler):
                     "User-Agent": "Palmier/1.0 (event aggregator)",
                     "Accept-Language": "fr-FR,fr;q=0.9",
                 },
+                transport=crawler_cache.transport(),
             ) as client:
                 logger.info("Crawling OGC Nice calendar")
                 response = await client.get(CALENDAR_URL)
                 response.raise_for_status()
 
-                soup = BeautifulSoup(response.text, "html.parser")
-
-                # Only upcoming matches (not played)
-                match_blocks = soup.select(".calendrier_bloc_incoming")
-                logger.info("OGCN: found %d upcoming match blocks", len(match_blocks))
-
-                now = datetime.now()
-
-                for block in match_blocks:
-                    try:
-                        event = _parse_match_block(block, now)
-                        if event:
-                            events.append(event)
-                    except Exception:
-                        logger.debug("Failed to parse OGCN match", exc_info=True)
+                events = crawler_cache.parsed_events(
+                    CALENDAR_URL,
+                    response.content,
+                    lambda: _parse_calendar(response.text),
+                )
 
         except Exception:
             logger.exception("OGCN crawler failed")
@@ -77,6 +70,28 @@ class OGCNCrawler(BaseCrawler):
         return events
 
 
+def _parse_calendar(html: str) -> list[CrawledEvent]:
+    """Parse the upcoming home matches of the calendar page."""
+    soup = make_soup(html)
+
+    # Only upcoming matches (not played)
+    match_blocks = soup.select(".calendrier_bloc_incoming")
+    logger.info("OGCN: found %d upcoming match blocks", len(match_blocks))
+
+    now = datetime.now()
+    events: list[CrawledEvent] = []
+
+    for block in match_blocks:
+        try:
+            event = _parse_match_block(block, now)
+            if event:
+                events.append(event)
+        except Exception:
+            logger.debug("Failed to parse OGCN match", exc_info=True)
+
+    return events
+
+
 def _parse_match_block(block, now: datetime) -> CrawledEvent | None:
     """Parse a .calendrier_bloc_incoming into a CrawledEvent.
 
@@ -0,0 +1,50 @@
+import json
+import logging
+import re
+from collections.abc import Iterator
+
+from bs4 import BeautifulSoup
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _resolve_backend(name: str) -> str:
+    """Pick the BeautifulSoup tree builder, falling back to the stdlib one."""
+    if name == "lxml":
+        try:
+            import lxml  # noqa: F401
+        except ImportError:
+            logger.warning("lxml not installed, using html.parser")
+            return "html.parser"
+    return name
+
+
+# Tree builder used by make_soup(): "lxml" (C, several times faster) or
+# "html.parser" (pure Python)
+HTML_PARSER = _resolve_backend(settings.crawler_html_parser)
+
+_JSON_LD_RE = re.compile(
+    r"<script\b[^>]*\btype\s*=\s*[\"']application/ld\+json[\"'][^>]*>(.*?)</script\s*>",
+    re.DOTALL | re.IGNORECASE,
+)
+
+
+def make_soup(html: str | bytes) -> BeautifulSoup:
+    """Build a BeautifulSoup tree with the configured backend."""
+    return BeautifulSoup(html, HTML_PARSER)
+
+
+def iter_json_ld(html: str) -> Iterator[dict | list]:
+    """Yield the decoded application/ld+json blocks of a page.
+
+    Scans the raw HTML instead of building a DOM, which is all a page is
+    parsed for when only its structured data is needed. Blocks that are
+    not valid JSON are skipped.
+    """
+    for match in _JSON_LD_RE.finditer(html):
+        try:
+            yield json.loads(match.group(1))
+        except ValueError:
+            continue
@@ -0,0 +1,95 @@
+import logging
+from collections import Counter
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+# Playwright resource types we never read: crawlers only consume JSON
+# responses and DOM text/attributes. Stylesheets stay allowed because
+# some extractors depend on layout (element widths, innerText).
+DEFAULT_BLOCKED_TYPES = frozenset({"image", "media", "font"})
+
+# Analytics / ads hosts (matched on the host suffix)
+TRACKER_HOSTS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "googleadservices.com",
+    "googlesyndication.com",
+    "doubleclick.net",
+    "facebook.net",
+    "connect.facebook.com",
+    "hotjar.com",
+    "segment.io",
+    "segment.com",
+    "amplitude.com",
+    "mixpanel.com",
+    "criteo.com",
+    "criteo.net",
+    "tiktok.com",
+    "snapchat.com",
+    "clarity.ms",
+    "intercom.io",
+)
+
+
+class ResourceFilter:
+    """Abort page sub-requests a crawler does not need.
+
+    Installed on a browser context with `context.route("**/*", f.handle)`
+    (see `BrowserPool.page(resource_filter=...)`). Requests are blocked by
+    resource type or tracker host unless their URL contains one of the
+    `allow` substrings.
+
+    Blocked requests are counted per reason. Their size is not: an aborted
+    request never reaches the network, so there is no response to measure.
+    """
+
+    def __init__(
+        self,
+        blocked_types: frozenset[str] = DEFAULT_BLOCKED_TYPES,
+        allow: tuple[str, ...] = (),
+        tracker_hosts: tuple[str, ...] = TRACKER_HOSTS,
+    ):
+        self.blocked_types = blocked_types
+        self.allow = allow
+        self.tracker_hosts = tracker_hosts
+        self.blocked: Counter[str] = Counter()
+        self.allowed = 0
+
+    def block_reason(self, url: str, resource_type: str) -> str | None:
+        """Return why a request should be blocked, or None to let it through."""
+        if any(pattern in url for pattern in self.allow):
+            return None
+        if resource_type in self.blocked_types:
+            return resource_type
+        host = urlsplit(url).hostname or ""
+        for tracker in self.tracker_hosts:
+            if host == tracker or host.endswith("." + tracker):
+                return "tracker"
+        return None
+
+    async def handle(self, route) -> None:
+        """Playwright route handler."""
+        request = route.request
+        reason = self.block_reason(request.url, request.resource_type)
+        if reason is None:
+            self.allowed += 1
+            await route.continue_()
+            return
+        self.blocked[reason] += 1
+        await route.abort("blockedbyclient")
+
+    @property
+    def blocked_requests(self) -> int:
+        return sum(self.blocked.values())
+
+    def log_summary(self, source_name: str) -> None:
+        if not self.blocked and not self.allowed:
+            return
+        logger.info(
+            "%s: blocked %d/%d requests (%s)",
+            source_name,
+            self.blocked_requests,
+            self.blocked_requests + self.allowed,
+            ", ".join(f"{k}={v}" for k, v in self.blocked.most_common()) or "none",
+        )
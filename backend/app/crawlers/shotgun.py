@@ -2,9 +2,21 @@ import asyncio
 import json
 import logging
 import re
+from collections.abc import AsyncIterator
 from datetime import datetime
 
+import httpx
+
 from app.crawlers.base import BaseCrawler, CrawledEvent
+from app.crawlers.browser_pool import browser_pool
+from app.crawlers.resource_filter import ResourceFilter
+from app.crawlers.waits import (
+    Deadline,
+    Progress,
+    first_of,
+    scroll_until_stable,
+    wait_for_network_idle,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -31,6 +43,29 @@ REJECTED_CITIES = {
     "avignon", "aix-en-provence", "aix en provence",
 }
 
+# Browser context: geolocated in Nice so city pages default to the area
+BROWSER_CONTEXT = {
+    "geolocation": {"latitude": NICE_LAT, "longitude": NICE_LNG},
+    "permissions": ["geolocation"],
+    "locale": "fr-FR",
+    "user_agent": (
+        "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+    ),
+}
+
+# Page load budget (seconds): wait for the first event JSON, then scroll
+# until a scroll brings no new events, all within PAGE_DEADLINE
+PAGE_DEADLINE = 15.0
+FIRST_DATA_TIMEOUT = 6.0
+MAX_SCROLLS = 5
+SCROLL_SETTLE = 1.5
+FINAL_IDLE_TIMEOUT = 2.0
+
+# Plain-HTTP data path
+HTTP_TIMEOUT = 20
+HTTP_MAX_PAGES = 5
+
 # City page URLs to crawl
 CITY_URLS = [
     "https://shotgun.live/fr/cities/nice/events",
@@ -76,71 +111,151 @@ VENUE_URLS = [
 class ShotgunCrawler(BaseCrawler):
     """Crawler for Shotgun (shotgun.live) events in the Cote d'Azur area.
 
-    Intercepts API JSON responses via Playwright to extract structured event
-    data, instead of parsing DOM selectors which break on SPA updates.
+    Fetches city/venue pages over plain HTTP and reads the event JSON the
+    pages embed for hydration (Next.js __NEXT_DATA__, JSON-LD). Pages that
+    expose no event data are loaded in a headless browser instead, where
+    API JSON responses are intercepted (and the DOM parsed as last resort).
     """
 
     source_name = "shotgun"
+    default_interval_hours = 3.0
 
-    async def crawl(self) -> list[CrawledEvent]:
-        events: list[CrawledEvent] = []
+    async def iter_events(self) -> AsyncIterator[CrawledEvent]:
+        count = 0
         seen_ids: set[str] = set()
         seen_urls: set[str] = set()
 
-        try:
-            from playwright.async_api import async_playwright
-
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(headless=True)
-                context = await browser.new_context(
-                    geolocation={"latitude": NICE_LAT, "longitude": NICE_LNG},
-                    permissions=["geolocation"],
-                    locale="fr-FR",
-                    user_agent=(
-                        "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
-                        "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-                    ),
-                )
-                page = await context.new_page()
-
-                # --- Phase 1: Crawl city pages via network interception ---
-                for city_url in CITY_URLS:
-                    try:
-                        city_events = await self._crawl_page_with_interception(
-                            page, city_url, seen_ids,
-                        )
-                        for ev in city_events:
-                            if ev.source_url not in seen_urls:
-                                seen_urls.add(ev.source_url)
-                                events.append(ev)
-                    except Exception:
-                        logger.exception("Failed to crawl city page: %s", city_url)
-
-                # --- Phase 2: Crawl specific venue pages ---
-                for venue_info in VENUE_URLS:
-                    try:
-                        venue_events = await self._crawl_page_with_interception(
-                            page,
-                            venue_info["url"],
-                            seen_ids,
-                            force_venue=venue_info["location_name"],
-                            force_city=venue_info["location_city"],
-                        )
-                        for ev in venue_events:
-                            if ev.source_url not in seen_urls:
-                                seen_urls.add(ev.source_url)
-                                events.append(ev)
-                    except Exception:
-                        logger.exception(
-                            "Failed to crawl venue: %s", venue_info["url"]
+        # Phase 1: city pages, phase 2: specific venue pages
+        targets = [{"url": url} for url in CITY_URLS] + VENUE_URLS
+
+        # Events come from intercepted JSON; the DOM fallback only reads
+        # link attributes and text, so images/fonts/media are never needed
+        resource_filter = ResourceFilter()
+        browser_targets = 0
+
+        async with httpx.AsyncClient(
+            timeout=HTTP_TIMEOUT,
+            follow_redirects=True,
+            headers={
+                "User-Agent": BROWSER_CONTEXT["user_agent"],
+                "Accept-Language": "fr-FR,fr;q=0.9",
+            },
+        ) as client:
+            for target in targets:
+                url = target["url"]
+                force_venue = target.get("location_name", "")
+                force_city = target.get("location_city", "")
+                try:
+                    page_events = await self._crawl_page_http(
+                        client, url, seen_ids, force_venue, force_city
+                    )
+                    if page_events is None:
+                        logger.info(
+                            "No embedded event data on %s, using browser", url
                         )
+                        browser_targets += 1
+                        async with browser_pool.page(
+                            resource_filter, **BROWSER_CONTEXT
+                        ) as page:
+                            page_events = await self._crawl_page_with_interception(
+                                page, url, seen_ids, force_venue, force_city,
+                            )
+                except Exception:
+                    logger.exception("Failed to crawl Shotgun page: %s", url)
+                    continue
+                for ev in page_events:
+                    if ev.source_url not in seen_urls:
+                        seen_urls.add(ev.source_url)
+                        count += 1
+                        yield ev
 
-                await browser.close()
+        resource_filter.log_summary(self.source_name)
+        logger.info(
+            "Shotgun: yielded %d events (%d/%d pages needed the browser)",
+            count, browser_targets, len(targets),
+        )
 
-        except Exception:
-            logger.exception("Shotgun crawler failed")
+    async def _crawl_page_http(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        seen_ids: set[str],
+        force_venue: str = "",
+        force_city: str = "",
+    ) -> list[CrawledEvent] | None:
+        """Read the event JSON embedded in a Shotgun page and its next pages.
+
+        Next pages are only requested when the hydration payload says there
+        is one (hasNextPage, nextPage, page/totalPages) and gives its page
+        number, up to HTTP_MAX_PAGES. Returns None so the caller falls back
+        to the browser, which follows the site's own infinite scroll, when
+        the first page carries no event data (blocked, or rendered
+        client-side only), no pagination info, or only a cursor.
+        """
+        raw_events: list[dict] = []
+        page_ids: set[str] = set()
+        page_url = url
+
+        for _ in range(HTTP_MAX_PAGES):
+            resp = await client.get(page_url)
+            if resp.status_code != 200:
+                logger.info(
+                    "Shotgun HTTP %d on %s", resp.status_code, page_url
+                )
+                break
 
-        logger.info("Shotgun: returning %d events", len(events))
+            new_raw = []
+            for raw in _extract_events_from_html(resp.text):
+                event_id = _event_key(raw)
+                if event_id in page_ids:
+                    continue
+                page_ids.add(event_id)
+                new_raw.append(raw)
+            if not new_raw:
+                break
+            raw_events.extend(new_raw)
+
+            page_info = _extract_page_info(resp.text)
+            if page_info is None:
+                if page_url == url:
+                    logger.info("No pagination info on %s", url)
+                    return None
+                break
+            has_next, next_page = page_info
+            if not has_next:
+                break
+            if next_page is None:
+                logger.info("Cursor-only pagination on %s", url)
+                return None
+            page_url = f"{url}?page={next_page}"
+
+        if not page_ids:
+            return None
+
+        # seen_ids is only updated once the HTTP path is known to be used,
+        # so a browser fallback still gets these events
+        events: list[CrawledEvent] = []
+        for raw in raw_events:
+            event_id = str(raw.get("_id") or raw.get("id") or "")
+            if event_id and event_id in seen_ids:
+                continue
+            if event_id:
+                seen_ids.add(event_id)
+            try:
+                ev = _parse_api_event(raw, force_venue, force_city)
+                if ev:
+                    events.append(ev)
+            except Exception:
+                logger.debug(
+                    "Failed to parse Shotgun event: %s",
+                    raw.get("title", "?"),
+                    exc_info=True,
+                )
+
+        logger.info(
+            "Shotgun HTTP: %d raw events, %d kept from %s",
+            len(page_ids), len(events), url,
+        )
         return events
 
     async def _crawl_page_with_interception(
@@ -153,6 +268,7 @@ class ShotgunCrawler(BaseCrawler):
     ) -> list[CrawledEvent]:
         """Navigate to a Shotgun page and intercept JSON API responses."""
         intercepted_events: list[dict] = []
+        progress = Progress()
 
         async def _on_response(response):
             """Capture JSON responses that contain event data."""
@@ -172,7 +288,9 @@ class ShotgunCrawler(BaseCrawler):
                     return
 
                 data = json.loads(body)
+                before = len(intercepted_events)
                 _extract_events_from_json(data, intercepted_events, resp_url)
+                progress.add(len(intercepted_events) - before)
 
             except Exception:
                 pass  # silently skip non-JSON or malformed responses
@@ -182,15 +300,36 @@ class ShotgunCrawler(BaseCrawler):
         try:
             logger.info("Crawling Shotgun page: %s", url)
             await page.goto(url, wait_until="domcontentloaded", timeout=30000)
-            await page.wait_for_timeout(3000)
+            deadline = Deadline(PAGE_DEADLINE)
+
+            # First batch of events, or a quiet network for server-rendered
+            # pages that never fetch event JSON
+            first = await first_of(
+                {
+                    "event data": progress.wait_for_growth(0, FIRST_DATA_TIMEOUT),
+                    "network idle": wait_for_network_idle(page, FIRST_DATA_TIMEOUT),
+                },
+                timeout=min(FIRST_DATA_TIMEOUT, deadline.remaining()),
+            )
+            logger.info(
+                "Shotgun %s: initial load ended on %s after %.1fs",
+                url, first, deadline.elapsed(),
+            )
 
             # Scroll down to trigger lazy loading of more events
-            for _ in range(5):
-                await page.evaluate("window.scrollBy(0, 1000)")
-                await page.wait_for_timeout(1500)
+            await scroll_until_stable(
+                page,
+                progress,
+                deadline,
+                label=f"Shotgun {url}",
+                max_scrolls=MAX_SCROLLS,
+                settle=SCROLL_SETTLE,
+            )
 
-            # Wait a bit more for final API responses
-            await page.wait_for_timeout(2000)
+            # Let in-flight API responses land
+            await wait_for_network_idle(
+                page, min(FINAL_IDLE_TIMEOUT, deadline.remaining())
+            )
 
         except Exception:
             logger.exception("Navigation failed for %s", url)
@@ -378,6 +517,110 @@ def _extract_events_from_json(
                 _extract_events_from_json(val, out, resp_url)
 
 
+_JSON_SCRIPT_RE = re.compile(
+    r'<script[^>]+type="application/(?:ld\+)?json"[^>]*>(.*?)</script>',
+    re.DOTALL | re.IGNORECASE,
+)
+
+
+def _extract_events_from_html(html: str) -> list[dict]:
+    """Collect event-like objects from the JSON scripts embedded in a page.
+
+    Covers the Next.js hydration payload (__NEXT_DATA__) and schema.org
+    JSON-LD blocks.
+    """
+    out: list[dict] = []
+    for match in _JSON_SCRIPT_RE.finditer(html):
+        try:
+            data = json.loads(match.group(1))
+        except ValueError:
+            continue
+        _walk_json_for_events(data, out)
+    return out
+
+
+def _extract_page_info(html: str) -> tuple[bool, int | None] | None:
+    """Pagination state of the listing from the page's embedded JSON.
+
+    Returns (has_next_page, next_page_number), the number being None when
+    the payload only has a cursor, or None when no pagination info is found.
+    """
+    for match in _JSON_SCRIPT_RE.finditer(html):
+        try:
+            data = json.loads(match.group(1))
+        except ValueError:
+            continue
+        info = _walk_json_for_page_info(data)
+        if info is not None:
+            return info
+    return None
+
+
+def _page_number(value) -> int | None:
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.isdigit():
+        return int(value)
+    return None
+
+
+def _walk_json_for_page_info(
+    data, depth: int = 0
+) -> tuple[bool, int | None] | None:
+    if depth > 20:
+        return None
+    if isinstance(data, list):
+        values = data
+    elif isinstance(data, dict):
+        # GraphQL connection pageInfo, possibly with a page number
+        if "hasNextPage" in data:
+            return bool(data["hasNextPage"]), _page_number(data.get("nextPage"))
+        page = _page_number(data.get("page", data.get("currentPage")))
+        total = _page_number(data.get("totalPages", data.get("pageCount")))
+        if page is not None and total is not None:
+            return page < total, page + 1 if page < total else None
+        if "nextPage" in data:
+            next_page = _page_number(data["nextPage"])
+            return next_page is not None, next_page
+        values = list(data.values())
+    else:
+        return None
+    for value in values:
+        if isinstance(value, (dict, list)):
+            info = _walk_json_for_page_info(value, depth + 1)
+            if info is not None:
+                return info
+    return None
+
+
+def _walk_json_for_events(data, out: list[dict], depth: int = 0) -> None:
+    """Depth-first search for event-like dicts in an arbitrary payload.
+
+    Unlike `_extract_events_from_json`, which follows the usual API wrapper
+    keys, hydration payloads nest events under arbitrary page props.
+    """
+    if depth > 20:
+        return
+    if isinstance(data, list):
+        for item in data:
+            _walk_json_for_events(item, out, depth + 1)
+    elif isinstance(data, dict):
+        if _looks_like_event(data):
+            out.append(data)
+            return
+        for value in data.values():
+            if isinstance(value, (dict, list)):
+                _walk_json_for_events(value, out, depth + 1)
+
+
+def _event_key(raw: dict) -> str:
+    """Stable identity of a raw event, for pagination progress."""
+    return str(
+        raw.get("_id") or raw.get("id") or raw.get("slug") or raw.get("url")
+        or raw.get("title") or raw.get("name")
+    )
+
+
 def _looks_like_event(d: dict) -> bool:
     """Heuristic: does this dict look like a Shotgun event?"""
     # Must have a title/name
@@ -435,7 +678,8 @@ def _parse_api_event(
             )
         if not city:
             city = (
-                venue_data.get("city") or venue_data.get("locality") or ""
+                venue_data.get("city") or venue_data.get("locality")
+                or _postal_field(venue_data, "addressLocality")
             )
     elif isinstance(venue_data, str) and not venue:
         venue = venue_data
@@ -461,6 +705,14 @@ def _parse_api_event(
     price_min = 0.0
     price_max = 0.0
     price_data = raw.get("price") or raw.get("pricing") or {}
+    offers = raw.get("offers")  # schema.org (JSON-LD)
+    if not price_data and isinstance(offers, (dict, list)):
+        offer = offers[0] if isinstance(offers, list) and offers else offers
+        if isinstance(offer, dict):
+            price_data = {
+                "min": offer.get("lowPrice") or offer.get("price"),
+                "max": offer.get("highPrice"),
+            }
     if isinstance(price_data, dict):
         price_min = float(price_data.get("min") or price_data.get("amount") or 0)
         price_max = float(price_data.get("max") or price_min)
@@ -476,6 +728,8 @@ def _parse_api_event(
             image_data.get("url") or image_data.get("src")
             or image_data.get("original") or ""
         )
+    elif isinstance(image_data, list) and image_data:
+        image_url = image_data[0] if isinstance(image_data[0], str) else ""
     elif isinstance(image_data, str):
         image_url = image_data
     if not image_url:
@@ -496,6 +750,8 @@ def _parse_api_event(
     address = ""
     if isinstance(venue_data, dict):
         address = venue_data.get("address") or venue_data.get("formattedAddress") or ""
+        if isinstance(address, dict):
+            address = _postal_field(venue_data, "streetAddress")
 
     # Coordinates
     lat = None
@@ -524,6 +780,14 @@ def _parse_api_event(
     )
 
 
+def _postal_field(venue_data: dict, key: str) -> str:
+    """Read a field of a schema.org PostalAddress nested in a Place."""
+    address = venue_data.get("address")
+    if isinstance(address, dict):
+        return str(address.get(key) or "")
+    return ""
+
+
 def _parse_iso_date(text: str) -> datetime | None:
     """Parse an ISO-ish date string."""
     if not text:
@@ -0,0 +1,152 @@
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable
+
+logger = logging.getLogger(__name__)
+
+# Playwright considers the network idle after 500 ms without requests
+NETWORK_IDLE = "networkidle"
+
+
+class Deadline:
+    """Wall-clock budget shared by the waits of one page."""
+
+    def __init__(self, seconds: float):
+        self.started = time.monotonic()
+        self.expires = self.started + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+
+class Progress:
+    """Counter of items captured by a page (e.g. intercepted events).
+
+    Response handlers call `add()`; waiters block until the count grows.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self._changed = asyncio.Event()
+
+    def add(self, n: int = 1) -> None:
+        if n > 0:
+            self.count += n
+            self._changed.set()
+
+    async def wait_for_growth(self, since: int, timeout: float) -> bool:
+        """Wait until count > since. Returns False on timeout."""
+        loop = asyncio.get_running_loop()
+        expires = loop.time() + timeout
+        while self.count <= since:
+            remaining = expires - loop.time()
+            if remaining <= 0:
+                return False
+            self._changed.clear()
+            try:
+                await asyncio.wait_for(self._changed.wait(), remaining)
+            except asyncio.TimeoutError:
+                return False
+        return True
+
+
+async def wait_for_network_idle(page, timeout: float) -> bool:
+    """Wait for the page's network to go idle. Returns False on timeout."""
+    if timeout <= 0:
+        return False
+    try:
+        await page.wait_for_load_state(NETWORK_IDLE, timeout=timeout * 1000)
+        return True
+    except Exception:
+        return False
+
+
+async def succeeds(aw: Awaitable) -> bool:
+    """Turn a wait that raises on timeout (wait_for_selector...) into a bool."""
+    try:
+        await aw
+        return True
+    except Exception:
+        return False
+
+
+async def first_of(waits: dict[str, Awaitable], timeout: float) -> str:
+    """Run named waits concurrently and return the first one to succeed.
+
+    A wait succeeds when it returns a truthy value without raising (see
+    `succeeds()` for Playwright waits that raise on timeout). Returns
+    "deadline" when none succeeds in time; pending waits are cancelled.
+    """
+    if timeout <= 0:
+        for aw in waits.values():
+            if asyncio.iscoroutine(aw):
+                aw.close()
+        return "deadline"
+
+    tasks = {asyncio.ensure_future(aw): name for name, aw in waits.items()}
+    pending = set(tasks)
+    loop = asyncio.get_running_loop()
+    expires = loop.time() + timeout
+    try:
+        while pending:
+            remaining = expires - loop.time()
+            if remaining <= 0:
+                break
+            done, pending = await asyncio.wait(
+                pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+            )
+            if not done:
+                break
+            for task in done:
+                if not task.cancelled() and task.exception() is None and task.result():
+                    return tasks[task]
+    finally:
+        for task in pending:
+            task.cancel()
+    return "deadline"
+
+
+async def scroll_until_stable(
+    page,
+    progress: Progress,
+    deadline: Deadline,
+    *,
+    label: str,
+    max_scrolls: int = 5,
+    settle: float = 1.5,
+    step_px: int = 1000,
+) -> str:
+    """Scroll to trigger lazy loading until a scroll brings nothing new.
+
+    After each scroll, waits up to `settle` seconds for `progress` to grow
+    and stops at the first scroll that yields nothing, after `max_scrolls`,
+    or when the deadline expires. Returns (and logs) the stop reason.
+    """
+    scrolls = 0
+    reason = "max scrolls"
+    while scrolls < max_scrolls:
+        if deadline.expired:
+            reason = "deadline"
+            break
+        before = progress.count
+        await page.evaluate(f"window.scrollBy(0, {step_px})")
+        scrolls += 1
+        if not await progress.wait_for_growth(
+            before, min(settle, deadline.remaining())
+        ):
+            reason = "deadline" if deadline.expired else "no new data"
+            break
+
+    logger.info(
+        "%s: stopped scrolling after %d scroll(s): %s (%d items, %.1fs)",
+        label, scrolls, reason, progress.count, deadline.elapsed(),
+    )
+    return reason
@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 
@@ -6,20 +7,29 @@ from fastapi import FastAPI
 logging.basicConfig(level=logging.INFO)
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.api.caching import etag_middleware
 from app.api.routes import crawl, dashboard, events, feedback, preferences, tags
 from app.config import settings
-from app.scheduler.scheduler import start_scheduler, stop_scheduler
+from app.services.crawl_jobs import watch_jobs
+from app.services.event_service import rebuild_indexes
 from app.services.pocketbase import pb_client
 
+logger = logging.getLogger(__name__)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     await pb_client.connect()
-    start_scheduler()
+    try:
+        await rebuild_indexes()
+    except Exception:
+        logger.warning("Search index not built, falling back to PocketBase filters")
+    # Crawls run in the worker process; follow its jobs to refresh caches
+    watcher = asyncio.create_task(watch_jobs(settings.api_job_poll_seconds))
     yield
     # Shutdown
-    stop_scheduler()
+    watcher.cancel()
 
 
 app = FastAPI(
@@ -29,12 +39,15 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+# Registered before CORS so that CORS headers also wrap 304 responses
+app.middleware("http")(etag_middleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
 app.include_router(events.router, prefix="/api/events", tags=["events"])
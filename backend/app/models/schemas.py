@@ -45,15 +45,17 @@ class EventRead(EventBase):
     id: str
     crawled_at: datetime
     hash: str
+    distance_km: float | None = None
 
     model_config = {"from_attributes": True}
 
 
 class EventListResponse(BaseModel):
     items: list[EventRead]
-    total: int
+    total: int  # -1 on cursor follow-up pages (count skipped)
     page: int
     per_page: int
+    next_cursor: str | None = None
 
 
 class SourceRead(BaseModel):
@@ -116,6 +118,23 @@ class CrawlStatusResponse(BaseModel):
     is_running: bool
     last_run: datetime | None
     last_status: str | None
+    # Queued or running crawl job, if any
+    job_id: str | None = None
+    job_status: str | None = None
+
+
+class CrawlJobRead(BaseModel):
+    id: str
+    trigger: str = ""
+    status: str
+    sources: list[str] | None = None
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    error_message: str = ""
+    cancel_requested: bool = False
+    # Per-source/per-stage counters, totals and ETA written by the worker
+    progress: dict | None = None
 
 
 class FeedbackCreate(BaseModel):
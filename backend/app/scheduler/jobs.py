@@ -1,18 +1,29 @@
+import asyncio
 import logging
 import re
+from collections import defaultdict
+from collections.abc import Collection
+from dataclasses import dataclass
 from datetime import datetime
 
+from app.config import settings
 from app.crawlers.base import BaseCrawler, CrawledEvent
+from app.crawlers.browser_pool import browser_pool
 from app.ai.feedback_analyzer import analyze_feedbacks
 from app.ai.tagger import tag_event
 from app.ai.scorer import refresh_learned_preferences, score_event
 from app.ai.summarizer import summarize_event
+from app.services.crawl_progress import CrawlCancelled, JobProgress
 from app.services.dedup import event_exists, find_similar_event, purge_duplicates
 from app.services.pocketbase import compute_event_hash, pb_client
+from app.services.sources import is_due, list_sources, record_source_run
 from app.services.url_checker import check_source_url
 
 logger = logging.getLogger(__name__)
 
+# Crawled events waiting for dedup/enrichment; crawlers pause when it is full
+EVENT_QUEUE_SIZE = 100
+
 # Keyword blocklist — events matching any of these (case-insensitive, in title
 # or description) are silently dropped before AI enrichment.
 _BLOCKED_PATTERNS: list[re.Pattern] = [
@@ -64,8 +75,8 @@ def _is_blocked(event: CrawledEvent) -> bool:
     return any(p.search(text) for p in _BLOCKED_PATTERNS)
 
 
-def _get_active_crawlers() -> list[BaseCrawler]:
-    """Import and return all active crawlers."""
+def _get_active_crawlers(sources: Collection[str] | None = None) -> list[BaseCrawler]:
+    """Import and return the active crawlers (only `sources` if given)."""
     from app.crawlers.shotgun import ShotgunCrawler
     from app.crawlers.nicefr import NiceFrCrawler
     from app.crawlers.flight_deals import FlightDealsCrawler
@@ -75,7 +86,7 @@ def _get_active_crawlers() -> list[BaseCrawler]:
     from app.crawlers.lino_ventura import LinoVenturaCrawler
     from app.crawlers.asmonaco import ASMonacoCrawler
 
-    return [
+    crawlers = [
         NiceFrCrawler(),
         ShotgunCrawler(),
         FlightDealsCrawler(),
@@ -85,170 +96,219 @@ def _get_active_crawlers() -> list[BaseCrawler]:
         LinoVenturaCrawler(),
         EventbriteCrawler(),
     ]
+    if sources is None:
+        return crawlers
+    return [c for c in crawlers if c.source_name in sources]
 
 
-async def run_crawl_pipeline():
-    """Main crawl pipeline: fetch → dedup → enrich → store."""
-    logger.info("Starting crawl pipeline")
+async def due_sources(
+    now: datetime | None = None, exclude: Collection[str] = ()
+) -> list[str]:
+    """Sources whose crawl interval has elapsed since their last crawl."""
+    known = await list_sources()
+    now = now or datetime.now()
+    return [
+        c.source_name
+        for c in _get_active_crawlers()
+        if c.source_name not in exclude
+        and is_due(known.get(c.source_name), c.default_interval_hours, now)
+    ]
 
-    # Analyse feedbacks and refresh learned preferences before scoring
-    try:
-        await analyze_feedbacks()
-    except Exception:
-        logger.exception("Feedback analysis failed, continuing with default profile")
-    try:
-        await refresh_learned_preferences()
-    except Exception:
-        logger.exception("Failed to refresh learned preferences cache")
 
-    crawlers = _get_active_crawlers()
-    total_found = 0
-    total_new = 0
+@dataclass
+class _SourceDone:
+    """Queue marker: a crawler has yielded its last event."""
+
+    source_name: str
+    started_at: datetime
+    events_found: int
+    error_msg: str = ""
+
 
+async def _produce_events(
+    crawlers: list[BaseCrawler], queue: asyncio.Queue, progress: JobProgress
+) -> None:
+    """Run the crawlers in turn, queueing their events as they are yielded.
+
+    Each crawler's events are followed by a _SourceDone marker, and the
+    whole run by None. No further source is started once cancellation
+    was requested.
+    """
     for crawler in crawlers:
-        source_name = crawler.source_name
+        if progress.cancel_requested:
+            break
         started_at = datetime.now()
-        events_found = 0
-        events_new = 0
+        found = 0
         error_msg = ""
-        status = "success"
-
+        progress.start_source(crawler.source_name)
         try:
-            raw_events = await crawler.crawl()
-            events_found = len(raw_events)
-
-            now = datetime.now()
-
-            for raw in raw_events:
-                # Skip past events
-                if raw.date_start < now:
-                    continue
-
-                # Dedup: exact hash match
-                if await event_exists(
-                    raw.title, raw.date_start.isoformat(), raw.location_name
-                ):
-                    continue
-
-                # Dedup: fuzzy title match on same date
-                if await find_similar_event(
-                    raw.title, raw.date_start.isoformat()
-                ):
-                    continue
-
-                # Blocklist: skip events matching blocked keywords
-                if _is_blocked(raw):
-                    logger.info("Blocked event: %s", raw.title)
-                    continue
-
-                # Validate source URL before enriching
-                if not await check_source_url(raw.source_url):
-                    logger.info("Skipping event with dead URL: %s", raw.title)
-                    continue
-
-                # Enrich with AI
-                tags = await tag_event(raw)
-                interest = await score_event(raw, tags)
-                summary = await summarize_event(raw)
-
-                # Ligue 1 scoring for football matches — use fixed base + tier bonus
-                # instead of raw AI score to ensure consistent differentiation.
-                if (
-                    source_name in ("ogcn", "asmonaco")
-                    and "sport_match" in tags.get("type", [])
-                ):
-                    from app.data.ligue1 import get_opponent_bonus
-
-                    opponent_name = _extract_opponent(raw.title)
-                    bonus = get_opponent_bonus(opponent_name)
-                    interest = min(100, 70 + bonus)
-                    logger.info(
-                        "Ligue 1 score: 70 + %d = %d for %s (opponent: %s)",
-                        bonus, interest, raw.title, opponent_name,
-                    )
-
-                # Sold-out flag from crawler
-                if raw.is_sold_out:
-                    excl = tags.get("exclusivity", [])
-                    if "sold_out" not in excl:
-                        excl.append("sold_out")
-                    tags["exclusivity"] = excl
-
-                # Store
-                event_hash = compute_event_hash(
-                    raw.title, raw.date_start.isoformat(), raw.location_name
-                )
-
-                await pb_client.create_record(
-                    "events",
-                    {
-                        "title": raw.title,
-                        "description": raw.description,
-                        "summary": summary,
-                        "date_start": raw.date_start.isoformat(),
-                        "date_end": raw.date_end.isoformat() if raw.date_end else None,
-                        "location_name": raw.location_name,
-                        "location_city": raw.location_city,
-                        "location_address": raw.location_address,
-                        "latitude": raw.latitude,
-                        "longitude": raw.longitude,
-                        "price_min": raw.price_min,
-                        "price_max": raw.price_max,
-                        "currency": raw.currency,
-                        "source_url": raw.source_url,
-                        "source_name": source_name,
-                        "image_url": raw.image_url,
-                        "tags_type": tags.get("type", []),
-                        "tags_vibe": tags.get("vibe", []),
-                        "tags_energy": tags.get("energy", []),
-                        "tags_budget": tags.get("budget", []),
-                        "tags_time": tags.get("time", []),
-                        "tags_exclusivity": tags.get("exclusivity", []),
-                        "tags_location": tags.get("location", []),
-                        "tags_audience": tags.get("audience", []),
-                        "tags_deals": tags.get("deals", []),
-                        "tags_meta": tags.get("meta", []),
-                        "interest_score": interest,
-                        "is_featured": interest >= 80,
-                        "status": "published",
-                        "crawled_at": datetime.now().isoformat(),
-                        "hash": event_hash,
-                    },
-                )
-                events_new += 1
-
+            async for raw in crawler.iter_events():
+                found += 1
+                progress.add(crawler.source_name, "found")
+                await queue.put((crawler.source_name, raw))
         except Exception as e:
-            logger.exception("Crawl failed for %s", source_name)
-            status = "error"
+            logger.exception("Crawl failed for %s", crawler.source_name)
             error_msg = str(e)
+        await queue.put(
+            _SourceDone(crawler.source_name, started_at, found, error_msg)
+        )
+    await queue.put(None)
 
-        # Log crawl result
-        try:
-            await pb_client.create_record(
-                "crawl_logs",
-                {
-                    "source": source_name,
-                    "started_at": started_at.isoformat(),
-                    "finished_at": datetime.now().isoformat(),
-                    "status": status,
-                    "events_found": events_found,
-                    "events_new": events_new,
-                    "error_message": error_msg,
-                },
-            )
-        except Exception:
-            logger.exception("Failed to log crawl result")
 
-        total_found += events_found
-        total_new += events_new
+async def _process_event(
+    source_name: str, raw: CrawledEvent, progress: JobProgress
+) -> bool:
+    """Dedup, filter, enrich and store one crawled event.
 
-    # Expire past events still marked as published
+    Returns True if a new event record was created.
+    """
+    # Skip past events
+    if raw.date_start < datetime.now():
+        progress.add(source_name, "skipped")
+        return False
+
+    # Dedup: exact hash match
+    if await event_exists(
+        raw.title, raw.date_start.isoformat(), raw.location_name
+    ):
+        progress.add(source_name, "deduped")
+        return False
+
+    # Dedup: fuzzy title match on same date
+    if await find_similar_event(
+        raw.title, raw.date_start.isoformat()
+    ):
+        progress.add(source_name, "deduped")
+        return False
+
+    # Blocklist: skip events matching blocked keywords
+    if _is_blocked(raw):
+        logger.info("Blocked event: %s", raw.title)
+        progress.add(source_name, "blocked")
+        return False
+
+    # Validate source URL before enriching
+    if not await check_source_url(raw.source_url):
+        logger.info("Skipping event with dead URL: %s", raw.title)
+        progress.add(source_name, "skipped")
+        return False
+
+    # Enrich with AI
+    tags = await tag_event(raw)
+    interest = await score_event(raw, tags)
+    summary = await summarize_event(raw)
+    progress.add(source_name, "enriched")
+
+    # Ligue 1 scoring for football matches — use fixed base + tier bonus
+    # instead of raw AI score to ensure consistent differentiation.
+    if (
+        source_name in ("ogcn", "asmonaco")
+        and "sport_match" in tags.get("type", [])
+    ):
+        from app.data.ligue1 import get_opponent_bonus
+
+        opponent_name = _extract_opponent(raw.title)
+        bonus = get_opponent_bonus(opponent_name)
+        interest = min(100, 70 + bonus)
+        logger.info(
+            "Ligue 1 score: 70 + %d = %d for %s (opponent: %s)",
+            bonus, interest, raw.title, opponent_name,
+        )
+
+    # Sold-out flag from crawler
+    if raw.is_sold_out:
+        excl = tags.get("exclusivity", [])
+        if "sold_out" not in excl:
+            excl.append("sold_out")
+        tags["exclusivity"] = excl
+
+    # Store
+    event_hash = compute_event_hash(
+        raw.title, raw.date_start.isoformat(), raw.location_name
+    )
+
+    await pb_client.create_record(
+        "events",
+        {
+            "title": raw.title,
+            "description": raw.description,
+            "summary": summary,
+            "date_start": raw.date_start.isoformat(),
+            "date_end": raw.date_end.isoformat() if raw.date_end else None,
+            "location_name": raw.location_name,
+            "location_city": raw.location_city,
+            "location_address": raw.location_address,
+            "latitude": raw.latitude,
+            "longitude": raw.longitude,
+            "price_min": raw.price_min,
+            "price_max": raw.price_max,
+            "currency": raw.currency,
+            "source_url": raw.source_url,
+            "source_name": source_name,
+            "image_url": raw.image_url,
+            "tags_type": tags.get("type", []),
+            "tags_vibe": tags.get("vibe", []),
+            "tags_energy": tags.get("energy", []),
+            "tags_budget": tags.get("budget", []),
+            "tags_time": tags.get("time", []),
+            "tags_exclusivity": tags.get("exclusivity", []),
+            "tags_location": tags.get("location", []),
+            "tags_audience": tags.get("audience", []),
+            "tags_deals": tags.get("deals", []),
+            "tags_meta": tags.get("meta", []),
+            "interest_score": interest,
+            "is_featured": interest >= 80,
+            "status": "published",
+            "crawled_at": datetime.now().isoformat(),
+            "hash": event_hash,
+        },
+    )
+    progress.add(source_name, "stored")
+    return True
+
+
+async def _log_crawl_result(
+    done: _SourceDone, events_new: int, error_msg: str
+) -> None:
     try:
-        expired_past = await _expire_past_events()
-        if expired_past:
-            logger.info("Expired %d past events", expired_past)
+        await pb_client.create_record(
+            "crawl_logs",
+            {
+                "source": done.source_name,
+                "started_at": done.started_at.isoformat(),
+                "finished_at": datetime.now().isoformat(),
+                "status": "error" if error_msg else "success",
+                "events_found": done.events_found,
+                "events_new": events_new,
+                "error_message": error_msg,
+            },
+        )
     except Exception:
-        logger.exception("Failed to expire past events")
+        logger.exception("Failed to log crawl result")
+
+
+async def _run_maintenance() -> None:
+    """Post-crawl passes over the whole database."""
+    # Archive raw flight prices first: compaction deletes them, and the
+    # archive is where backtests and analyses read full history from
+    try:
+        from app.analytics.archive import DATASETS, export_dataset
+
+        await export_dataset(DATASETS["flight_prices"])
+    except Exception:
+        logger.exception("Flight price archive failed, skipping compaction")
+    else:
+        # Roll old flight prices into daily per-route aggregates
+        try:
+            from app.services.flight_deals import compact_flight_prices
+
+            compacted = await compact_flight_prices(
+                settings.flight_price_compact_after_days
+            )
+            if compacted:
+                logger.info("Compacted %d old flight prices", compacted)
+        except Exception:
+            logger.exception("Flight price compaction failed")
 
     # Post-crawl dedup pass to catch any remaining duplicates
     try:
@@ -268,6 +328,132 @@ async def run_crawl_pipeline():
     except Exception:
         logger.exception("Post-crawl URL check failed")
 
+
+async def _record_source_run(
+    crawler: BaseCrawler, events_new: int, error_msg: str
+) -> None:
+    try:
+        await record_source_run(
+            crawler.source_name,
+            events_new,
+            crawler.default_interval_hours,
+            adapt=crawler.adaptive_interval and not error_msg,
+        )
+    except Exception:
+        logger.exception("Failed to update schedule of %s", crawler.source_name)
+
+
+async def run_crawl_pipeline(
+    sources: Collection[str] | None = None,
+    maintenance: bool = True,
+    job_id: str | None = None,
+):
+    """Main crawl pipeline: fetch → dedup → enrich → store.
+
+    Crawlers run in a producer task feeding a bounded queue, so events are
+    deduplicated and enriched while later pages are still being fetched.
+    Runs in the worker process: the API's search index is rebuilt by
+    crawl_jobs.watch_jobs once the job finishes.
+
+    Args:
+        sources: Source names to crawl; all active crawlers if None.
+        maintenance: Also run feedback analysis and the post-crawl
+            dedup, dead-URL and flight price compaction passes.
+        job_id: crawl_jobs record receiving live progress; its
+            cancel_requested flag is checked between events and sources.
+
+    Raises:
+        CrawlCancelled: The job was cancelled; the run stops without the
+            post-crawl passes.
+    """
+    logger.info(
+        "Starting crawl pipeline (%s)",
+        ", ".join(sorted(sources)) if sources is not None else "all sources",
+    )
+
+    # Analyse feedbacks and refresh learned preferences before scoring
+    if maintenance:
+        try:
+            await analyze_feedbacks()
+        except Exception:
+            logger.exception(
+                "Feedback analysis failed, continuing with default profile"
+            )
+    try:
+        await refresh_learned_preferences()
+    except Exception:
+        logger.exception("Failed to refresh learned preferences cache")
+
+    crawlers = _get_active_crawlers(sources)
+    by_name = {c.source_name: c for c in crawlers}
+    progress = JobProgress(job_id, list(by_name))
+    total_found = 0
+    total_new = 0
+    events_new: dict[str, int] = defaultdict(int)
+    # First event-processing error per source, reported in its crawl log
+    errors: dict[str, str] = {}
+
+    queue: asyncio.Queue = asyncio.Queue(maxsize=EVENT_QUEUE_SIZE)
+    producer = asyncio.create_task(_produce_events(crawlers, queue, progress))
+    try:
+        await progress.checkpoint(force=True)
+        while (item := await queue.get()) is not None:
+            if isinstance(item, _SourceDone):
+                new = events_new.pop(item.source_name, 0)
+                error_msg = errors.pop(item.source_name, "")
+                progress.finish_source(item.source_name, item.error_msg)
+                await _log_crawl_result(item, new, item.error_msg or error_msg)
+                await _record_source_run(
+                    by_name[item.source_name], new, item.error_msg
+                )
+                total_found += item.events_found
+                total_new += new
+                await progress.checkpoint(force=True)
+                continue
+
+            source_name, raw = item
+            try:
+                if await _process_event(source_name, raw, progress):
+                    events_new[source_name] += 1
+            except Exception as e:
+                logger.exception(
+                    "Failed to process %s event: %s", source_name, raw.title
+                )
+                progress.add(source_name, "errors")
+                errors.setdefault(source_name, str(e))
+            await progress.checkpoint()
+    except CrawlCancelled:
+        logger.info("Crawl cancelled after %d new events", total_new)
+        await progress.flush(force=True)
+        try:
+            await browser_pool.stop()
+        except Exception:
+            logger.exception("Failed to stop browser pool")
+        raise
+    finally:
+        if not producer.done():
+            producer.cancel()
+        await asyncio.gather(producer, return_exceptions=True)
+    await progress.flush(force=True)
+
+    # Expire past events still marked as published
+    try:
+        expired_past = await _expire_past_events()
+        if expired_past:
+            logger.info("Expired %d past events", expired_past)
+    except Exception:
+        logger.exception("Failed to expire past events")
+
+    # The browser is only needed while crawling; don't keep Chromium
+    # around until the next run
+    try:
+        await browser_pool.stop()
+    except Exception:
+        logger.exception("Failed to stop browser pool")
+
+    if maintenance:
+        await _run_maintenance()
+
     logger.info(
         "Crawl pipeline complete: %d found, %d new", total_found, total_new
     )
@@ -286,6 +472,7 @@ async def recalibrate_match_scores() -> int:
     then adds a tier-based bonus (+15 for Tier 1, +10 Tier 2, +5 Tier 3, +0 Tier 4).
     """
     from app.data.ligue1 import get_opponent_bonus
+    from app.services.event_service import index_record
 
     updated = 0
     base_score = 70
@@ -312,7 +499,7 @@ async def recalibrate_match_scores() -> int:
             old_score = item.get("interest_score", 0)
 
             if new_score != old_score:
-                await pb_client.update_record(
+                updated_record = await pb_client.update_record(
                     "events",
                     item["id"],
                     {
@@ -320,6 +507,7 @@ async def recalibrate_match_scores() -> int:
                         "is_featured": new_score >= 80,
                     },
                 )
+                index_record(updated_record)
                 logger.info(
                     "Recalibrated %s: %d → %d (opponent=%s, bonus=+%d)",
                     item["title"], old_score, new_score, opponent, bonus,
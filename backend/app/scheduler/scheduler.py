@@ -1,47 +1,126 @@
 import asyncio
 import logging
+from collections.abc import Collection
 
-from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
 
 from app.config import settings
 
 logger = logging.getLogger(__name__)
 
-_scheduler: BackgroundScheduler | None = None
+_scheduler: AsyncIOScheduler | None = None
 
+# Held by the running crawl
+_crawl_lock = asyncio.Lock()
+_crawl_task: asyncio.Task | None = None
 
-def _run_crawl_sync():
-    """Sync wrapper to run async crawl pipeline from APScheduler."""
+
+def crawl_running() -> bool:
+    return _crawl_lock.locked()
+
+
+async def run_crawl_once(
+    sources: Collection[str] | None = None,
+    maintenance: bool = True,
+    job_id: str | None = None,
+) -> bool:
+    """Run the crawl pipeline unless one is already running.
+
+    Returns False when the run was skipped because another crawl holds
+    the lock.
+    """
+    global _crawl_task
     from app.scheduler.jobs import run_crawl_pipeline
 
-    loop = asyncio.new_event_loop()
+    if _crawl_lock.locked():
+        logger.info("Crawl already running, skipping")
+        return False
+    async with _crawl_lock:
+        _crawl_task = asyncio.current_task()
+        try:
+            await run_crawl_pipeline(sources, maintenance, job_id)
+        finally:
+            _crawl_task = None
+    return True
+
+
+async def _queue_due_sources(maintenance: bool) -> None:
+    """Queue a crawl of the sources whose interval has elapsed.
+
+    The daily run always queues, for its maintenance passes, even when no
+    source is due.
+    """
+    from app.scheduler.jobs import due_sources
+    from app.services import crawl_jobs
+
     try:
-        loop.run_until_complete(run_crawl_pipeline())
+        running = await crawl_jobs.running_job()
+        exclude: list[str] = []
+        if running:
+            if running.get("sources") is None:
+                return  # Everything is being crawled already
+            exclude = running["sources"]
+        due = await due_sources(exclude=exclude)
+        if due or maintenance:
+            await crawl_jobs.enqueue(
+                trigger="schedule", sources=due, maintenance=maintenance
+            )
     except Exception:
-        logger.exception("Scheduled crawl failed")
-    finally:
-        loop.close()
+        logger.exception("Failed to queue scheduled crawl")
 
 
 def start_scheduler():
+    """Schedule source and maintenance crawls on the running event loop."""
     global _scheduler
-    _scheduler = BackgroundScheduler()
+    _scheduler = AsyncIOScheduler(
+        job_defaults={
+            # A run missed while the app was down or busy is run once, late
+            "coalesce": True,
+            "max_instances": 1,
+            "misfire_grace_time": settings.crawl_misfire_grace_seconds,
+        }
+    )
+    _scheduler.add_job(
+        _queue_due_sources,
+        trigger=IntervalTrigger(minutes=settings.crawl_tick_minutes),
+        kwargs={"maintenance": False},
+        id="due_sources",
+        name="Crawl due sources",
+        replace_existing=True,
+    )
     _scheduler.add_job(
-        _run_crawl_sync,
+        _queue_due_sources,
         trigger=CronTrigger(hour=settings.crawl_schedule_hour, minute=0),
+        kwargs={"maintenance": True},
         id="daily_crawl",
-        name="Daily event crawl",
+        name="Daily maintenance crawl",
         replace_existing=True,
     )
     _scheduler.start()
     logger.info(
-        "Scheduler started — daily crawl at %02d:00", settings.crawl_schedule_hour
+        "Scheduler started — due sources every %d min, maintenance at %02d:00",
+        settings.crawl_tick_minutes,
+        settings.crawl_schedule_hour,
     )
 
 
-def stop_scheduler():
+async def stop_scheduler():
+    """Stop scheduling and cancel the running crawl, waiting for its cleanup."""
     global _scheduler
     if _scheduler:
         _scheduler.shutdown(wait=False)
+        _scheduler = None
         logger.info("Scheduler stopped")
+
+    task = _crawl_task
+    if task is not None and not task.done():
+        task.cancel()
+        _, pending = await asyncio.wait(
+            {task}, timeout=settings.crawl_shutdown_timeout_seconds
+        )
+        if pending:
+            logger.warning("Crawl still running after cancellation, giving up")
+        else:
+            logger.info("Running crawl cancelled")
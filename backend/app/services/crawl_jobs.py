@@ -0,0 +1,203 @@
+"""Crawl job queue stored in the PocketBase crawl_jobs collection.
+
+The API enqueues jobs and reads their status; the worker process
+(python -m app.worker) claims them oldest first and runs the pipeline.
+A single worker is expected: claiming is not atomic across workers.
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+
+from app.services import data_version
+from app.services.pocketbase import pb_client
+
+logger = logging.getLogger(__name__)
+
+COLLECTION = "crawl_jobs"
+ACTIVE_STATUSES = ("queued", "running")
+FINISHED_STATUSES = ("success", "error", "cancelled")
+
+
+def _status_filter(statuses: tuple[str, ...]) -> str:
+    return " || ".join(f'status = "{s}"' for s in statuses)
+
+
+async def _first(filter_str: str, sort: str) -> dict | None:
+    result = await pb_client.list_records(
+        COLLECTION, page=1, per_page=1, sort=sort, filter_str=filter_str,
+        skip_total=True,
+    )
+    items = result.get("items", [])
+    return items[0] if items else None
+
+
+async def active_job() -> dict | None:
+    """The queued or running job, if any."""
+    return await _first(_status_filter(ACTIVE_STATUSES), sort="created_at")
+
+
+async def latest_job(finished: bool = False) -> dict | None:
+    """The most recently created job (finished ones only if asked)."""
+    filter_str = _status_filter(FINISHED_STATUSES) if finished else ""
+    return await _first(filter_str, sort="-created_at")
+
+
+async def running_job() -> dict | None:
+    return await _first('status = "running"', sort="started_at")
+
+
+def _merge_sources(
+    current: list[str] | None, extra: list[str] | None
+) -> list[str] | None:
+    """Union of two source lists, None standing for every source."""
+    if current is None or extra is None:
+        return None
+    return sorted(set(current) | set(extra))
+
+
+async def enqueue(
+    trigger: str = "api",
+    sources: list[str] | None = None,
+    maintenance: bool = True,
+) -> tuple[dict, bool]:
+    """Queue a crawl of `sources` (None: every source).
+
+    A job still waiting in the queue absorbs the request (sources merged,
+    maintenance kept if either asks). While a job runs, API requests get
+    the running job back; scheduled ones queue behind it.
+
+    Returns (job, created).
+    """
+    queued = await _first('status = "queued"', sort="created_at")
+    if queued:
+        merged = {
+            "sources": _merge_sources(queued.get("sources"), sources),
+            "maintenance": bool(queued.get("maintenance")) or maintenance,
+        }
+        if merged != {
+            "sources": queued.get("sources"),
+            "maintenance": bool(queued.get("maintenance")),
+        }:
+            queued = await pb_client.update_record(COLLECTION, queued["id"], merged)
+        return queued, False
+
+    if trigger == "api":
+        running = await running_job()
+        if running:
+            return running, False
+
+    job = await pb_client.create_record(
+        COLLECTION,
+        {
+            "trigger": trigger,
+            "status": "queued",
+            "created_at": datetime.now().isoformat(),
+            "sources": sources,
+            "maintenance": maintenance,
+        },
+    )
+    logger.info("Queued %s crawl job %s", trigger, job.get("id"))
+    return job, True
+
+
+async def claim_next(worker: str) -> dict | None:
+    """Mark the oldest queued job as running for this worker."""
+    job = await _first('status = "queued"', sort="created_at")
+    if job is None:
+        return None
+    return await pb_client.update_record(
+        COLLECTION,
+        job["id"],
+        {
+            "status": "running",
+            "started_at": datetime.now().isoformat(),
+            "worker": worker,
+        },
+    )
+
+
+async def get_job(job_id: str) -> dict:
+    return await pb_client.get_record(COLLECTION, job_id)
+
+
+async def request_cancel(job_id: str) -> dict:
+    """Ask for a job to stop.
+
+    A queued job is cancelled at once; a running one gets its
+    cancel_requested flag set and stops at the worker's next checkpoint.
+    """
+    job = await get_job(job_id)
+    if job.get("status") == "queued":
+        return await finish(job_id, "cancelled", "cancelled before start")
+    if job.get("status") == "running":
+        return await pb_client.update_record(
+            COLLECTION, job_id, {"cancel_requested": True}
+        )
+    return job
+
+
+async def finish(job_id: str, status: str, error_message: str = "") -> dict:
+    return await pb_client.update_record(
+        COLLECTION,
+        job_id,
+        {
+            "status": status,
+            "finished_at": datetime.now().isoformat(),
+            "error_message": error_message[:500],
+        },
+    )
+
+
+async def fail_abandoned() -> int:
+    """Close jobs left running by a worker that died mid-crawl."""
+    result = await pb_client.list_records(
+        COLLECTION, per_page=50, filter_str='status = "running"', skip_total=True
+    )
+    jobs = result.get("items", [])
+    for job in jobs:
+        await finish(job["id"], "error", "worker restarted")
+    if jobs:
+        logger.warning("Marked %d abandoned crawl jobs as failed", len(jobs))
+    return len(jobs)
+
+
+async def watch_jobs(interval: float) -> None:
+    """Keep the API in step with crawls run by the worker process.
+
+    The worker's writes don't go through this process. The running job is
+    tracked by id: the data version is bumped when it starts and whenever
+    the worker reports progress (updated_at), and the search indexes are
+    rebuilt once it leaves the running state. A job that ran entirely
+    between two polls shows up as a new most recently finished job.
+    """
+    from app.services.event_service import rebuild_indexes
+
+    running_id: str | None = None
+    reported: str | None = None
+    last_done: tuple[str, str] | None = None
+    first_poll = True
+    while True:
+        try:
+            job = await running_job()
+            done = await _first(
+                _status_filter(FINISHED_STATUSES), sort="-finished_at"
+            )
+            done_key = (done["id"], done.get("finished_at", "")) if done else None
+            ended = running_id is not None and (
+                job is None or job["id"] != running_id
+            )
+            if not first_poll and (ended or done_key != last_done):
+                data_version.bump()
+                await rebuild_indexes()
+            elif job and (
+                job["id"] != running_id or job.get("updated_at") != reported
+            ):
+                data_version.bump()
+            running_id = job["id"] if job else None
+            reported = job.get("updated_at") if job else None
+            last_done = done_key
+            first_poll = False
+        except Exception:
+            logger.warning("Crawl job poll failed", exc_info=True)
+        await asyncio.sleep(interval)
@@ -0,0 +1,117 @@
+"""Live progress of a crawl job, written to its crawl_jobs record.
+
+The pipeline counts each source's events through the stages below and
+calls checkpoint() between events and sources. Checkpoints write the
+counters at most every FLUSH_INTERVAL seconds, and the update's response
+carries the record's cancel_requested flag: once an operator sets it,
+the next checkpoint raises CrawlCancelled.
+"""
+
+import logging
+import time
+from datetime import datetime
+
+from app.services.pocketbase import pb_client
+
+logger = logging.getLogger(__name__)
+
+COLLECTION = "crawl_jobs"
+
+# found: yielded by the crawler; deduped: already stored (hash or fuzzy);
+# blocked: keyword blocklist; skipped: past event or dead URL;
+# enriched: tagged/scored/summarised by AI; stored: new event record
+STAGES = ("found", "deduped", "blocked", "skipped", "enriched", "stored", "errors")
+
+# Minimum seconds between two progress writes
+FLUSH_INTERVAL = 2.0
+
+
+def _empty_source() -> dict:
+    return {"status": "pending", **dict.fromkeys(STAGES, 0)}
+
+
+class CrawlCancelled(Exception):
+    """Raised at a checkpoint once cancellation was requested."""
+
+
+class JobProgress:
+    """Per-source, per-stage counters of one crawl run.
+
+    Args:
+        job_id: crawl_jobs record to report to; None only counts.
+        sources: Source names the run will crawl, in order.
+    """
+
+    def __init__(self, job_id: str | None, sources: list[str]):
+        self.job_id = job_id
+        self.sources = {name: _empty_source() for name in sources}
+        self.cancel_requested = False
+        self._started = time.monotonic()
+        self._source_started: dict[str, float] = {}
+        self._last_flush = 0.0
+
+    def start_source(self, name: str) -> None:
+        self.sources.setdefault(name, _empty_source())
+        self.sources[name]["status"] = "running"
+        self._source_started[name] = time.monotonic()
+
+    def finish_source(self, name: str, error: str = "") -> None:
+        source = self.sources[name]
+        source["status"] = "error" if error else "done"
+        source["seconds"] = round(
+            time.monotonic() - self._source_started.get(name, self._started), 1
+        )
+
+    def add(self, source: str, stage: str, n: int = 1) -> None:
+        self.sources[source][stage] += n
+
+    def totals(self) -> dict[str, int]:
+        return {
+            stage: sum(s[stage] for s in self.sources.values()) for stage in STAGES
+        }
+
+    def eta_seconds(self) -> float | None:
+        """Remaining time, from the average duration of finished sources."""
+        finished = [s for s in self.sources.values() if s["status"] in ("done", "error")]
+        remaining = len(self.sources) - len(finished)
+        if not remaining:
+            return 0.0
+        if not finished:
+            return None
+        elapsed = time.monotonic() - self._started
+        return round(elapsed / len(finished) * remaining, 1)
+
+    def snapshot(self) -> dict:
+        return {
+            "sources": self.sources,
+            "totals": self.totals(),
+            "sources_done": sum(
+                s["status"] in ("done", "error") for s in self.sources.values()
+            ),
+            "sources_total": len(self.sources),
+            "elapsed_seconds": round(time.monotonic() - self._started, 1),
+            "eta_seconds": self.eta_seconds(),
+        }
+
+    async def flush(self, force: bool = False) -> None:
+        """Write the counters to the job record (throttled unless forced)."""
+        now = time.monotonic()
+        if self.job_id is None or (not force and now - self._last_flush < FLUSH_INTERVAL):
+            return
+        self._last_flush = now
+        try:
+            record = await pb_client.update_record(
+                COLLECTION,
+                self.job_id,
+                {"progress": self.snapshot(), "updated_at": datetime.now().isoformat()},
+            )
+        except Exception:
+            logger.warning("Failed to report crawl progress", exc_info=True)
+            return
+        self.cancel_requested = bool(record.get("cancel_requested"))
+
+    async def checkpoint(self, force: bool = False) -> None:
+        """Report progress and stop the run if cancellation was requested."""
+        await self.flush(force)
+        if self.cancel_requested:
+            raise CrawlCancelled(f"crawl job {self.job_id} cancelled")
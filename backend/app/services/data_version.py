@@ -0,0 +1,24 @@
+import threading
+import time
+
+# Collections whose writes change what the read endpoints return
+VERSIONED_COLLECTIONS = {"events", "sources", "crawl_logs", "user_preferences"}
+
+# Distinguishes counters across restarts, since the counter starts at 0
+BOOT_ID = format(int(time.time()), "x")
+
+_lock = threading.Lock()
+_version = 0
+
+
+def current() -> int:
+    """Return the current data version."""
+    return _version
+
+
+def bump() -> int:
+    """Record a data change and return the new version."""
+    global _version
+    with _lock:
+        _version += 1
+        return _version
@@ -0,0 +1,209 @@
+"""Vectorized flight deal scoring.
+
+Baselines are computed per route × days-to-departure bucket from the whole
+flight_prices history in one NumPy pass: median, 10th/25th percentiles
+and MAD. Every route also gets a route-wide group, used when its
+bucket has too few prices. A price is a deal when its robust z-score
+((price - median) / (1.4826 × MAD)) or its percentile rank within the
+group is low enough.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+
+import numpy as np
+
+# Days-to-departure bucket edges: [0, 7), [7, 14), [14, 30), [30, 60), 60+
+DTD_EDGES = np.array([7, 14, 30, 60])
+N_BUCKETS = len(DTD_EDGES) + 1
+# Bucket index of the route-wide group
+ALL_BUCKETS = N_BUCKETS
+
+# MAD → standard deviation for normally distributed prices
+MAD_SCALE = 1.4826
+
+
+@dataclass(frozen=True)
+class DealScore:
+    """Verdict for one price against its route's baseline."""
+
+    is_deal: bool
+    baseline: float | None = None  # median price of the group
+    discount_percent: float | None = None
+    zscore: float | None = None
+    percentile_rank: float | None = None  # % of past prices strictly lower
+
+
+def days_until(departure: datetime, crawled_at: datetime) -> int:
+    return (departure.date() - crawled_at.date()).days
+
+
+def _dtd_bucket(days_to_departure: np.ndarray) -> np.ndarray:
+    return np.searchsorted(DTD_EDGES, days_to_departure, side="right")
+
+
+def _to_days(values: list[str]) -> np.ndarray:
+    return np.array([v[:10] for v in values], dtype="datetime64[D]")
+
+
+def _to_seconds(values: list[str]) -> np.ndarray:
+    return np.array(
+        [v[:19].replace(" ", "T") for v in values], dtype="datetime64[s]"
+    )
+
+
+class PriceBaselines:
+    """Per-(route, days-to-departure bucket) price baselines.
+
+    Args:
+        routes: Route code of each historical price.
+        days_to_departure: Days between crawl and departure, per price.
+        prices: Historical prices.
+    """
+
+    def __init__(
+        self,
+        routes: np.ndarray,
+        days_to_departure: np.ndarray,
+        prices: np.ndarray,
+    ):
+        self.routes, route_idx = np.unique(np.asarray(routes), return_inverse=True)
+        prices = np.asarray(prices, dtype=float)
+        n_groups = len(self.routes) * (N_BUCKETS + 1)
+
+        # Every price counts in its own bucket and in the route-wide group
+        fine = route_idx * (N_BUCKETS + 1) + _dtd_bucket(days_to_departure)
+        coarse = route_idx * (N_BUCKETS + 1) + ALL_BUCKETS
+        keys = np.concatenate([fine, coarse])
+        values = np.concatenate([prices, prices])
+
+        self.counts = np.bincount(keys, minlength=n_groups)
+        self.starts = np.concatenate([[0], np.cumsum(self.counts)[:-1]])
+
+        # Sorted by group, then price: order statistics are index arithmetic
+        order = np.lexsort((values, keys))
+        self._sorted = values[order]
+        self.median = self._quantile(self._sorted, 0.5)
+        self.p10 = self._quantile(self._sorted, 0.10)
+        self.p25 = self._quantile(self._sorted, 0.25)
+
+        # Median absolute deviation: the same trick on |price - median|
+        deviations = np.abs(values - self.median[keys])
+        self.mad = self._quantile(deviations[np.lexsort((deviations, keys))], 0.5)
+
+        mean = self._group_mean(keys, values)
+        sq = self._group_mean(keys, values**2)
+        self.std = np.sqrt(np.maximum(sq - mean**2, 0.0))
+
+        # Group-offset prices, searchable for percentile ranks in one call
+        self._span = (self._sorted.max() + 1.0) if len(self._sorted) else 1.0
+        self._keyed = np.repeat(np.arange(n_groups), self.counts) * self._span
+        self._keyed = self._keyed + self._sorted
+
+    @classmethod
+    def from_records(cls, records: list[dict]) -> "PriceBaselines":
+        """Build baselines from flight_prices records."""
+        records = [
+            r for r in records
+            if r.get("price") and r.get("departure_date") and r.get("crawled_at")
+        ]
+        crawled_at = _to_seconds([r["crawled_at"] for r in records])
+        departure = _to_days([r["departure_date"] for r in records])
+        days = (departure - crawled_at.astype("datetime64[D]")).astype(int)
+        return cls(
+            np.array([r["route"] for r in records], dtype=str),
+            days,
+            np.array([float(r["price"]) for r in records]),
+        )
+
+    @classmethod
+    def from_columns(cls, columns: dict[str, np.ndarray]) -> "PriceBaselines":
+        """Build baselines from archived flight_prices columns."""
+        crawled_at = columns["crawled_at"].astype("datetime64[s]")
+        departure = columns["departure_date"].astype("datetime64[D]")
+        prices = np.asarray(columns["price"], dtype=float)
+        valid = (~np.isnat(crawled_at)) & (~np.isnat(departure)) & (prices > 0)
+        days = (departure - crawled_at.astype("datetime64[D]")).astype(int)
+        return cls(
+            np.asarray(columns["route"])[valid],
+            days[valid],
+            prices[valid],
+        )
+
+    def _quantile(self, sorted_values: np.ndarray, q: float) -> np.ndarray:
+        """Linear-interpolated q-quantile of each group (NaN when empty)."""
+        if not len(sorted_values):
+            return np.full(len(self.counts), np.nan)
+        pos = self.starts + q * np.maximum(self.counts - 1, 0)
+        lo = np.clip(np.floor(pos).astype(int), 0, len(sorted_values) - 1)
+        hi = np.clip(np.ceil(pos).astype(int), 0, len(sorted_values) - 1)
+        frac = pos - np.floor(pos)
+        result = sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * frac
+        return np.where(self.counts > 0, result, np.nan)
+
+    def _group_mean(self, keys: np.ndarray, values: np.ndarray) -> np.ndarray:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.bincount(keys, values, minlength=len(self.counts)) / self.counts
+
+    def _groups_for(
+        self, routes: np.ndarray, days_to_departure: np.ndarray, min_samples: int
+    ) -> np.ndarray:
+        """Group of each query: its bucket, else route-wide, else -1."""
+        if not len(self.routes):
+            return np.full(len(routes), -1)
+        idx = np.clip(np.searchsorted(self.routes, routes), 0, len(self.routes) - 1)
+        known = self.routes[idx] == routes
+        fine = idx * (N_BUCKETS + 1) + _dtd_bucket(days_to_departure)
+        coarse = idx * (N_BUCKETS + 1) + ALL_BUCKETS
+        groups = np.where(self.counts[fine] >= min_samples, fine, coarse)
+        return np.where(known & (self.counts[groups] >= min_samples), groups, -1)
+
+    def score(
+        self,
+        routes: list[str],
+        days_to_departure: list[int],
+        prices: list[float],
+        *,
+        zscore_threshold: float,
+        percentile_threshold: float,
+        min_samples: int,
+    ) -> list[DealScore]:
+        """Score a batch of prices against their groups' baselines."""
+        if not len(self.routes):
+            return [DealScore(is_deal=False) for _ in prices]
+        routes_arr = np.asarray(routes, dtype=str)
+        prices_arr = np.asarray(prices, dtype=float)
+        groups = self._groups_for(
+            routes_arr, np.asarray(days_to_departure), min_samples
+        )
+        has_baseline = groups >= 0
+        g = np.where(has_baseline, groups, 0)
+
+        median = self.median[g]
+        scale = np.where(self.mad[g] > 0, MAD_SCALE * self.mad[g], self.std[g])
+        with np.errstate(invalid="ignore", divide="ignore"):
+            zscore = np.where(scale > 0, (prices_arr - median) / scale, 0.0)
+            discount = (median - prices_arr) / median * 100
+
+        query = g * self._span + np.minimum(prices_arr, self._span - 1)
+        below = np.searchsorted(self._keyed, query, side="left") - self.starts[g]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            rank = below / self.counts[g] * 100
+
+        is_deal = has_baseline & (
+            (zscore <= -zscore_threshold)
+            | ((rank <= percentile_threshold) & (discount > 0))
+        )
+
+        return [
+            DealScore(
+                is_deal=bool(is_deal[i]),
+                baseline=float(median[i]),
+                discount_percent=float(discount[i]),
+                zscore=float(zscore[i]),
+                percentile_rank=float(rank[i]),
+            )
+            if has_baseline[i]
+            else DealScore(is_deal=False)
+            for i in range(len(prices_arr))
+        ]
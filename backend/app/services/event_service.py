@@ -1,44 +1,86 @@
+import base64
+import json
+import logging
 from datetime import datetime, timedelta
 
 from app.models.schemas import EventListResponse, EventRead
 from app.services.pocketbase import pb_client
+from app.services.geo_index import geo_index, haversine_km
+from app.services.search_index import fold, search_index
+
+logger = logging.getLogger(__name__)
+
+# Published event records backing the in-memory indexes, keyed by id
+_indexed_records: dict[str, dict] = {}
+
+
+_LIST_FIELDS = (
+    "tags_type", "tags_vibe", "tags_energy", "tags_budget", "tags_time",
+    "tags_exclusivity", "tags_location", "tags_audience", "tags_deals",
+    "tags_meta",
+)
 
 
 def _to_event_read(record: dict) -> EventRead:
-    return EventRead(
-        id=record["id"],
-        title=record.get("title", ""),
-        description=record.get("description", ""),
-        summary=record.get("summary", ""),
-        date_start=record.get("date_start", datetime.now().isoformat()),
-        date_end=record.get("date_end") or None,
-        location_name=record.get("location_name", ""),
-        location_city=record.get("location_city", ""),
-        location_address=record.get("location_address", ""),
-        latitude=record.get("latitude"),
-        longitude=record.get("longitude"),
-        price_min=record.get("price_min", 0),
-        price_max=record.get("price_max", 0),
-        currency=record.get("currency", "EUR"),
-        source_url=record.get("source_url", ""),
-        source_name=record.get("source_name", ""),
-        image_url=record.get("image_url", ""),
-        tags_type=record.get("tags_type", []),
-        tags_vibe=record.get("tags_vibe", []),
-        tags_energy=record.get("tags_energy", []),
-        tags_budget=record.get("tags_budget", []),
-        tags_time=record.get("tags_time", []),
-        tags_exclusivity=record.get("tags_exclusivity", []),
-        tags_location=record.get("tags_location", []),
-        tags_audience=record.get("tags_audience", []),
-        tags_deals=record.get("tags_deals", []),
-        tags_meta=record.get("tags_meta", []),
-        interest_score=record.get("interest_score", 0),
-        is_featured=record.get("is_featured", False),
-        status=record.get("status", "draft"),
-        crawled_at=record.get("crawled_at", record.get("created", "")),
-        hash=record.get("hash", ""),
-    )
+    """Validate a PocketBase record into an EventRead in a single pass.
+
+    Only fields PocketBase can return empty are patched; everything else
+    (including extra system fields, which are ignored) goes straight to
+    pydantic's validator.
+    """
+    data = dict(record)
+    # PocketBase returns "" for unset dates and null for unset json fields
+    data["date_end"] = record.get("date_end") or None
+    if not record.get("date_start"):
+        data["date_start"] = datetime.now()
+    if not record.get("crawled_at"):
+        data["crawled_at"] = record.get("created") or datetime.now()
+    for name in _LIST_FIELDS:
+        if record.get(name) is None:
+            data[name] = []
+    data.setdefault("hash", "")
+    return EventRead.model_validate(data)
+
+
+# Fields usable for keyset (cursor) pagination
+CURSOR_SORT_FIELDS = {"interest_score", "date_start", "price_min", "crawled_at", "created"}
+
+
+def encode_cursor(sort: str, record: dict) -> str:
+    """Opaque cursor pointing just after `record` in `sort` order."""
+    field = sort.lstrip("-+")
+    raw = json.dumps([sort, record.get(field), record["id"]], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[str, object, str]:
+    """Decode a cursor into (sort, last_value, last_id). Raises ValueError."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort, value, last_id = json.loads(base64.urlsafe_b64decode(padded))
+    except Exception as e:
+        raise ValueError("invalid cursor") from e
+    if not isinstance(sort, str) or not isinstance(last_id, str):
+        raise ValueError("invalid cursor")
+    return sort, value, last_id
+
+
+def _quote(value: object) -> str:
+    """Render a value as a PocketBase filter literal."""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    escaped = str(value if value is not None else "").replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{escaped}"'
+
+
+def _keyset_filter(sort: str, value: object, last_id: str) -> str:
+    """Filter selecting rows strictly after (value, last_id) in sort order."""
+    field = sort.lstrip("-+")
+    op = "<" if sort.startswith("-") else ">"
+    v = _quote(value)
+    return f'({field} {op} {v} || ({field} = {v} && id {op} {_quote(last_id)}))'
 
 
 async def get_events(
@@ -46,16 +88,45 @@ async def get_events(
     per_page: int = 50,
     sort: str = "-interest_score",
     filter_str: str = "",
+    cursor: str | None = None,
 ) -> EventListResponse:
+    """List events with offset pagination, or keyset pagination via cursor.
+
+    Pages are always ordered by (sort, id) so a cursor can resume exactly
+    after the last row seen, even if scores change in between. Cursor
+    follow-up pages skip PocketBase's COUNT query.
+    """
+    field = sort.lstrip("-+")
+    keyset = field in CURSOR_SORT_FIELDS
+    pb_sort = f"{sort},{'-' if sort.startswith('-') else ''}id" if keyset else sort
+
+    if cursor:
+        cursor_sort, last_value, last_id = decode_cursor(cursor)
+        if not keyset or cursor_sort != sort:
+            raise ValueError("cursor does not match sort order")
+        after = _keyset_filter(sort, last_value, last_id)
+        filter_str = f"{filter_str} && {after}" if filter_str else after
+        page = 1
+
     result = await pb_client.list_records(
-        "events", page=page, per_page=per_page, sort=sort, filter_str=filter_str
+        "events",
+        page=page,
+        per_page=per_page,
+        sort=pb_sort,
+        filter_str=filter_str,
+        skip_total=bool(cursor),
     )
-    items = [_to_event_read(r) for r in result.get("items", [])]
+    records = result.get("items", [])
+    next_cursor = None
+    if keyset and len(records) == per_page:
+        next_cursor = encode_cursor(sort, records[-1])
+
     return EventListResponse(
-        items=items,
+        items=[_to_event_read(r) for r in records],
         total=result.get("totalItems", 0),
         page=result.get("page", page),
         per_page=result.get("perPage", per_page),
+        next_cursor=next_cursor,
     )
 
 
@@ -265,3 +336,207 @@ async def get_upcoming_events() -> list[EventRead]:
             type_counts[primary_type] = count + 1
 
     return diversified
+
+
+# --- In-memory indexes ---
+
+
+def index_record(record: dict) -> None:
+    """Add or refresh a record in the in-memory indexes.
+
+    Only published events are searchable; anything else is dropped.
+    """
+    if record.get("status") != "published":
+        unindex_record(record["id"])
+        return
+    _indexed_records[record["id"]] = record
+    search_index.add(record)
+    lat, lng = record.get("latitude"), record.get("longitude")
+    # PocketBase stores empty number fields as 0
+    if lat and lng:
+        geo_index.add(record["id"], lat, lng)
+    else:
+        geo_index.remove(record["id"])
+
+
+def unindex_record(event_id: str) -> None:
+    """Remove a record from the in-memory indexes."""
+    _indexed_records.pop(event_id, None)
+    search_index.remove(event_id)
+    geo_index.remove(event_id)
+
+
+async def rebuild_indexes() -> int:
+    """Reload all published events from PocketBase into the indexes."""
+    records: list[dict] = []
+    page = 1
+    while True:
+        result = await pb_client.list_records(
+            "events",
+            page=page,
+            per_page=200,
+            filter_str='status = "published"',
+        )
+        items = result.get("items", [])
+        records.extend(items)
+        if not items or page >= result.get("totalPages", 1):
+            break
+        page += 1
+
+    _indexed_records.clear()
+    search_index.clear()
+    geo_index.clear()
+    for record in records:
+        index_record(record)
+    search_index.ready = True
+
+    logger.info(
+        "Indexes rebuilt: %d events, %d geolocated", len(records), len(geo_index)
+    )
+    return len(records)
+
+
+def indexes_ready() -> bool:
+    return search_index.ready
+
+
+def _date_key(value: str) -> str:
+    """Comparable 'YYYY-MM-DD HH:MM:SS' key for PocketBase/ISO dates."""
+    return (value or "")[:19].replace("T", " ")
+
+
+def _matches_filters(
+    record: dict,
+    city: str | None = None,
+    tag_type: str | None = None,
+    tag_vibe: str | None = None,
+    min_score: int | None = None,
+) -> bool:
+    """In-memory equivalent of the /api/events PocketBase filters."""
+    if city and fold(city) not in fold(record.get("location_city") or ""):
+        return False
+    if tag_type and tag_type not in (record.get("tags_type") or []):
+        return False
+    if tag_vibe and tag_vibe not in (record.get("tags_vibe") or []):
+        return False
+    if min_score is not None and (record.get("interest_score") or 0) < min_score:
+        return False
+    return True
+
+
+def _value_key(value) -> tuple[int, float, str]:
+    """Sort key of one field value: numbers before text, never compared."""
+    if isinstance(value, (int, float)):
+        return 0, float(value), ""
+    return 1, 0.0, str(value).casefold()
+
+
+def _sort_records(records: list[dict], sort: str, distances: dict[str, float]) -> None:
+    """Sort records in place by a PocketBase-style sort key ("-field").
+
+    Records without a value for the field come last in either direction.
+    """
+    field = sort.lstrip("-+")
+    reverse = sort.startswith("-")
+    if field == "distance":
+        records.sort(key=lambda r: distances.get(r["id"], float("inf")), reverse=reverse)
+    elif field in ("date_start", "date_end", "crawled_at", "created", "updated"):
+        records.sort(key=lambda r: _date_key(r.get(field) or ""), reverse=reverse)
+    else:
+        present = [r for r in records if r.get(field) not in (None, "")]
+        missing = [r for r in records if r.get(field) in (None, "")]
+        present.sort(key=lambda r: _value_key(r[field]), reverse=reverse)
+        records[:] = present + missing
+
+
+def search_events(
+    query: str | None = None,
+    near: tuple[float, float] | None = None,
+    radius_km: float = 10.0,
+    page: int = 1,
+    per_page: int = 50,
+    sort: str | None = None,
+    city: str | None = None,
+    tag_type: str | None = None,
+    tag_vibe: str | None = None,
+    min_score: int | None = None,
+) -> EventListResponse:
+    """Query indexed events by text relevance and/or distance.
+
+    Text queries are ranked by relevance unless an explicit sort is given;
+    geo-only queries default to closest first.
+    """
+    distances: dict[str, float] = {}
+    if near:
+        distances = dict(geo_index.query(near[0], near[1], radius_km))
+
+    if query:
+        ids = [doc_id for doc_id, _ in search_index.search(query)]
+        if near:
+            ids = [doc_id for doc_id in ids if doc_id in distances]
+    else:
+        ids = list(distances)
+
+    hits = [
+        r for r in (_indexed_records.get(doc_id) for doc_id in ids)
+        if r and _matches_filters(r, city, tag_type, tag_vibe, min_score)
+    ]
+    if sort or (near and not query):
+        _sort_records(hits, sort or "distance", distances)
+
+    start = (page - 1) * per_page
+    items = []
+    for r in hits[start:start + per_page]:
+        event = _to_event_read(r)
+        event.distance_km = round(distances[r["id"]], 2) if r["id"] in distances else None
+        items.append(event)
+    return EventListResponse(
+        items=items,
+        total=len(hits),
+        page=page,
+        per_page=per_page,
+    )
+
+
+async def get_closest_tonight(
+    lat: float, lng: float, radius_km: float = 30.0, limit: int = 5
+) -> list[EventRead]:
+    """Events starting between now and 6am tomorrow, closest first."""
+    now = datetime.now()
+    window_end = (now + timedelta(days=1)).replace(hour=6, minute=0, second=0)
+    start_key = now.strftime("%Y-%m-%d %H:%M:%S")
+    end_key = window_end.strftime("%Y-%m-%d %H:%M:%S")
+
+    if indexes_ready():
+        candidates = [
+            (_indexed_records[doc_id], dist)
+            for doc_id, dist in geo_index.query(lat, lng, radius_km)
+            if doc_id in _indexed_records
+        ]
+    else:
+        result = await pb_client.list_records(
+            "events",
+            per_page=200,
+            filter_str=(
+                f'date_start >= "{start_key}" && date_start < "{end_key}" '
+                f'&& status = "published" && latitude != 0'
+            ),
+        )
+        candidates = []
+        for r in result.get("items", []):
+            if r.get("latitude") and r.get("longitude"):
+                dist = haversine_km(lat, lng, r["latitude"], r["longitude"])
+                if dist <= radius_km:
+                    candidates.append((r, dist))
+        candidates.sort(key=lambda x: x[1])
+
+    events: list[EventRead] = []
+    for record, dist in candidates:
+        if not start_key <= _date_key(record.get("date_start", "")) < end_key:
+            continue
+        event = _to_event_read(record)
+        event.distance_km = round(dist, 2)
+        events.append(event)
+        if len(events) >= limit:
+            break
+    return events
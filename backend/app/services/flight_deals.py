@@ -1,8 +1,11 @@
 import logging
+from collections.abc import Collection
 from dataclasses import dataclass
 from datetime import datetime
 
+from app.config import settings
 from app.services.pocketbase import pb_client
+from app.services.price_stats import price_stats_store
 
 logger = logging.getLogger(__name__)
 
@@ -37,9 +40,8 @@ DESTINATION_CITIES: dict[str, str] = {
 }
 
 
-async def store_flight_price(fp: FlightPrice) -> dict:
-    """Save a flight price record to PocketBase."""
-    data = {
+def _price_record(fp: FlightPrice, crawled_at: datetime) -> dict:
+    return {
         "route": fp.route,
         "origin": fp.origin,
         "destination": fp.destination,
@@ -52,9 +54,46 @@ async def store_flight_price(fp: FlightPrice) -> dict:
         "flight_duration": fp.flight_duration,
         "is_direct": fp.is_direct,
         "source_url": fp.source_url,
-        "crawled_at": (fp.crawled_at or datetime.now()).isoformat(),
+        "crawled_at": crawled_at.isoformat(),
     }
-    return await pb_client.create_record("flight_prices", data)
+
+
+async def store_flight_price(fp: FlightPrice) -> dict:
+    """Save a flight price record to PocketBase and update the route's stats."""
+    crawled_at = fp.crawled_at or datetime.now()
+    record = await pb_client.create_record(
+        "flight_prices", _price_record(fp, crawled_at)
+    )
+    try:
+        await price_stats_store.record(fp.route, fp.price, crawled_at)
+    except Exception:
+        logger.warning(
+            "Failed to update price stats for %s", fp.route, exc_info=True
+        )
+    return record
+
+
+async def store_flight_prices(prices: list[FlightPrice]) -> list[dict]:
+    """Save a crawl's flight prices with batched writes, then update stats."""
+    now = datetime.now()
+    crawled = [(fp, fp.crawled_at or now) for fp in prices]
+    records = await pb_client.batch(
+        [
+            {
+                "method": "POST",
+                "url": "/api/collections/flight_prices/records",
+                "body": _price_record(fp, crawled_at),
+            }
+            for fp, crawled_at in crawled
+        ]
+    )
+    try:
+        await price_stats_store.record_many(
+            [(fp.route, fp.price, crawled_at) for fp, crawled_at in crawled]
+        )
+    except Exception:
+        logger.warning("Failed to update price stats", exc_info=True)
+    return records
 
 
 async def get_price_history(route: str, days: int = 30) -> list[dict]:
@@ -83,6 +122,142 @@ async def get_price_history(route: str, days: int = 30) -> list[dict]:
     return all_records
 
 
+async def recently_crawled_cells(ttl_hours: float) -> set[tuple[str, str, str]]:
+    """(route, departure day, return day) searched within the last ttl_hours."""
+    from datetime import timedelta
+
+    cutoff = (datetime.now() - timedelta(hours=ttl_hours)).isoformat()
+    cells: set[tuple[str, str, str]] = set()
+    page = 1
+    while True:
+        result = await pb_client.list_records(
+            "flight_prices",
+            page=page,
+            per_page=200,
+            filter_str=f'crawled_at >= "{cutoff}"',
+            skip_total=True,
+        )
+        items = result.get("items", [])
+        for r in items:
+            cells.add(
+                (
+                    r["route"],
+                    str(r.get("departure_date", ""))[:10],
+                    str(r.get("return_date", ""))[:10],
+                )
+            )
+        if len(items) < 200:
+            break
+        page += 1
+
+    return cells
+
+
+async def compact_flight_prices(older_than_days: int) -> int:
+    """Roll flight_prices older than N days into flight_price_daily rows.
+
+    Prices are grouped per (route, crawl day) into min/median/max/count
+    rows and the raw records are deleted. Only whole days are compacted.
+    Returns the number of raw records removed.
+    """
+    from datetime import timedelta
+    from statistics import median
+
+    midnight = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    cutoff = (midnight - timedelta(days=older_than_days)).isoformat()
+
+    groups: dict[tuple[str, str], list[dict]] = {}
+    page = 1
+    while True:
+        result = await pb_client.list_records(
+            "flight_prices",
+            page=page,
+            per_page=200,
+            sort="crawled_at",
+            filter_str=f'crawled_at < "{cutoff}"',
+            skip_total=True,
+        )
+        items = result.get("items", [])
+        for r in items:
+            day = str(r.get("crawled_at", ""))[:10]
+            groups.setdefault((r["route"], day), []).append(r)
+        if len(items) < 200:
+            break
+        page += 1
+
+    if not groups:
+        return 0
+
+    # Rows left by an earlier, interrupted run are merged into
+    days = sorted(day for _, day in groups)
+    existing: dict[tuple[str, str], dict] = {}
+    page = 1
+    while True:
+        result = await pb_client.list_records(
+            "flight_price_daily",
+            page=page,
+            per_page=200,
+            filter_str=f'day >= "{days[0]}" && day <= "{days[-1]}"',
+            skip_total=True,
+        )
+        items = result.get("items", [])
+        for row in items:
+            existing[(row["route"], row["day"])] = row
+        if len(items) < 200:
+            break
+        page += 1
+
+    requests: list[dict] = []
+    for (route, day), records in groups.items():
+        prices = [float(r["price"]) for r in records]
+        first = records[0]
+        row = {
+            "route": route,
+            "origin": first.get("origin", ""),
+            "destination": first.get("destination", ""),
+            "destination_city": first.get("destination_city", ""),
+            "day": day,
+            "count": len(prices),
+            "min": min(prices),
+            "median": median(prices),
+            "max": max(prices),
+            "currency": first.get("currency") or "EUR",
+        }
+        old = existing.get((route, day))
+        if old:
+            count = old["count"] + row["count"]
+            # Exact medians can't be merged; weight the two by their counts
+            row["median"] = (
+                old["median"] * old["count"] + row["median"] * row["count"]
+            ) / count
+            row["count"] = count
+            row["min"] = min(old["min"], row["min"])
+            row["max"] = max(old["max"], row["max"])
+            requests.append({
+                "method": "PATCH",
+                "url": f"/api/collections/flight_price_daily/records/{old['id']}",
+                "body": row,
+            })
+        else:
+            requests.append({
+                "method": "POST",
+                "url": "/api/collections/flight_price_daily/records",
+                "body": row,
+            })
+    await pb_client.batch(requests)
+
+    # Raw records go only once their day rows are written
+    raw_ids = [r["id"] for records in groups.values() for r in records]
+    await pb_client.batch([
+        {"method": "DELETE", "url": f"/api/collections/flight_prices/records/{rid}"}
+        for rid in raw_ids
+    ])
+    logger.info(
+        "Compacted %d flight prices into %d daily rows", len(raw_ids), len(groups)
+    )
+    return len(raw_ids)
+
+
 async def compute_average_price(route: str, days: int = 30) -> float | None:
     """Compute the rolling average price for a route over the last N days.
 
@@ -107,6 +282,9 @@ async def detect_deal(
 ) -> tuple[bool, float | None, float | None]:
     """Check if a price qualifies as a deal.
 
+    Compares against the route's rolling 30-day average from the price
+    stats store, without reading the price history.
+
     Args:
         price: The current price to evaluate.
         route: The route code (e.g. "NCE-BCN").
@@ -117,23 +295,19 @@ async def detect_deal(
         Tuple of (is_deal, average_price, discount_percent).
         is_deal is False if not enough history data.
     """
-    records = await get_price_history(route, days=30)
+    stats = await price_stats_store.get(route)
+    count, avg = stats.window(datetime.now().date())
 
     # Need enough data points before flagging deals
-    if len(records) < min_history_days:
+    if count < min_history_days or avg is None:
         logger.debug(
-            "Route %s: only %d records, need %d — skipping deal detection",
+            "Route %s: only %d prices, need %d — skipping deal detection",
             route,
-            len(records),
+            count,
             min_history_days,
         )
         return False, None, None
 
-    prices = [r["price"] for r in records if r.get("price")]
-    if not prices:
-        return False, None, None
-
-    avg = sum(prices) / len(prices)
     if avg <= 0:
         return False, avg, None
 
@@ -150,3 +324,98 @@ async def detect_deal(
         )
 
     return is_deal, avg, discount
+
+
+async def load_price_history(
+    routes: Collection[str] | None = None, since: datetime | None = None
+) -> list[dict]:
+    """Fetch flight_prices records, oldest first.
+
+    Args:
+        routes: Only these routes; every route if None.
+        since: Only prices crawled at or after this time; all if None.
+    """
+    filters = []
+    if routes is not None:
+        if not routes:
+            return []
+        filters.append(
+            "(" + " || ".join(f'route = "{r}"' for r in sorted(routes)) + ")"
+        )
+    if since is not None:
+        filters.append(f'crawled_at >= "{since.isoformat()}"')
+
+    all_records: list[dict] = []
+    page = 1
+    while True:
+        result = await pb_client.list_records(
+            "flight_prices",
+            page=page,
+            per_page=200,
+            sort="crawled_at",
+            filter_str=" && ".join(filters),
+            skip_total=True,
+        )
+        items = result.get("items", [])
+        all_records.extend(items)
+        if len(items) < 200:
+            break
+        page += 1
+
+    return all_records
+
+
+async def evaluate_deals(
+    prices: list[FlightPrice],
+) -> list[tuple[bool, float | None, float | None]]:
+    """Check a batch of stored prices with the configured deal engine.
+
+    Returns (is_deal, baseline_price, discount_percent) per price, as
+    detect_deal does. The "numpy" engine loads the batch's routes' recent
+    history (flight_deal_history_days) once and scores the whole batch in
+    a single vectorized call.
+    """
+    if not prices:
+        return []
+    if settings.flight_deal_engine != "numpy":
+        return [
+            await detect_deal(
+                fp.price,
+                fp.route,
+                threshold_percent=settings.flight_deal_threshold_percent,
+                min_history_days=settings.flight_deal_min_history_days,
+            )
+            for fp in prices
+        ]
+
+    from datetime import timedelta
+
+    from app.services.deal_engine import PriceBaselines, days_until
+
+    now = datetime.now()
+    history = await load_price_history(
+        routes={fp.route for fp in prices},
+        since=now - timedelta(days=settings.flight_deal_history_days),
+    )
+    baselines = PriceBaselines.from_records(history)
+    scores = baselines.score(
+        [fp.route for fp in prices],
+        [days_until(fp.departure_date, fp.crawled_at or now) for fp in prices],
+        [fp.price for fp in prices],
+        zscore_threshold=settings.flight_deal_zscore,
+        percentile_threshold=settings.flight_deal_percentile,
+        min_samples=settings.flight_deal_min_history_days,
+    )
+    for fp, score in zip(prices, scores):
+        if score.is_deal:
+            logger.info(
+                "Deal detected on %s: %.0f€ vs median %.0f€ "
+                "(z=%.1f, percentile %.0f)",
+                fp.route,
+                fp.price,
+                score.baseline,
+                score.zscore,
+                score.percentile_rank,
+            )
+    return [(s.is_deal, s.baseline, s.discount_percent) for s in scores]
+
@@ -0,0 +1,148 @@
+import math
+
+EARTH_RADIUS_KM = 6371.0
+
+# Nice city centre, used when no user position is known
+NICE_LAT = 43.7102
+NICE_LNG = 7.2620
+
+# Geohash precision 5 ≈ 4.9 km × 4.9 km cells at the equator, a good
+# match for "within a few km" queries over a single metro area.
+DEFAULT_PRECISION = 5
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def encode_geohash(lat: float, lng: float, precision: int = DEFAULT_PRECISION) -> str:
+    """Encode a coordinate as a geohash string."""
+    lat_lo, lat_hi = -90.0, 90.0
+    lng_lo, lng_hi = -180.0, 180.0
+    chars: list[str] = []
+    bits = 0
+    bit_count = 0
+    even = True  # geohash interleaves bits starting with longitude
+
+    while len(chars) < precision:
+        if even:
+            mid = (lng_lo + lng_hi) / 2
+            if lng >= mid:
+                bits = (bits << 1) | 1
+                lng_lo = mid
+            else:
+                bits <<= 1
+                lng_hi = mid
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            if lat >= mid:
+                bits = (bits << 1) | 1
+                lat_lo = mid
+            else:
+                bits <<= 1
+                lat_hi = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_BASE32[bits])
+            bits = 0
+            bit_count = 0
+
+    return "".join(chars)
+
+
+def cell_size_deg(precision: int = DEFAULT_PRECISION) -> tuple[float, float]:
+    """Return the (lat, lng) size in degrees of a geohash cell."""
+    total_bits = 5 * precision
+    lng_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lng_bits)
+
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Great-circle distance between two points in kilometres."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lng2 - lng1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bounding_box(lat: float, lng: float, radius_km: float) -> tuple[float, float, float, float]:
+    """Return (min_lat, max_lat, min_lng, max_lng) enclosing a radius."""
+    dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    cos_lat = max(math.cos(math.radians(lat)), 1e-6)
+    dlng = min(180.0, dlat / cos_lat)
+    return lat - dlat, lat + dlat, lng - dlng, lng + dlng
+
+
+class GeoIndex:
+    """Geohash grid over event coordinates.
+
+    Each point is bucketed into its geohash cell; a radius query only
+    visits the cells overlapping the query's bounding box, then applies
+    an exact haversine check.
+    """
+
+    def __init__(self, precision: int = DEFAULT_PRECISION):
+        self.precision = precision
+        self._cell_lat, self._cell_lng = cell_size_deg(precision)
+        self._cells: dict[str, set[str]] = {}
+        self._points: dict[str, tuple[float, float, str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def clear(self) -> None:
+        self._cells.clear()
+        self._points.clear()
+
+    def add(self, doc_id: str, lat: float, lng: float) -> None:
+        self.remove(doc_id)
+        cell = encode_geohash(lat, lng, self.precision)
+        self._cells.setdefault(cell, set()).add(doc_id)
+        self._points[doc_id] = (lat, lng, cell)
+
+    def remove(self, doc_id: str) -> None:
+        point = self._points.pop(doc_id, None)
+        if point is None:
+            return
+        cell = point[2]
+        members = self._cells.get(cell)
+        if members is not None:
+            members.discard(doc_id)
+            if not members:
+                del self._cells[cell]
+
+    def _cells_in_box(self, min_lat, max_lat, min_lng, max_lng) -> set[str] | None:
+        """Geohash cells overlapping the box, or None if scanning is cheaper."""
+        n_lat = int((max_lat - min_lat) / self._cell_lat) + 2
+        n_lng = int((max_lng - min_lng) / self._cell_lng) + 2
+        if n_lat * n_lng > len(self._cells):
+            return None
+
+        cells: set[str] = set()
+        for i in range(n_lat):
+            lat = min(max_lat, min_lat + i * self._cell_lat)
+            for j in range(n_lng):
+                lng = min(max_lng, min_lng + j * self._cell_lng)
+                cells.add(encode_geohash(lat, lng, self.precision))
+        return cells
+
+    def query(self, lat: float, lng: float, radius_km: float) -> list[tuple[str, float]]:
+        """Return (doc_id, distance_km) within radius, closest first."""
+        box = bounding_box(lat, lng, radius_km)
+        cells = self._cells_in_box(*box)
+        candidate_cells = self._cells.keys() if cells is None else cells
+
+        hits: list[tuple[str, float]] = []
+        for cell in candidate_cells:
+            for doc_id in self._cells.get(cell, ()):
+                p_lat, p_lng, _ = self._points[doc_id]
+                dist = haversine_km(lat, lng, p_lat, p_lng)
+                if dist <= radius_km:
+                    hits.append((doc_id, dist))
+
+        hits.sort(key=lambda x: x[1])
+        return hits
+
+
+geo_index = GeoIndex()
@@ -4,9 +4,13 @@ from datetime import datetime, timedelta
 
 import httpx
 
+from app.config import settings
+from app.services import data_version
+
 logger = logging.getLogger(__name__)
 
-from app.config import settings
+# Requests per /api/batch call (PocketBase's batch.maxRequests)
+PB_BATCH_SIZE = 50
 
 
 class PocketBaseClient:
@@ -14,6 +18,8 @@ class PocketBaseClient:
         self.base_url = settings.pocketbase_url
         self.token: str | None = None
         self._client: httpx.AsyncClient | None = None
+        # Cleared when the server rejects /api/batch (disabled in settings)
+        self._batch_enabled = True
 
     async def connect(self):
         self._client = httpx.AsyncClient(base_url=self.base_url, timeout=30)
@@ -55,8 +61,12 @@ class PocketBaseClient:
         per_page: int = 50,
         sort: str = "",
         filter_str: str = "",
+        skip_total: bool = False,
     ) -> dict:
         params: dict = {"page": page, "perPage": per_page}
+        if skip_total:
+            # Skips the COUNT query; totalItems/totalPages come back as -1
+            params["skipTotal"] = 1
         if sort:
             params["sort"] = sort
         if filter_str:
@@ -77,6 +87,12 @@ class PocketBaseClient:
         resp.raise_for_status()
         return resp.json()
 
+    @staticmethod
+    def _bump_version(collection: str) -> None:
+        """Invalidate HTTP caches of read endpoints after a write."""
+        if collection in data_version.VERSIONED_COLLECTIONS:
+            data_version.bump()
+
     async def _retry_on_403(self, method: str, url: str, **kwargs):
         """Execute request, re-auth once on 403, then retry."""
         request_fn = getattr(self._client, method)
@@ -99,6 +115,7 @@ class PocketBaseClient:
         if resp.status_code >= 400:
             logger.error("PB create %s failed %s: %s", collection, resp.status_code, resp.text)
         resp.raise_for_status()
+        self._bump_version(collection)
         return resp.json()
 
     async def update_record(
@@ -110,6 +127,7 @@ class PocketBaseClient:
             json=data,
         )
         resp.raise_for_status()
+        self._bump_version(collection)
         return resp.json()
 
     async def delete_record(self, collection: str, record_id: str) -> bool:
@@ -117,8 +135,54 @@ class PocketBaseClient:
             "delete",
             f"/api/collections/{collection}/records/{record_id}",
         )
+        if resp.status_code == 204:
+            self._bump_version(collection)
         return resp.status_code == 204
 
+    async def _send_one(self, request: dict) -> dict:
+        kwargs = {"json": request["body"]} if "body" in request else {}
+        resp = await self._retry_on_403(
+            request["method"].lower(), request["url"], **kwargs
+        )
+        resp.raise_for_status()
+        return resp.json() if resp.content else {}
+
+    async def batch(self, requests: list[dict]) -> list[dict]:
+        """Send create/update/delete requests through /api/batch.
+
+        Each request is {"method", "url", "body"} as PocketBase expects.
+        Requests go out in chunks of PB_BATCH_SIZE, each one transaction.
+        If the batch API is disabled, they are sent one by one instead.
+        Returns the response body of each request, in order.
+        """
+        results: list[dict] = []
+        for i in range(0, len(requests), PB_BATCH_SIZE):
+            chunk = requests[i:i + PB_BATCH_SIZE]
+            if self._batch_enabled:
+                resp = await self._retry_on_403(
+                    "post", "/api/batch", json={"requests": chunk}
+                )
+                if resp.status_code in (403, 404):
+                    logger.warning(
+                        "PB batch API unavailable (%s), sending one by one",
+                        resp.status_code,
+                    )
+                    self._batch_enabled = False
+                else:
+                    if resp.status_code >= 400:
+                        logger.error(
+                            "PB batch failed %s: %s", resp.status_code, resp.text
+                        )
+                    resp.raise_for_status()
+                    results.extend(item.get("body") or {} for item in resp.json())
+            if not self._batch_enabled:
+                for request in chunk:
+                    results.append(await self._send_one(request))
+            # /api/collections/<collection>/records[/<id>]
+            for collection in {r["url"].split("/")[3] for r in chunk}:
+                self._bump_version(collection)
+        return results
+
     async def get_first_record(
         self, collection: str, filter_str: str
     ) -> dict | None:
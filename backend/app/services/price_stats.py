@@ -0,0 +1,177 @@
+import logging
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+
+from app.services.pocketbase import pb_client
+
+logger = logging.getLogger(__name__)
+
+COLLECTION = "flight_price_stats"
+
+# Deal detection compares against the prices of the last WINDOW_DAYS
+WINDOW_DAYS = 30
+
+
+def _crawl_day(record: dict) -> date:
+    """Day a flight_prices record was crawled (today if unknown)."""
+    try:
+        return date.fromisoformat(str(record.get("crawled_at", ""))[:10])
+    except ValueError:
+        return date.today()
+
+
+@dataclass
+class RouteStats:
+    """Running price aggregates for one route.
+
+    count/mean/m2 are Welford accumulators over every price recorded;
+    buckets holds [count, sum] per crawl day (ISO date) for the last
+    WINDOW_DAYS, so windowed averages never need the raw history.
+    """
+
+    route: str
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+    buckets: dict[str, list[float]] = field(default_factory=dict)
+    record_id: str = ""
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    def add(self, price: float, day: date) -> None:
+        self.count += 1
+        delta = price - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (price - self.mean)
+
+        bucket = self.buckets.setdefault(day.isoformat(), [0, 0.0])
+        bucket[0] += 1
+        bucket[1] += price
+        self.prune(max(day, date.today()))
+
+    def prune(self, today: date) -> None:
+        """Drop daily buckets that fell out of the window."""
+        cutoff = (today - timedelta(days=WINDOW_DAYS)).isoformat()
+        for day in [d for d in self.buckets if d < cutoff]:
+            del self.buckets[day]
+
+    def window(self, today: date) -> tuple[int, float | None]:
+        """(count, mean) of the prices crawled in the last WINDOW_DAYS."""
+        cutoff = (today - timedelta(days=WINDOW_DAYS)).isoformat()
+        count = 0
+        total = 0.0
+        for day, (n, day_sum) in self.buckets.items():
+            if day >= cutoff:
+                count += int(n)
+                total += day_sum
+        return count, (total / count if count else None)
+
+    def to_record(self) -> dict:
+        return {
+            "route": self.route,
+            "count": self.count,
+            "mean": self.mean,
+            "m2": self.m2,
+            "buckets": self.buckets,
+            "updated_at": datetime.now().isoformat(),
+        }
+
+    @classmethod
+    def from_record(cls, record: dict) -> "RouteStats":
+        return cls(
+            route=record["route"],
+            count=int(record.get("count") or 0),
+            mean=float(record.get("mean") or 0.0),
+            m2=float(record.get("m2") or 0.0),
+            buckets={k: list(v) for k, v in (record.get("buckets") or {}).items()},
+            record_id=record.get("id", ""),
+        )
+
+
+class PriceStatsStore:
+    """Per-route RouteStats, cached in memory and persisted to PocketBase.
+
+    A route's stats are loaded from flight_price_stats on first use, or
+    bootstrapped from the last WINDOW_DAYS of flight_prices when no
+    aggregate has been saved yet.
+    """
+
+    def __init__(self):
+        self._routes: dict[str, RouteStats] = {}
+
+    def reset(self) -> None:
+        self._routes.clear()
+
+    async def get(self, route: str) -> RouteStats:
+        stats = self._routes.get(route)
+        if stats is None:
+            stats, _ = await self._load(route)
+        return stats
+
+    async def record(
+        self, route: str, price: float, crawled_at: datetime | None = None
+    ) -> RouteStats:
+        """Add a price just stored in flight_prices to the route's stats."""
+        await self.record_many([(route, price, crawled_at or datetime.now())])
+        return self._routes[route]
+
+    async def record_many(self, prices: list[tuple[str, float, datetime]]) -> None:
+        """Add (route, price, crawled_at) prices just stored in flight_prices.
+
+        Each route's stats are saved once for the whole batch.
+        """
+        by_route: dict[str, list[tuple[float, datetime]]] = {}
+        for route, price, crawled_at in prices:
+            by_route.setdefault(route, []).append((price, crawled_at))
+
+        for route, items in by_route.items():
+            stats = self._routes.get(route)
+            if stats is None:
+                stats, bootstrapped = await self._load(route)
+                if bootstrapped:
+                    # The history it was built from already holds these prices
+                    continue
+            for price, crawled_at in items:
+                stats.add(price, crawled_at.date())
+            await self._save(stats)
+
+    async def _load(self, route: str) -> tuple[RouteStats, bool]:
+        record = await pb_client.get_first_record(COLLECTION, f'route = "{route}"')
+        if record:
+            stats = RouteStats.from_record(record)
+            stats.prune(date.today())
+            bootstrapped = False
+        else:
+            stats = await _bootstrap(route)
+            await self._save(stats)
+            bootstrapped = True
+        self._routes[route] = stats
+        return stats, bootstrapped
+
+    async def _save(self, stats: RouteStats) -> None:
+        data = stats.to_record()
+        if stats.record_id:
+            await pb_client.update_record(COLLECTION, stats.record_id, data)
+        else:
+            created = await pb_client.create_record(COLLECTION, data)
+            stats.record_id = created.get("id", "")
+
+
+async def _bootstrap(route: str) -> RouteStats:
+    """Build a route's stats from its recent flight_prices records."""
+    from app.services.flight_deals import get_price_history
+
+    stats = RouteStats(route=route)
+    records = await get_price_history(route, days=WINDOW_DAYS)
+    for record in records:
+        if record.get("price"):
+            stats.add(float(record["price"]), _crawl_day(record))
+    logger.info(
+        "Bootstrapped price stats for %s from %d records", route, len(records)
+    )
+    return stats
+
+
+price_stats_store = PriceStatsStore()
@@ -0,0 +1,189 @@
+import bisect
+import logging
+import math
+import re
+import unicodedata
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+# Indexed record fields and their term-frequency weight (BM25F-style):
+# a match in the title counts more than one buried in the description.
+FIELD_WEIGHTS: dict[str, float] = {
+    "title": 3.0,
+    "location_name": 2.0,
+    "summary": 1.5,
+    "description": 1.0,
+}
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Share of the final score coming from interest_score (0-100) vs text relevance
+INTEREST_WEIGHT = 0.3
+
+# Max vocabulary terms a prefix can expand to (keeps "a" or "s" cheap)
+MAX_PREFIX_EXPANSIONS = 50
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Very common French/English words that carry no search signal
+_STOPWORDS = {
+    "a", "au", "aux", "avec", "ce", "ces", "d", "dans", "de", "des", "du",
+    "en", "et", "l", "la", "le", "les", "n", "ou", "par", "pour", "qu",
+    "s", "sur", "un", "une", "the", "and", "of", "at",
+}
+
+
+def fold(text: str) -> str:
+    """Lowercase and strip accents: 'Soirée Électro' → 'soiree electro'."""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into accent-folded, lowercase tokens without stopwords."""
+    if not text:
+        return []
+    return [t for t in _TOKEN_RE.findall(fold(text)) if t not in _STOPWORDS]
+
+
+class SearchIndex:
+    """In-memory inverted index over events with BM25 ranking.
+
+    Documents are added/removed one at a time so the index can follow
+    pipeline writes incrementally. The last query token is treated as a
+    prefix, which gives search-as-you-type without a separate endpoint.
+    """
+
+    def __init__(self):
+        # term -> {doc_id: weighted term frequency}
+        self._postings: dict[str, dict[str, float]] = {}
+        self._doc_terms: dict[str, list[str]] = {}
+        self._doc_len: dict[str, float] = {}
+        self._boost: dict[str, float] = {}
+        self._total_len = 0.0
+        self._vocab: list[str] = []  # sorted, for prefix lookups
+        self.ready = False
+
+    def __len__(self) -> int:
+        return len(self._doc_len)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._doc_len
+
+    def clear(self) -> None:
+        self._postings.clear()
+        self._doc_terms.clear()
+        self._doc_len.clear()
+        self._boost.clear()
+        self._total_len = 0.0
+        self._vocab = []
+        self.ready = False
+
+    def add(self, record: dict) -> None:
+        """Index (or re-index) a PocketBase event record."""
+        doc_id = record["id"]
+        if doc_id in self._doc_len:
+            self.remove(doc_id)
+
+        tf: Counter[str] = Counter()
+        for field, weight in FIELD_WEIGHTS.items():
+            for token in tokenize(record.get(field) or ""):
+                tf[token] += weight
+
+        length = sum(tf.values())
+        for term, freq in tf.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                bisect.insort(self._vocab, term)
+            postings[doc_id] = freq
+
+        self._doc_terms[doc_id] = list(tf)
+        self._doc_len[doc_id] = length
+        self._boost[doc_id] = float(record.get("interest_score") or 0)
+        self._total_len += length
+
+    def remove(self, doc_id: str) -> None:
+        """Drop a document from the index (no-op if absent)."""
+        terms = self._doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(doc_id, None)
+            if not postings:
+                del self._postings[term]
+                i = bisect.bisect_left(self._vocab, term)
+                if i < len(self._vocab) and self._vocab[i] == term:
+                    del self._vocab[i]
+        self._total_len -= self._doc_len.pop(doc_id)
+        self._boost.pop(doc_id, None)
+
+    def _expand_prefix(self, prefix: str) -> list[str]:
+        start = bisect.bisect_left(self._vocab, prefix)
+        terms: list[str] = []
+        for term in self._vocab[start:start + MAX_PREFIX_EXPANSIONS]:
+            if not term.startswith(prefix):
+                break
+            terms.append(term)
+        return terms
+
+    def search(self, query: str, limit: int | None = None) -> list[tuple[str, float]]:
+        """Return (doc_id, score) pairs, best first.
+
+        Every query token must match (AND semantics); the last token also
+        matches any indexed term it is a prefix of. The BM25 relevance is
+        normalised to the best hit and blended with interest_score.
+        """
+        tokens = tokenize(query)
+        n_docs = len(self._doc_len)
+        if not tokens or not n_docs:
+            return []
+
+        avg_len = self._total_len / n_docs or 1.0
+        scores: dict[str, float] | None = None
+
+        for i, token in enumerate(tokens):
+            is_last = i == len(tokens) - 1
+            terms = self._expand_prefix(token) if is_last else [token]
+            token_scores: dict[str, float] = {}
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, freq in postings.items():
+                    norm = freq + K1 * (1 - B + B * self._doc_len[doc_id] / avg_len)
+                    s = idf * freq * (K1 + 1) / norm
+                    # A token expanding to several terms scores its best one
+                    if s > token_scores.get(doc_id, 0.0):
+                        token_scores[doc_id] = s
+
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {
+                    d: scores[d] + s for d, s in token_scores.items() if d in scores
+                }
+            if not scores:
+                return []
+
+        best = max(scores.values())
+        ranked = [
+            (
+                doc_id,
+                (1 - INTEREST_WEIGHT) * (s / best)
+                + INTEREST_WEIGHT * self._boost.get(doc_id, 0.0) / 100,
+            )
+            for doc_id, s in scores.items()
+        ]
+        ranked.sort(key=lambda x: x[1], reverse=True)
+        return ranked[:limit] if limit else ranked
+
+
+search_index = SearchIndex()
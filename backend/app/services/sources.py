@@ -0,0 +1,114 @@
+import logging
+from datetime import datetime, timedelta
+
+from app.config import settings
+from app.services.pocketbase import pb_client
+
+logger = logging.getLogger(__name__)
+
+
+async def get_source(name: str) -> dict | None:
+    """Fetch the `sources` record of a crawler by its source_name."""
+    return await pb_client.get_first_record("sources", f'name = "{name}"')
+
+
+async def load_crawl_state(name: str) -> dict:
+    """Return the crawler state stored in the source's crawl_config."""
+    source = await get_source(name)
+    if not source:
+        return {}
+    return dict(source.get("crawl_config") or {})
+
+
+async def save_crawl_state(name: str, **updates) -> dict:
+    """Merge updates into the source's crawl_config, creating the source if needed."""
+    source = await get_source(name)
+    if source is None:
+        return await pb_client.create_record(
+            "sources",
+            {"name": name, "is_active": True, "crawl_config": updates},
+        )
+    config = {**(source.get("crawl_config") or {}), **updates}
+    return await pb_client.update_record(
+        "sources", source["id"], {"crawl_config": config}
+    )
+
+
+async def list_sources() -> dict[str, dict]:
+    """All `sources` records, by name."""
+    result = await pb_client.list_records("sources", per_page=200, skip_total=True)
+    return {r["name"]: r for r in result.get("items", [])}
+
+
+def _parse_date(value) -> datetime | None:
+    value = str(value or "")
+    try:
+        return datetime.fromisoformat(value[:19].replace(" ", "T")) if value else None
+    except ValueError:
+        return None
+
+
+def crawl_interval_hours(source: dict | None, default: float) -> float:
+    """Current crawl interval of a source (its crawler's default until adapted)."""
+    schedule = ((source or {}).get("crawl_config") or {}).get("schedule") or {}
+    return float(schedule.get("interval_hours") or default)
+
+
+def is_due(source: dict | None, default: float, now: datetime) -> bool:
+    """Whether a source's interval has elapsed since its last crawl."""
+    if source is None:
+        return True
+    if source.get("is_active") is False:
+        return False
+    last_crawl = _parse_date(source.get("last_crawl"))
+    if last_crawl is None:
+        return True
+    return now >= last_crawl + timedelta(
+        hours=crawl_interval_hours(source, default)
+    )
+
+
+def adapt_interval(interval: float, events_new: int) -> float:
+    """Next crawl interval from the number of new events the last run found.
+
+    A run finding nothing new backs off by half again; a busy run
+    (CRAWL_BUSY_NEW_EVENTS or more) halves the interval.
+    """
+    if events_new == 0:
+        interval *= 1.5
+    elif events_new >= settings.crawl_busy_new_events:
+        interval /= 2
+    return min(
+        max(interval, settings.crawl_min_interval_hours),
+        settings.crawl_max_interval_hours,
+    )
+
+
+async def record_source_run(
+    name: str, events_new: int, default_interval: float, adapt: bool = True
+) -> dict:
+    """Stamp last_crawl and, if adapt, retune the source's interval.
+
+    Failed runs and fixed-cadence sources keep their current interval.
+    """
+    source = await get_source(name)
+    interval = crawl_interval_hours(source, default_interval)
+    if adapt:
+        interval = adapt_interval(interval, events_new)
+    schedule = {"interval_hours": round(interval, 2), "last_new_events": events_new}
+    now = datetime.now().isoformat()
+
+    if source is None:
+        return await pb_client.create_record(
+            "sources",
+            {
+                "name": name,
+                "is_active": True,
+                "last_crawl": now,
+                "crawl_config": {"schedule": schedule},
+            },
+        )
+    config = {**(source.get("crawl_config") or {}), "schedule": schedule}
+    return await pb_client.update_record(
+        "sources", source["id"], {"last_crawl": now, "crawl_config": config}
+    )
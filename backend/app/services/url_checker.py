@@ -97,3 +97,41 @@ async def purge_dead_urls() -> int:
 
     logger.info("URL check complete: %d events expired", expired_count)
     return expired_count
+
+
+async def expire_unlisted_events(source_name: str, listed_urls: set[str]) -> int:
+    """Expire a source's published events whose URL its listing no longer has.
+
+    Only call this with the URLs of a complete listing of the source (a
+    full resync): any event missing from `listed_urls` is expired.
+    """
+    from app.services.pocketbase import pb_client
+
+    if not listed_urls:
+        # An empty listing is more likely an outage than an empty agenda
+        return 0
+
+    # Collect first: expiring while paging would shift the pages
+    unlisted: list[dict] = []
+    page = 1
+    while True:
+        result = await pb_client.list_records(
+            "events",
+            page=page,
+            per_page=200,
+            filter_str=f'source_name = "{source_name}" && status = "published"',
+            skip_total=True,
+        )
+        items = result.get("items", [])
+        unlisted.extend(e for e in items if e.get("source_url") not in listed_urls)
+        if len(items) < 200:
+            break
+        page += 1
+
+    for event in unlisted:
+        logger.info(
+            "Event %s (%s) no longer listed by %s",
+            event["id"], event.get("title", ""), source_name,
+        )
+        await pb_client.update_record("events", event["id"], {"status": "expired"})
+    return len(unlisted)
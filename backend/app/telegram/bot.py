@@ -1,10 +1,11 @@
 import logging
 
 from telegram import Bot, Update
-from telegram.ext import Application, CommandHandler, ContextTypes
+from telegram.ext import Application, CommandHandler, ContextTypes, MessageHandler, filters
 
 from app.config import settings
 from app.services import event_service
+from app.services.geo_index import NICE_LAT, NICE_LNG
 from app.telegram.templates import format_daily_digest, format_event_line
 
 logger = logging.getLogger(__name__)
@@ -72,6 +73,42 @@ async def cmd_deals(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await update.message.reply_text("\n".join(lines), parse_mode="Markdown")
 
 
+async def _reply_closest_tonight(update: Update, lat: float, lng: float):
+    events = await event_service.get_closest_tonight(lat, lng)
+    if not events:
+        await update.message.reply_text("😴 Rien de prévu près de toi ce soir.")
+        return
+
+    lines = ["📍 *Au plus près ce soir :*\n"]
+    for i, e in enumerate(events, 1):
+        lines.append(format_event_line(e.model_dump(), i))
+        lines.append(f"   🚶 {e.distance_km:.1f} km")
+        lines.append("")
+
+    await update.message.reply_text("\n".join(lines), parse_mode="Markdown")
+
+
+async def cmd_closest(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handler for /closest [lat lng] command (defaults to Nice centre).
+
+    Sharing a location with the bot gives the same answer for that spot.
+    """
+    lat, lng = NICE_LAT, NICE_LNG
+    if len(context.args or []) == 2:
+        try:
+            lat, lng = float(context.args[0]), float(context.args[1])
+        except ValueError:
+            await update.message.reply_text("Usage : /closest [lat lng]")
+            return
+    await _reply_closest_tonight(update, lat, lng)
+
+
+async def on_location(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handler for a shared location: closest events tonight."""
+    loc = update.message.location
+    await _reply_closest_tonight(update, loc.latitude, loc.longitude)
+
+
 async def send_daily_digest():
     """Send the daily digest to the configured Telegram chat."""
     if not settings.telegram_bot_token or not settings.telegram_chat_id:
@@ -109,5 +146,7 @@ def create_telegram_app() -> Application | None:
     app.add_handler(CommandHandler("week", cmd_week))
     app.add_handler(CommandHandler("top", cmd_top))
     app.add_handler(CommandHandler("deals", cmd_deals))
+    app.add_handler(CommandHandler("closest", cmd_closest))
+    app.add_handler(MessageHandler(filters.LOCATION, on_location))
 
     return app
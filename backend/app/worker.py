@@ -0,0 +1,89 @@
+"""Crawl worker: runs the scheduler and the crawl_jobs queue.
+
+Crawls (BeautifulSoup parsing, Playwright, AI enrichment) run here, in
+their own process, so they never hold up API requests. The API only
+queues jobs and reads their status.
+
+Run from backend/:  python -m app.worker
+"""
+
+import asyncio
+import logging
+import os
+import signal
+import socket
+
+from app.config import settings
+from app.crawlers.browser_pool import browser_pool
+from app.scheduler.scheduler import run_crawl_once, start_scheduler, stop_scheduler
+from app.services import crawl_jobs
+from app.services.crawl_progress import CrawlCancelled
+from app.services.pocketbase import pb_client
+
+logger = logging.getLogger(__name__)
+
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+
+async def run_job(job: dict) -> str:
+    """Run a claimed job and record its outcome. Returns the final status."""
+    logger.info("Running crawl job %s (%s)", job["id"], job.get("trigger", ""))
+    try:
+        await run_crawl_once(
+            sources=job.get("sources"),
+            maintenance=job.get("maintenance", True),
+            job_id=job["id"],
+        )
+    except CrawlCancelled:
+        logger.info("Crawl job %s cancelled by request", job["id"])
+        await crawl_jobs.finish(job["id"], "cancelled", "cancelled by request")
+        return "cancelled"
+    except asyncio.CancelledError:
+        await crawl_jobs.finish(job["id"], "cancelled", "worker stopped")
+        raise
+    except Exception as exc:
+        logger.exception("Crawl job %s failed", job["id"])
+        await crawl_jobs.finish(job["id"], "error", str(exc))
+        return "error"
+    await crawl_jobs.finish(job["id"], "success")
+    return "success"
+
+
+async def work(poll_seconds: float) -> None:
+    """Claim and run queued jobs until cancelled."""
+    while True:
+        try:
+            job = await crawl_jobs.claim_next(WORKER_ID)
+        except Exception:
+            logger.warning("Failed to poll crawl jobs", exc_info=True)
+            job = None
+        if job is None:
+            await asyncio.sleep(poll_seconds)
+            continue
+        await run_job(job)
+
+
+async def main() -> None:
+    await pb_client.connect()
+    await crawl_jobs.fail_abandoned()
+    start_scheduler()
+
+    worker = asyncio.create_task(work(settings.worker_poll_seconds))
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.cancel)
+    logger.info("Crawl worker %s started", WORKER_ID)
+
+    try:
+        await worker
+    except asyncio.CancelledError:
+        pass
+    finally:
+        await stop_scheduler()
+        await browser_pool.stop()
+        logger.info("Crawl worker stopped")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
@@ -0,0 +1,143 @@
+"""Microbenchmark: per-event cost of building and serializing EventRead lists.
+
+Compares the previous path (field-by-field EventRead construction, then
+FastAPI's response_model re-validation and stdlib JSON encoding) with the
+current one (single model_validate, orjson via FastJSONResponse).
+
+Run from backend/:  python -m benchmarks.bench_event_serialization
+"""
+
+import json
+import time
+from datetime import datetime, timedelta
+
+from pydantic import TypeAdapter
+
+from app.api.responses import FastJSONResponse
+from app.models.schemas import EventRead
+from app.services.event_service import _to_event_read
+
+N_EVENTS = 200
+ROUNDS = 50
+
+
+def _record(i: int) -> dict:
+    start = datetime(2026, 3, 1, 20) + timedelta(hours=i)
+    return {
+        "id": f"evt{i:012d}",
+        "collectionId": "pbc_1687431684",
+        "collectionName": "events",
+        "title": f"Soirée électro #{i} @ High Club",
+        "description": "DJ set electro au High Club Nice " * 8,
+        "summary": "Soirée electro avec DJ invité.",
+        "date_start": start.strftime("%Y-%m-%d %H:%M:%S.000Z"),
+        "date_end": "",
+        "location_name": "High Club",
+        "location_city": "Nice",
+        "location_address": "45 Promenade des Anglais",
+        "latitude": 43.695,
+        "longitude": 7.265,
+        "price_min": 25,
+        "price_max": 40,
+        "currency": "EUR",
+        "source_url": f"https://shotgun.live/events/evt-{i}",
+        "source_name": "shotgun",
+        "image_url": "https://example.com/img.jpg",
+        "tags_type": ["party", "dj_set"],
+        "tags_vibe": ["festive", "dancing"],
+        "tags_energy": ["high"],
+        "tags_budget": ["budget"],
+        "tags_time": ["this_week"],
+        "tags_exclusivity": [],
+        "tags_location": ["nice_centre"],
+        "tags_audience": ["electro"],
+        "tags_deals": [],
+        "tags_meta": ["recommended"],
+        "interest_score": i % 100,
+        "is_featured": False,
+        "status": "published",
+        "crawled_at": "2026-02-01 07:00:00.000Z",
+        "hash": f"{i:016x}",
+        "created": "2026-02-01 07:00:00.000Z",
+        "updated": "2026-02-01 07:00:00.000Z",
+    }
+
+
+def _legacy_to_event_read(record: dict) -> EventRead:
+    """The pre-fast-path conversion, kept here for comparison."""
+    return EventRead(
+        id=record["id"],
+        title=record.get("title", ""),
+        description=record.get("description", ""),
+        summary=record.get("summary", ""),
+        date_start=record.get("date_start", datetime.now().isoformat()),
+        date_end=record.get("date_end") or None,
+        location_name=record.get("location_name", ""),
+        location_city=record.get("location_city", ""),
+        location_address=record.get("location_address", ""),
+        latitude=record.get("latitude"),
+        longitude=record.get("longitude"),
+        price_min=record.get("price_min", 0),
+        price_max=record.get("price_max", 0),
+        currency=record.get("currency", "EUR"),
+        source_url=record.get("source_url", ""),
+        source_name=record.get("source_name", ""),
+        image_url=record.get("image_url", ""),
+        tags_type=record.get("tags_type", []),
+        tags_vibe=record.get("tags_vibe", []),
+        tags_energy=record.get("tags_energy", []),
+        tags_budget=record.get("tags_budget", []),
+        tags_time=record.get("tags_time", []),
+        tags_exclusivity=record.get("tags_exclusivity", []),
+        tags_location=record.get("tags_location", []),
+        tags_audience=record.get("tags_audience", []),
+        tags_deals=record.get("tags_deals", []),
+        tags_meta=record.get("tags_meta", []),
+        interest_score=record.get("interest_score", 0),
+        is_featured=record.get("is_featured", False),
+        status=record.get("status", "draft"),
+        crawled_at=record.get("crawled_at", record.get("created", "")),
+        hash=record.get("hash", ""),
+    )
+
+
+_list_adapter = TypeAdapter(list[EventRead])
+
+
+def legacy_path(records: list[dict]) -> bytes:
+    events = [_legacy_to_event_read(r) for r in records]
+    # What FastAPI does with response_model=list[EventRead]:
+    # dump → validate → serialize to JSON-able → json.dumps
+    content = [e.model_dump() for e in events]
+    validated = _list_adapter.validate_python(content)
+    jsonable = _list_adapter.dump_python(validated, mode="json")
+    return json.dumps(jsonable, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def fast_path(records: list[dict]) -> bytes:
+    events = [_to_event_read(r) for r in records]
+    return FastJSONResponse(events).body
+
+
+def _per_event_us(fn, records: list[dict]) -> float:
+    fn(records)  # warm-up
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        fn(records)
+    elapsed = time.perf_counter() - start
+    return elapsed / (ROUNDS * len(records)) * 1e6
+
+
+def main() -> None:
+    records = [_record(i) for i in range(N_EVENTS)]
+    assert json.loads(legacy_path(records)) == json.loads(fast_path(records))
+
+    legacy = _per_event_us(legacy_path, records)
+    fast = _per_event_us(fast_path, records)
+    print(f"{N_EVENTS} events x {ROUNDS} rounds")
+    print(f"legacy: {legacy:6.1f} µs/event")
+    print(f"fast:   {fast:6.1f} µs/event  ({legacy / fast:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""Microbenchmark: crawler HTML parsing with html.parser vs lxml.
+
+Parses synthetic pages shaped like the OGC Nice calendar, the Nikaia
+programme and an Eventbrite event page with each crawler's own parse
+function, once per BeautifulSoup backend. Eventbrite detail pages are
+also timed through the JSON-LD fast path, which skips the DOM entirely.
+
+Run from backend/:  python -m benchmarks.bench_html_parsing
+"""
+
+import json
+import time
+
+from bs4 import BeautifulSoup
+
+from app.crawlers import eventbrite, nikaia, ogcn, parsing
+
+ROUNDS = 20
+N_MATCHES = 40
+N_CARDS = 60
+
+# Markup around the data the parsers look at, as on the real pages
+_FILLER = (
+    '<div class="nav"><ul>'
+    + "".join(f'<li><a href="/p/{i}">Lien {i}</a></li>' for i in range(40))
+    + "</ul></div>"
+)
+
+
+def _page(body: str, head: str = "") -> str:
+    return (
+        f"<!DOCTYPE html><html><head><title>Bench</title>{head}</head>"
+        f"<body>{_FILLER}{body}{_FILLER}</body></html>"
+    )
+
+
+def ogcn_calendar() -> str:
+    blocks = []
+    for i in range(N_MATCHES):
+        home, away = ("Nice", f"Club {i}") if i % 2 == 0 else (f"Club {i}", "Nice")
+        blocks.append(
+            f'<div class="calendrier_bloc_incoming calendrier_bloc_competition_1">'
+            f'<div class="calendrier_bloc_date"><span class="calendrier_bloc_date_jour">'
+            f'dimanche 20:45</span><span class="calendrier_bloc_date_chiffre">'
+            f'{i % 28 + 1} mars 2099</span></div>'
+            f'<div class="calendrier_bloc_equipedom"><img src="/logos/{i}h.png">'
+            f'<span class="calendrier_bloc_equipe_nom">{home}</span></div>'
+            f'<div class="calendrier_bloc_equipeext"><img src="/logos/{i}a.png">'
+            f'<span class="calendrier_bloc_equipe_nom">{away}</span></div>'
+            f'<div class="calendrier_bloc_stade">Allianz Riviera</div>'
+            f'<div class="calendrier_bloc_liens"><a href="/fr/match/{i}">Match center</a>'
+            f"</div></div>"
+        )
+    return _page("".join(blocks))
+
+
+def nikaia_programme() -> str:
+    cards = []
+    for i in range(N_CARDS):
+        cards.append(
+            f'<article class="bloc-event" itemscope itemtype="https://schema.org/Event">'
+            f'<meta itemprop="performer" content="Artiste {i}">'
+            f'<meta itemprop="image" content="https://www.nikaia.fr/img/{i}.jpg">'
+            f'<meta itemprop="offers" content="De 33 à 45€">'
+            f'<div class="imageholder"><a href="/evenement/{i}">'
+            f'<img src="/img/{i}.jpg"></a></div>'
+            f'<h1 itemprop="name">Artiste {i}</h1>'
+            f'<time itemprop="startDate" datetime="2099-04-{i % 28 + 1:02d}T20:00:00">'
+            f"{i % 28 + 1} avril</time>"
+            f'<p class="description">{"Concert exceptionnel. " * 10}</p>'
+            f'<a class="button action" href="/evenement/{i}">Réserver</a></article>'
+        )
+    return _page("".join(cards))
+
+
+def eventbrite_event_page() -> str:
+    data = {
+        "@context": "https://schema.org",
+        "@type": "Event",
+        "name": "Soirée électro au port",
+        "startDate": "2099-05-01T21:00:00+02:00",
+        "endDate": "2099-05-02T03:00:00+02:00",
+        "description": "DJ set sur le port de Nice. " * 20,
+        "image": "https://img.evbuc.com/bench.jpg",
+        "location": {
+            "@type": "Place",
+            "name": "Le Port",
+            "address": {
+                "@type": "PostalAddress",
+                "streetAddress": "1 Quai Lunel",
+                "addressLocality": "Nice",
+            },
+            "geo": {"latitude": 43.69, "longitude": 7.28},
+        },
+        "offers": [{"@type": "Offer", "price": "15.00", "priceCurrency": "EUR"}],
+    }
+    # Event pages are large client-rendered documents around a small JSON-LD blob
+    body = "".join(
+        f'<div class="section-{i}"><p>{"Texte de présentation. " * 8}</p>'
+        f'<a href="/e/autre-{i}">Autre</a></div>'
+        for i in range(300)
+    )
+    head = f'<script type="application/ld+json">{json.dumps(data)}</script>'
+    return _page(body, head)
+
+
+def _jsonld_via_soup(html: str):
+    """The previous Eventbrite path: DOM first, then the script tags."""
+    soup = BeautifulSoup(html, parsing.HTML_PARSER)
+    for script in soup.select('script[type="application/ld+json"]'):
+        data = json.loads(script.string or "")
+        if isinstance(data, dict) and data.get("@type") == "Event":
+            return eventbrite._parse_jsonld_item(data, "https://x", "Nice")
+    return None
+
+
+def _jsonld_fast(html: str):
+    return eventbrite._extract_jsonld_event(html, "https://x", "Nice")
+
+
+def _per_page_ms(fn, html: str) -> float:
+    fn(html)  # warm-up
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        fn(html)
+    return (time.perf_counter() - start) / ROUNDS * 1e3
+
+
+def main() -> None:
+    pages = {
+        "ogcn calendar": (ogcn._parse_calendar, ogcn_calendar()),
+        "nikaia programme": (nikaia._parse_page, nikaia_programme()),
+        "eventbrite json-ld (soup)": (_jsonld_via_soup, eventbrite_event_page()),
+    }
+    assert len(ogcn._parse_calendar(pages["ogcn calendar"][1])) == N_MATCHES // 2
+    assert len(nikaia._parse_page(pages["nikaia programme"][1])) == N_CARDS
+
+    print(f"{ROUNDS} rounds per page")
+    print(f"{'page':28} {'html.parser':>12} {'lxml':>10}")
+    for name, (fn, html) in pages.items():
+        timings = []
+        for backend in ("html.parser", "lxml"):
+            parsing.HTML_PARSER = backend
+            timings.append(_per_page_ms(fn, html))
+        print(
+            f"{name:28} {timings[0]:9.2f} ms {timings[1]:7.2f} ms"
+            f"  ({timings[0] / timings[1]:.1f}x)"
+        )
+
+    html = pages["eventbrite json-ld (soup)"][1]
+    assert _jsonld_fast(html) == _jsonld_via_soup(html)
+    fast = _per_page_ms(_jsonld_fast, html)
+    print(f"{'eventbrite json-ld (regex)':28} {fast:9.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
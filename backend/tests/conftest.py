@@ -85,6 +85,20 @@ def sample_deal_record():
     }
 
 
+@pytest.fixture(autouse=True)
+def price_stats_store():
+    """Empty, non-persisted flight price stats for every test."""
+    from app.services import price_stats
+
+    price_stats.price_stats_store.reset()
+    with patch.object(price_stats, "pb_client") as mock_pb:
+        mock_pb.get_first_record = AsyncMock(return_value=None)
+        mock_pb.create_record = AsyncMock(return_value={"id": "stats_001"})
+        mock_pb.update_record = AsyncMock(return_value={"id": "stats_001"})
+        yield price_stats.price_stats_store
+    price_stats.price_stats_store.reset()
+
+
 @pytest.fixture()
 def mock_pb_client():
     """Mocked PocketBase client."""
@@ -104,8 +118,7 @@ def client():
     """FastAPI test client with mocked dependencies."""
     with (
         patch("app.main.pb_client") as mock_pb,
-        patch("app.main.start_scheduler"),
-        patch("app.main.stop_scheduler"),
+        patch("app.main.watch_jobs", new_callable=AsyncMock),
     ):
         mock_pb.connect = AsyncMock()
 
@@ -0,0 +1,228 @@
+"""Tests for the analytics archive and deal backtests."""
+
+from unittest.mock import AsyncMock, patch
+
+import numpy as np
+import pytest
+
+from app.analytics import archive, backtest
+from app.services.deal_engine import PriceBaselines
+
+
+def _flight_price(route: str, price: float, crawled_at: str, id_: str = "") -> dict:
+    return {
+        "id": id_ or f"{route}-{crawled_at}-{price:g}",
+        "route": route,
+        "origin": route.split("-")[0],
+        "destination": route.split("-")[1],
+        "departure_date": "2026-03-20 00:00:00.000Z",
+        "return_date": "2026-03-22 00:00:00.000Z",
+        "price": price,
+        "currency": "EUR",
+        "airline": "easyJet",
+        "is_direct": True,
+        "crawled_at": crawled_at,
+    }
+
+
+def _pages(*pages: list[dict]) -> AsyncMock:
+    return AsyncMock(side_effect=[{"items": items} for items in pages])
+
+
+@pytest.fixture(params=["parquet", "npz"])
+def archive_format(request, monkeypatch):
+    if request.param == "parquet":
+        pytest.importorskip("pyarrow")
+    else:
+        monkeypatch.setattr(archive, "pq", None)
+    return request.param
+
+
+@pytest.mark.asyncio
+async def test_export_partitions_by_month_and_appends(tmp_path, archive_format):
+    dataset = archive.DATASETS["flight_prices"]
+    first = [
+        _flight_price("NCE-LIS", 80.0, "2026-01-30 08:00:00.000Z"),
+        _flight_price("NCE-LIS", 90.0, "2026-02-01 08:00:00.000Z"),
+    ]
+    with patch.object(archive.pb_client, "list_records", _pages(first)):
+        assert await archive.export_dataset(dataset, tmp_path) == 2
+
+    manifest = archive._load_manifest(tmp_path)
+    assert manifest["flight_prices"]["watermark"] == "2026-02-01 08:00:00.000Z"
+    assert sorted(archive._partitions(tmp_path / "flight_prices")) == [
+        "2026-01", "2026-02",
+    ]
+
+    second = [_flight_price("NCE-BCN", 60.0, "2026-02-03 08:00:00.000Z")]
+    mock_list = _pages(second)
+    with patch.object(archive.pb_client, "list_records", mock_list):
+        assert await archive.export_dataset(dataset, tmp_path) == 1
+    assert 'crawled_at > "2026-02-01 08:00:00.000Z"' in (
+        mock_list.call_args.kwargs["filter_str"]
+    )
+
+    february = archive.load("flight_prices", months=["2026-02"], directory=tmp_path)
+    assert list(february["route"]) == ["NCE-LIS", "NCE-BCN"]
+    assert february["price"].tolist() == [90.0, 60.0]
+
+    everything = archive.load("flight_prices", directory=tmp_path)
+    assert len(everything["price"]) == 3
+    assert everything["crawled_at"].dtype == np.dtype("datetime64[s]")
+    assert everything["is_direct"].all()
+
+
+@pytest.mark.asyncio
+async def test_export_resumes_after_records_sharing_a_timestamp(tmp_path, monkeypatch):
+    monkeypatch.setattr(archive, "pq", None)
+    monkeypatch.setattr(archive, "PAGE_SIZE", 2)
+    dataset = archive.DATASETS["flight_prices"]
+    same = "2026-02-01 08:00:00.000Z"
+    first_page = [
+        _flight_price("NCE-LIS", 80.0, "2026-01-30 08:00:00.000Z", "a"),
+        _flight_price("NCE-LIS", 90.0, same, "b"),
+    ]
+    # Same timestamp as the page's last record, on the next page
+    second_page = [_flight_price("NCE-BCN", 70.0, same, "c")]
+    mock_list = _pages(first_page, second_page)
+    with patch.object(archive.pb_client, "list_records", mock_list):
+        assert await archive.export_dataset(dataset, tmp_path) == 3
+
+    query = mock_list.call_args.kwargs
+    assert query["page"] == 1 and query["sort"] == "crawled_at,id"
+    assert f'(crawled_at = "{same}" && id > "b")' in query["filter_str"]
+
+    # A record with that timestamp seen by a later run is picked up too
+    third = [_flight_price("NCE-FCO", 60.0, same, "d")]
+    mock_list = _pages(third)
+    with patch.object(archive.pb_client, "list_records", mock_list):
+        assert await archive.export_dataset(dataset, tmp_path) == 1
+    assert f'(crawled_at = "{same}" && id > "c")' in (
+        mock_list.call_args.kwargs["filter_str"]
+    )
+    routes = archive.load("flight_prices", directory=tmp_path)["route"]
+    assert sorted(routes.tolist()) == ["NCE-BCN", "NCE-FCO", "NCE-LIS", "NCE-LIS"]
+
+
+@pytest.mark.asyncio
+async def test_npz_partitions_are_memory_mapped(tmp_path, monkeypatch):
+    monkeypatch.setattr(archive, "pq", None)
+    records = [_flight_price("NCE-LIS", 80.0, "2026-01-30 08:00:00.000Z")]
+    with patch.object(archive.pb_client, "list_records", _pages(records)):
+        await archive.export_dataset(archive.DATASETS["flight_prices"], tmp_path)
+
+    columns = archive.load("flight_prices", directory=tmp_path)
+    assert isinstance(columns["price"], np.memmap)
+    assert columns["price"].tolist() == [80.0]
+
+
+@pytest.mark.asyncio
+async def test_export_expired_events(tmp_path, monkeypatch):
+    monkeypatch.setattr(archive, "pq", None)
+    records = [
+        {
+            "id": "ev1",
+            "title": "Concert",
+            "source_name": "nikaia",
+            "location_city": "Nice",
+            "date_start": "2026-01-10 20:00:00.000Z",
+            "price_min": 30,
+            "price_max": None,
+            "interest_score": 72,
+            "tags_type": ["concert", "musique"],
+            "status": "expired",
+        }
+    ]
+    mock_list = _pages(records)
+    with patch.object(archive.pb_client, "list_records", mock_list):
+        await archive.export_dataset(archive.DATASETS["events"], tmp_path)
+
+    assert 'status = "expired"' in mock_list.call_args.kwargs["filter_str"]
+    columns = archive.load("events", directory=tmp_path)
+    assert columns["tags_type"].tolist() == ["concert|musique"]
+    assert np.isnan(columns["price_max"][0])
+
+
+def test_load_empty_archive(tmp_path):
+    columns = archive.load("flight_prices", directory=tmp_path)
+    assert set(columns) == set(archive.DATASETS["flight_prices"].columns)
+    assert len(columns["price"]) == 0
+
+
+def test_baselines_from_archived_columns():
+    records = [
+        _flight_price("NCE-LIS", float(price), f"2026-01-{day:02d} 08:00:00.000Z")
+        for day, price in enumerate([100, 105, 110, 95, 98], start=1)
+    ]
+    columns = archive.to_columns(archive.DATASETS["flight_prices"], records)
+    from_columns = PriceBaselines.from_columns(columns)
+    from_records = PriceBaselines.from_records(records)
+    np.testing.assert_allclose(from_columns.median, from_records.median)
+
+
+# ── Backtest ──────────────────────────────────────────────────────
+
+
+def _history(rows: list[tuple[str, str, float]]) -> backtest.History:
+    """(route, crawl day, price) rows, departing 2026-06-01."""
+    records = [
+        {
+            "route": route,
+            "price": price,
+            "crawled_at": f"{day} 08:00:00.000Z",
+            "departure_date": "2026-06-01 00:00:00.000Z",
+        }
+        for route, day, price in rows
+    ]
+    return backtest.History.from_columns(
+        archive.to_columns(archive.DATASETS["flight_prices"], records)
+    )
+
+
+def test_mean_engine_signals_match_rolling_window():
+    history = _history(
+        [
+            ("NCE-LIS", "2026-01-01", 100.0),
+            ("NCE-LIS", "2026-01-15", 200.0),
+            ("NCE-BCN", "2026-01-15", 50.0),
+            ("NCE-LIS", "2026-02-10", 60.0),
+        ]
+    )
+    count, average = backtest.mean_engine_signals(history)
+    assert count.tolist() == [1, 2, 1, 2]
+    # 2026-01-01 fell out of the 30-day window by 2026-02-10
+    assert average.tolist() == [100.0, 150.0, 50.0, 130.0]
+
+
+def test_backtest_mean_reports_precision_and_volume():
+    rows = [("NCE-LIS", f"2026-01-{day:02d}", 100.0) for day in range(1, 15)]
+    rows.append(("NCE-LIS", "2026-01-15", 50.0))
+    history = _history(rows)
+    labels = backtest.hindsight_labels(history, percentile=10.0)
+    assert labels.tolist() == [False] * 14 + [True]
+
+    strict, loose = backtest.backtest_mean(
+        history, labels, thresholds=[60.0, 30.0], min_histories=[7]
+    )
+    assert strict.flagged == 0 and strict.precision is None
+    assert loose.flagged == 1 and loose.alerts == 1
+    assert loose.precision == 1.0 and loose.recall == 1.0
+    assert loose.alerts_per_week == pytest.approx(1 / (15 / 7))
+
+
+def test_numpy_engine_replay_has_no_lookahead():
+    rows = [("NCE-LIS", "2026-01-01", 40.0)]
+    rows += [("NCE-LIS", f"2026-01-{day:02d}", 100.0 + day) for day in range(2, 12)]
+    rows.append(("NCE-LIS", "2026-01-12", 40.0))
+    history = _history(rows)
+    zscore, rank, discount = backtest.numpy_engine_signals(history, min_samples=5)
+
+    # The first price had no history yet; the last one is scored against the rest
+    assert np.isnan(zscore[0])
+    assert zscore[-1] < -2 and discount[-1] > 50
+
+    labels = backtest.hindsight_labels(history)
+    (result,) = backtest.backtest_numpy(
+        history, labels, zscores=[2.0], percentiles=[10.0], min_histories=[5]
+    )
+    assert result.flagged == 1 and result.precision == 1.0
@@ -0,0 +1,60 @@
+"""Tests for ETag / If-None-Match handling on read endpoints."""
+
+from unittest.mock import AsyncMock, patch
+
+from app.services import data_version
+
+
+def _get_week(client, headers=None):
+    with patch("app.services.event_service.pb_client") as mock_pb:
+        mock_pb.list_records = AsyncMock(return_value={"items": [], "totalItems": 0})
+        resp = client.get("/api/events/week", headers=headers or {})
+        return resp, mock_pb
+
+
+def test_read_endpoint_sets_etag(client):
+    resp, _ = _get_week(client)
+    assert resp.status_code == 200
+    assert resp.headers["etag"].startswith('W/"')
+    assert "must-revalidate" in resp.headers["cache-control"]
+
+
+def test_if_none_match_returns_304_without_querying(client):
+    first, _ = _get_week(client)
+    resp, mock_pb = _get_week(client, {"If-None-Match": first.headers["etag"]})
+    assert resp.status_code == 304
+    assert resp.content == b""
+    mock_pb.list_records.assert_not_called()
+
+
+def test_data_change_invalidates_etag(client):
+    first, _ = _get_week(client)
+    data_version.bump()
+    resp, _ = _get_week(client, {"If-None-Match": first.headers["etag"]})
+    assert resp.status_code == 200
+    assert resp.headers["etag"] != first.headers["etag"]
+
+
+def test_etag_depends_on_query(client):
+    with patch("app.services.event_service.pb_client") as mock_pb:
+        mock_pb.list_records = AsyncMock(
+            return_value={"items": [], "totalItems": 0, "page": 1, "perPage": 50}
+        )
+        a = client.get("/api/events?city=Nice")
+        b = client.get("/api/events?city=Cannes")
+    assert a.headers["etag"] != b.headers["etag"]
+
+
+def test_non_cached_endpoints_have_no_etag(client):
+    resp = client.get("/api/tags")
+    assert "etag" not in resp.headers
+
+
+def test_pb_writes_bump_version():
+    from app.services.pocketbase import PocketBaseClient
+
+    before = data_version.current()
+    PocketBaseClient._bump_version("flight_prices")
+    assert data_version.current() == before
+    PocketBaseClient._bump_version("events")
+    assert data_version.current() == before + 1
@@ -1,44 +1,386 @@
 """Tests for the crawl API routes."""
 
+import asyncio
 from unittest.mock import AsyncMock, patch
 
+import pytest
+
 
 def test_crawl_status(client):
-    resp = client.get("/api/crawl/status")
+    with patch("app.services.crawl_jobs.pb_client") as mock_pb:
+        mock_pb.list_records = AsyncMock(return_value={"items": []})
+        resp = client.get("/api/crawl/status")
     assert resp.status_code == 200
     data = resp.json()
     assert "is_running" in data
     assert data["is_running"] is False
 
 
-def test_crawl_logs_empty(client):
-    with patch("app.api.routes.crawl.pb_client") as mock_pb:
+def test_crawl_status_reports_active_job(client):
+    running = {"id": "job1", "status": "running", "trigger": "api"}
+    finished = {
+        "id": "job0",
+        "status": "success",
+        "finished_at": "2026-02-08 07:02:30.000Z",
+    }
+    with patch("app.services.crawl_jobs.pb_client") as mock_pb:
         mock_pb.list_records = AsyncMock(
-            return_value={"items": [], "totalItems": 0}
+            side_effect=[{"items": [running]}, {"items": [finished]}]
         )
-        resp = client.get("/api/crawl/logs")
-        assert resp.status_code == 200
-        assert resp.json() == []
+        data = client.get("/api/crawl/status").json()
+    assert data["is_running"] is True
+    assert data["job_id"] == "job1"
+    assert data["last_status"] == "success"
+    assert data["last_run"].startswith("2026-02-08T07:02:30")
 
 
-def test_crawl_logs_with_entries(client):
-    log_entry = {
-        "id": "log_001",
-        "source": "shotgun",
-        "started_at": "2026-02-08T07:00:00",
-        "finished_at": "2026-02-08T07:02:30",
-        "status": "success",
-        "events_found": 15,
-        "events_new": 8,
-        "error_message": "",
-    }
-    with patch("app.api.routes.crawl.pb_client") as mock_pb:
+def test_trigger_queues_a_single_job(client):
+    with patch("app.services.crawl_jobs.pb_client") as mock_pb:
+        mock_pb.list_records = AsyncMock(return_value={"items": []})
+        mock_pb.create_record = AsyncMock(return_value={"id": "job1"})
+        mock_pb.update_record = AsyncMock()
+        data = client.post("/api/crawl/trigger").json()
+        assert data == {"message": "Crawl queued", "job_id": "job1"}
+        created = mock_pb.create_record.call_args.args[1]
+        assert created["status"] == "queued"
+        assert created["sources"] is None and created["maintenance"] is True
+
+        # A full crawl already waiting absorbs the request unchanged
+        mock_pb.list_records = AsyncMock(
+            return_value={
+                "items": [
+                    {"id": "job1", "status": "queued", "sources": None,
+                     "maintenance": True}
+                ]
+            }
+        )
+        mock_pb.create_record.reset_mock()
+        data = client.post("/api/crawl/trigger").json()
+        assert data["message"] == "Crawl already in progress"
+        mock_pb.create_record.assert_not_called()
+        mock_pb.update_record.assert_not_called()
+
+
+def test_trigger_while_running_returns_running_job(client):
+    running = {"id": "job1", "status": "running"}
+    with patch("app.services.crawl_jobs.pb_client") as mock_pb:
+        # No queued job, then the running one
         mock_pb.list_records = AsyncMock(
-            return_value={"items": [log_entry], "totalItems": 1}
+            side_effect=[{"items": []}, {"items": [running]}]
         )
-        resp = client.get("/api/crawl/logs")
-        assert resp.status_code == 200
-        data = resp.json()
-        assert len(data) == 1
-        assert data[0]["source"] == "shotgun"
-        assert data[0]["events_found"] == 15
+        mock_pb.create_record = AsyncMock()
+        data = client.post("/api/crawl/trigger").json()
+    assert data == {"message": "Crawl already in progress", "job_id": "job1"}
+    mock_pb.create_record.assert_not_called()
+
+
+def test_crawl_job_detail_and_cancel(client):
+    job = {
+        "id": "job1",
+        "trigger": "api",
+        "status": "running",
+        "sources": ["shotgun"],
+        "created_at": "2026-02-08 07:00:00.000Z",
+        "started_at": "2026-02-08 07:00:05.000Z",
+        "finished_at": "",
+        "progress": {"totals": {"found": 4}, "eta_seconds": 12.0},
+    }
+    with patch("app.services.crawl_jobs.pb_client") as mock_pb:
+        mock_pb.get_record = AsyncMock(return_value=job)
+        mock_pb.update_record = AsyncMock(
+            return_value={**job, "cancel_requested": True}
+        )
+        data = client.get("/api/crawl/jobs/job1").json()
+        assert data["progress"]["totals"]["found"] == 4
+        assert data["finished_at"] is None
+
+        data = client.post("/api/crawl/jobs/job1/cancel").json()
+        assert data["cancel_requested"] is True
+        mock_pb.update_record.assert_awaited_once_with(
+            "crawl_jobs", "job1", {"cancel_requested": True}
+        )
+
+        # A queued job is cancelled without waiting for the worker
+        mock_pb.get_record = AsyncMock(return_value={**job, "status": "queued"})
+        mock_pb.update_record = AsyncMock(return_value={**job, "status": "cancelled"})
+        data = client.post("/api/crawl/jobs/job1/cancel").json()
+        assert data["status"] == "cancelled"
+
+        mock_pb.get_record = AsyncMock(side_effect=Exception("404"))
+        assert client.get("/api/crawl/jobs/nope").status_code == 404
+
+
+def test_crawl_job_stream_sends_progress_until_done(client):
+    from app.api.routes import crawl
+
+    base = {"id": "job1", "status": "running", "created_at": "2026-02-08 07:00:00Z"}
+    states = [
+        {**base, "progress": {"totals": {"found": 1}}},
+        {**base, "progress": {"totals": {"found": 1}}},
+        {**base, "progress": {"totals": {"found": 3}}},
+        {**base, "status": "success", "progress": {"totals": {"found": 3}}},
+    ]
+    with (
+        patch("app.services.crawl_jobs.pb_client") as mock_pb,
+        patch.object(crawl, "STREAM_POLL_SECONDS", 0),
+    ):
+        # The first read checks the job exists
+        mock_pb.get_record = AsyncMock(side_effect=[states[0], *states])
+        resp = client.get("/api/crawl/jobs/job1/stream")
+    assert resp.headers["content-type"].startswith("text/event-stream")
+    events = [e for e in resp.text.split("\n\n") if e]
+    # Unchanged polls are not repeated
+    assert [e.split("\n")[0] for e in events] == [
+        "event: progress", "event: progress", "event: progress", "event: done",
+    ]
+    assert '"found":3' in events[1]
+    assert events[-1] == 'event: done\ndata: {"status": "success"}'
+
+
+# ── Scheduler ─────────────────────────────────────────────────────
+
+
+@pytest.mark.asyncio
+async def test_run_crawl_once_skips_overlapping_runs():
+    from app.scheduler import scheduler
+
+    started = asyncio.Event()
+    release = asyncio.Event()
+
+    async def slow_pipeline(sources=None, maintenance=True, job_id=None):
+        started.set()
+        await release.wait()
+
+    with patch("app.scheduler.jobs.run_crawl_pipeline", side_effect=slow_pipeline):
+        first = asyncio.create_task(scheduler.run_crawl_once())
+        await started.wait()
+        assert scheduler.crawl_running()
+        assert await scheduler.run_crawl_once() is False
+        release.set()
+        assert await first is True
+    assert not scheduler.crawl_running()
+
+
+@pytest.mark.asyncio
+async def test_stop_scheduler_cancels_running_crawl():
+    from app.scheduler import scheduler
+
+    started = asyncio.Event()
+    cleaned_up = asyncio.Event()
+
+    async def endless_pipeline(sources=None, maintenance=True, job_id=None):
+        started.set()
+        try:
+            await asyncio.sleep(3600)
+        finally:
+            cleaned_up.set()
+
+    with patch("app.scheduler.jobs.run_crawl_pipeline", side_effect=endless_pipeline):
+        scheduler.start_scheduler()
+        job = scheduler._scheduler.get_job("daily_crawl")
+        assert job.max_instances == 1 and job.coalesce is True
+
+        task = asyncio.create_task(scheduler.run_crawl_once())
+        await started.wait()
+        await scheduler.stop_scheduler()
+
+    assert cleaned_up.is_set()
+    assert task.cancelled()
+    assert scheduler._scheduler is None
+    assert not scheduler.crawl_running()
+
+
+# ── Worker ────────────────────────────────────────────────────────
+
+
+@pytest.mark.asyncio
+async def test_worker_runs_claimed_job_and_records_outcome():
+    from app import worker
+
+    with (
+        patch.object(worker, "run_crawl_once", AsyncMock(return_value=True)),
+        patch.object(worker.crawl_jobs, "finish", AsyncMock()) as finish,
+    ):
+        assert await worker.run_job({"id": "job1"}) == "success"
+        finish.assert_awaited_once_with("job1", "success")
+
+        worker.run_crawl_once.side_effect = RuntimeError("boom")
+        finish.reset_mock()
+        assert await worker.run_job({"id": "job2"}) == "error"
+        finish.assert_awaited_once_with("job2", "error", "boom")
+
+
+@pytest.mark.asyncio
+async def test_worker_marks_cancelled_job():
+    from app import worker
+
+    with (
+        patch.object(
+            worker, "run_crawl_once", AsyncMock(side_effect=asyncio.CancelledError)
+        ),
+        patch.object(worker.crawl_jobs, "finish", AsyncMock()) as finish,
+    ):
+        with pytest.raises(asyncio.CancelledError):
+            await worker.run_job({"id": "job1"})
+    finish.assert_awaited_once_with("job1", "cancelled", "worker stopped")
+
+
+@pytest.mark.asyncio
+async def test_worker_marks_job_cancelled_on_request():
+    from app import worker
+    from app.services.crawl_progress import CrawlCancelled
+
+    with (
+        patch.object(
+            worker, "run_crawl_once", AsyncMock(side_effect=CrawlCancelled())
+        ),
+        patch.object(worker.crawl_jobs, "finish", AsyncMock()) as finish,
+    ):
+        assert await worker.run_job({"id": "job1"}) == "cancelled"
+    finish.assert_awaited_once_with("job1", "cancelled", "cancelled by request")
+
+
+@pytest.mark.asyncio
+async def test_watch_jobs_refreshes_api_when_a_crawl_finishes():
+    from app.services import crawl_jobs, data_version
+
+    done0 = {"id": "job0", "finished_at": "2026-02-08 06:00:00Z"}
+    done1 = {"id": "job1", "finished_at": "2026-02-08 07:00:00Z"}
+    # (running job, most recently finished job) seen by each poll; job2
+    # stays queued behind job1 throughout
+    polls = iter([
+        ({"id": "job1", "updated_at": "a"}, done0),
+        ({"id": "job1", "updated_at": "a"}, done0),  # no progress: no bump
+        ({"id": "job1", "updated_at": "b"}, done0),  # progress reported
+        (None, done1),                               # job1 finished
+        (None, done1),
+    ])
+    current: tuple = ()
+
+    async def running_job():
+        nonlocal current
+        current = next(polls)
+        return current[0]
+
+    async def first(filter_str, sort):
+        return current[1]
+
+    sleeps = 0
+
+    async def fake_sleep(_):
+        nonlocal sleeps
+        sleeps += 1
+        if sleeps == 5:
+            raise asyncio.CancelledError
+
+    before = data_version.current()
+    with (
+        patch.object(crawl_jobs, "running_job", running_job),
+        patch.object(crawl_jobs, "_first", first),
+        patch.object(crawl_jobs.asyncio, "sleep", fake_sleep),
+        patch(
+            "app.services.event_service.rebuild_indexes", AsyncMock()
+        ) as rebuild,
+    ):
+        with pytest.raises(asyncio.CancelledError):
+            await crawl_jobs.watch_jobs(interval=0)
+
+    # Start, one progress report, completion
+    assert data_version.current() == before + 3
+    rebuild.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_watch_jobs_catches_job_finished_between_polls():
+    from app.services import crawl_jobs
+
+    done = iter([
+        None,
+        {"id": "job1", "finished_at": "2026-02-08 07:00:00Z"},
+    ])
+    sleeps = 0
+
+    async def fake_sleep(_):
+        nonlocal sleeps
+        sleeps += 1
+        if sleeps == 2:
+            raise asyncio.CancelledError
+
+    with (
+        patch.object(crawl_jobs, "running_job", AsyncMock(return_value=None)),
+        patch.object(crawl_jobs, "_first", AsyncMock(side_effect=done)),
+        patch.object(crawl_jobs.asyncio, "sleep", fake_sleep),
+        patch(
+            "app.services.event_service.rebuild_indexes", AsyncMock()
+        ) as rebuild,
+    ):
+        with pytest.raises(asyncio.CancelledError):
+            await crawl_jobs.watch_jobs(interval=0)
+    rebuild.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_enqueue_merges_into_queued_job():
+    from app.services import crawl_jobs
+
+    queued = {"id": "job1", "status": "queued", "sources": ["ogcn"],
+              "maintenance": False}
+    with patch.object(crawl_jobs, "pb_client") as mock_pb:
+        mock_pb.list_records = AsyncMock(return_value={"items": [queued]})
+        mock_pb.update_record = AsyncMock(return_value={"id": "job1"})
+        mock_pb.create_record = AsyncMock()
+
+        job, created = await crawl_jobs.enqueue(
+            trigger="schedule", sources=["shotgun"], maintenance=True
+        )
+        assert (job["id"], created) == ("job1", False)
+        assert mock_pb.update_record.call_args.args[2] == {
+            "sources": ["ogcn", "shotgun"], "maintenance": True,
+        }
+
+        # Any request for every source widens the job to all of them
+        await crawl_jobs.enqueue(trigger="api")
+        assert mock_pb.update_record.call_args.args[2]["sources"] is None
+    mock_pb.create_record.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_scheduled_crawl_queues_behind_running_job():
+    from app.services import crawl_jobs
+
+    running = {"id": "job1", "status": "running"}
+    with patch.object(crawl_jobs, "pb_client") as mock_pb:
+        mock_pb.list_records = AsyncMock(return_value={"items": []})
+        mock_pb.create_record = AsyncMock(return_value={"id": "job2"})
+        with patch.object(crawl_jobs, "running_job", AsyncMock(return_value=running)):
+            job, created = await crawl_jobs.enqueue(
+                trigger="schedule", sources=["shotgun"], maintenance=False
+            )
+    assert created and job["id"] == "job2"
+
+
+@pytest.mark.asyncio
+async def test_tick_skips_sources_of_running_job():
+    from app.scheduler import scheduler
+
+    running = {"id": "job1", "status": "running", "sources": ["shotgun"]}
+    with (
+        patch("app.services.crawl_jobs.running_job", AsyncMock(return_value=running)),
+        patch(
+            "app.scheduler.jobs.due_sources", AsyncMock(return_value=["nice_fr"])
+        ) as due,
+        patch("app.services.crawl_jobs.enqueue", AsyncMock()) as enqueue,
+    ):
+        await scheduler._queue_due_sources(maintenance=False)
+        assert due.call_args.kwargs["exclude"] == ["shotgun"]
+        enqueue.assert_awaited_once_with(
+            trigger="schedule", sources=["nice_fr"], maintenance=False
+        )
+
+        # Nothing due: the tick queues nothing, the daily run still does
+        due.return_value = []
+        enqueue.reset_mock()
+        await scheduler._queue_due_sources(maintenance=False)
+        enqueue.assert_not_called()
+        await scheduler._queue_due_sources(maintenance=True)
+        enqueue.assert_awaited_once()
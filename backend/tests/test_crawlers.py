@@ -0,0 +1,1027 @@
+"""Tests for shared crawler infrastructure."""
+
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+
+from app.crawlers.base import (
+    BaseCrawler,
+    CrawledEvent,
+    HostRateLimiter,
+    IncompletePagesError,
+    fetch_pages,
+    retry_after_seconds,
+)
+from app.crawlers.browser_pool import BrowserPool
+from app.crawlers.eventbrite import EventbriteCrawler
+from app.crawlers.http_cache import CachingTransport, HttpCache
+from app.crawlers.nicefr import NiceFrCrawler
+from app.crawlers.parsing import iter_json_ld, make_soup
+from app.crawlers.resource_filter import ResourceFilter
+from app.crawlers.shotgun import (
+    ShotgunCrawler,
+    _extract_events_from_html,
+    _parse_api_event,
+)
+from app.crawlers.waits import (
+    Deadline,
+    Progress,
+    first_of,
+    scroll_until_stable,
+    succeeds,
+)
+
+
+def _fake_playwright():
+    """A Playwright driver whose launches return distinct fake browsers."""
+    browsers = []
+
+    async def launch(**kwargs):
+        browser = MagicMock()
+        browser.close = AsyncMock()
+        context = MagicMock()
+        context.new_page = AsyncMock(return_value=MagicMock())
+        context.close = AsyncMock()
+        context.route = AsyncMock()
+        browser.new_context = AsyncMock(return_value=context)
+        browsers.append(browser)
+        return browser
+
+    driver = MagicMock()
+    driver.chromium.launch = launch
+    driver.stop = AsyncMock()
+    starter = MagicMock()
+    starter.return_value.start = AsyncMock(return_value=driver)
+    return starter, driver, browsers
+
+
+@pytest.mark.asyncio
+async def test_browser_pool_reuses_and_recycles_browser():
+    starter, driver, browsers = _fake_playwright()
+    pool = BrowserPool(max_pages=2, recycle_after=2)
+
+    with patch("playwright.async_api.async_playwright", starter):
+        for _ in range(3):
+            async with pool.page(locale="fr-FR"):
+                pass
+
+        # Two pages on the first browser, then a fresh one
+        assert len(browsers) == 2
+        browsers[0].close.assert_awaited_once()
+        browsers[1].new_context.assert_awaited_with(locale="fr-FR")
+
+        await pool.stop()
+
+    browsers[1].close.assert_awaited_once()
+    driver.stop.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_browser_pool_keeps_retired_browser_until_released():
+    starter, _, browsers = _fake_playwright()
+    pool = BrowserPool(max_pages=2, recycle_after=1)
+
+    with patch("playwright.async_api.async_playwright", starter):
+        async with pool.page():
+            async with pool.page():
+                # Recycled while the first page is still in use
+                assert len(browsers) == 2
+                browsers[0].close.assert_not_awaited()
+        browsers[0].close.assert_awaited_once()
+        await pool.stop()
+
+
+@pytest.mark.asyncio
+async def test_browser_pool_installs_resource_filter():
+    starter, _, browsers = _fake_playwright()
+    pool = BrowserPool(max_pages=1, recycle_after=10)
+    resource_filter = ResourceFilter()
+
+    with patch("playwright.async_api.async_playwright", starter):
+        async with pool.page(resource_filter):
+            pass
+        await pool.stop()
+
+    context = browsers[0].new_context.return_value
+    context.route.assert_awaited_once_with("**/*", resource_filter.handle)
+
+
+# ── Resource filter ───────────────────────────────────────────────
+
+
+def test_resource_filter_blocks_types_and_trackers():
+    f = ResourceFilter()
+    assert f.block_reason("https://shotgun.live/cover.jpg", "image") == "image"
+    assert f.block_reason("https://fonts.gstatic.com/x.woff2", "font") == "font"
+    assert (
+        f.block_reason("https://www.googletagmanager.com/gtm.js", "script")
+        == "tracker"
+    )
+    assert f.block_reason("https://shotgun.live/api/events", "fetch") is None
+    assert f.block_reason("https://shotgun.live/app.css", "stylesheet") is None
+
+
+def test_resource_filter_allowlist_wins():
+    f = ResourceFilter(allow=("/consent/",))
+    assert f.block_reason("https://www.google.com/consent/logo.png", "image") is None
+
+
+@pytest.mark.asyncio
+async def test_resource_filter_counts_blocked_requests():
+    f = ResourceFilter()
+
+    def _route(url, resource_type):
+        route = MagicMock()
+        route.request.url = url
+        route.request.resource_type = resource_type
+        route.abort = AsyncMock()
+        route.continue_ = AsyncMock()
+        return route
+
+    image = _route("https://example.com/a.png", "image")
+    api = _route("https://example.com/api", "xhr")
+    await f.handle(image)
+    await f.handle(api)
+
+    image.abort.assert_awaited_once()
+    api.continue_.assert_awaited_once()
+    assert f.blocked == {"image": 1}
+    assert f.blocked_requests == 1
+    assert f.allowed == 1
+
+
+# ── Wait strategies ───────────────────────────────────────────────
+
+
+@pytest.mark.asyncio
+async def test_progress_wait_for_growth():
+    progress = Progress()
+    assert await progress.wait_for_growth(0, 0.01) is False
+
+    asyncio.get_running_loop().call_later(0.01, progress.add, 2)
+    assert await progress.wait_for_growth(0, 1.0) is True
+    assert progress.count == 2
+
+
+@pytest.mark.asyncio
+async def test_first_of_returns_first_success():
+    async def fails():
+        raise TimeoutError
+
+    async def slow():
+        await asyncio.sleep(1)
+        return True
+
+    async def fast():
+        await asyncio.sleep(0.01)
+        return True
+
+    winner = await first_of(
+        {"fails": succeeds(fails()), "slow": slow(), "fast": fast()}, timeout=0.5
+    )
+    assert winner == "fast"
+    assert await first_of({"slow": slow()}, timeout=0.01) == "deadline"
+
+
+@pytest.mark.asyncio
+async def test_scroll_stops_when_no_new_data():
+    progress = Progress()
+    scrolls = 0
+
+    async def evaluate(script):
+        nonlocal scrolls
+        scrolls += 1
+        if scrolls == 1:
+            # Only the first scroll loads more events
+            asyncio.get_running_loop().call_soon(progress.add, 3)
+
+    page = MagicMock()
+    page.evaluate = evaluate
+
+    reason = await scroll_until_stable(
+        page, progress, Deadline(5), label="test", settle=0.01
+    )
+    assert reason == "no new data"
+    assert scrolls == 2
+    assert progress.count == 3
+
+
+@pytest.mark.asyncio
+async def test_scroll_stops_at_deadline():
+    page = MagicMock()
+    page.evaluate = AsyncMock()
+    reason = await scroll_until_stable(page, Progress(), Deadline(0), label="test")
+    assert reason == "deadline"
+    page.evaluate.assert_not_awaited()
+
+
+# ── Shotgun HTTP path ─────────────────────────────────────────────
+
+
+def _shotgun_html(events: list[dict], page_info: dict | None = None) -> str:
+    upcoming: dict = {"nodes": events}
+    if page_info is not None:
+        upcoming["pageInfo"] = page_info
+    payload = {"props": {"pageProps": {"city": {"upcoming": upcoming}}}}
+    return (
+        "<html><body><script id=\"__NEXT_DATA__\" type=\"application/json\">"
+        f"{json.dumps(payload)}</script></body></html>"
+    )
+
+
+def _shotgun_event(id_: str, title: str) -> dict:
+    return {
+        "id": id_,
+        "title": title,
+        "startDate": "2026-11-07T23:00:00",
+        "slug": f"event-{id_}",
+        "venue": {"name": "High Club", "city": "Nice"},
+    }
+
+
+def test_shotgun_extracts_next_data_and_json_ld():
+    ld = {
+        "@type": "Event",
+        "name": "Jazz au port",
+        "startDate": "2026-11-08T20:00:00",
+        "url": "https://shotgun.live/fr/events/jazz",
+        "location": {
+            "@type": "Place",
+            "name": "Port Lympia",
+            "address": {"addressLocality": "Nice", "streetAddress": "Quai"},
+        },
+        "offers": {"lowPrice": "12.5"},
+    }
+    html = _shotgun_html([_shotgun_event("1", "Techno night")]) + (
+        f'<script type="application/ld+json">{json.dumps(ld)}</script>'
+    )
+    raw = _extract_events_from_html(html)
+    assert [r.get("title") or r.get("name") for r in raw] == [
+        "Techno night", "Jazz au port",
+    ]
+
+    ev = _parse_api_event(raw[1])
+    assert ev.location_city == "Nice"
+    assert ev.location_address == "Quai"
+    assert ev.price_min == 12.5
+
+
+@pytest.mark.asyncio
+async def test_shotgun_http_follows_payload_pagination():
+    pages = {
+        "1": ([_shotgun_event("1", "A"), _shotgun_event("2", "B")],
+              {"hasNextPage": True, "nextPage": 2}),
+        "2": ([_shotgun_event("3", "C")], {"hasNextPage": False}),
+    }
+    requested = []
+
+    def handler(request):
+        page = request.url.params.get("page", "1")
+        requested.append(page)
+        return httpx.Response(200, text=_shotgun_html(*pages[page]))
+
+    seen: set[str] = set()
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        events = await ShotgunCrawler()._crawl_page_http(
+            client, "https://shotgun.live/fr/cities/nice/events", seen
+        )
+
+    assert [e.title for e in events] == ["A", "B", "C"]
+    # No page past the one the payload called last
+    assert requested == ["1", "2"]
+    assert seen == {"1", "2", "3"}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "page_info", [None, {"hasNextPage": True, "endCursor": "YXJyYXk6MTk="}]
+)
+async def test_shotgun_http_uses_browser_without_page_numbers(page_info):
+    requested = []
+
+    def handler(request):
+        requested.append(str(request.url))
+        return httpx.Response(
+            200, text=_shotgun_html([_shotgun_event("1", "A")], page_info)
+        )
+
+    seen: set[str] = set()
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        result = await ShotgunCrawler()._crawl_page_http(
+            client, "https://shotgun.live/fr/cities/nice/events", seen
+        )
+
+    # Page numbers are never guessed; the browser gets the unseen events
+    assert result is None
+    assert len(requested) == 1
+    assert seen == set()
+
+
+@pytest.mark.asyncio
+async def test_shotgun_http_returns_none_without_embedded_data():
+    transport = httpx.MockTransport(
+        lambda request: httpx.Response(200, text="<html></html>")
+    )
+    async with httpx.AsyncClient(transport=transport) as client:
+        result = await ShotgunCrawler()._crawl_page_http(
+            client, "https://shotgun.live/fr/venues/x", set()
+        )
+    assert result is None
+
+
+# ── Paginated fetching ────────────────────────────────────────────
+
+
+@pytest.mark.asyncio
+async def test_fetch_pages_uses_wp_total_pages():
+    requested = []
+
+    def handler(request):
+        page = int(request.url.params["page"])
+        requested.append(page)
+        return httpx.Response(200, json=[page], headers={"X-WP-TotalPages": "3"})
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        pages = [
+            n
+            async for n, _ in fetch_pages(
+                client,
+                lambda n: f"https://example.com/wp-json?page={n}",
+                max_pages=10,
+                limiter=HostRateLimiter(),
+            )
+        ]
+
+    assert sorted(pages) == [1, 2, 3]
+    assert sorted(requested) == [1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_fetch_pages_without_total_stops_at_empty_page():
+    def handler(request):
+        page = int(request.url.params["page"])
+        return httpx.Response(200, text="event" if page <= 3 else "")
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        pages = [
+            (n, bool(resp.text))
+            async for n, resp in fetch_pages(
+                client,
+                lambda n: f"https://example.com/agenda?page={n}",
+                max_pages=20,
+                limiter=HostRateLimiter(max_concurrency=2),
+                total_pages=lambda r: None,
+                is_last=lambda r: not r.text,
+            )
+        ]
+
+    # Windows of two pages: 2-3, then 4-5 where the listing runs out
+    assert sorted(pages) == [
+        (1, True), (2, True), (3, True), (4, False), (5, False),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_fetch_pages_strict_reports_failed_and_truncated_pages():
+    def handler(request):
+        page = int(request.url.params["page"])
+        if page == 2:
+            return httpx.Response(500)
+        return httpx.Response(200, json=[page], headers={"X-WP-TotalPages": "5"})
+
+    async def read(max_pages, strict):
+        async with httpx.AsyncClient(
+            transport=httpx.MockTransport(handler)
+        ) as client:
+            pages = []
+            async for n, _ in fetch_pages(
+                client,
+                lambda n: f"https://example.com/wp-json?page={n}",
+                max_pages=max_pages,
+                limiter=HostRateLimiter(),
+                strict=strict,
+            ):
+                pages.append(n)
+            return sorted(pages)
+
+    # Lenient by default: the failed page is just skipped
+    assert await read(4, strict=False) == [1, 3, 4]
+    with pytest.raises(IncompletePagesError, match=r"pages \[2\] failed.*max_pages=4"):
+        await read(4, strict=True)
+
+
+@pytest.mark.asyncio
+async def test_host_rate_limiter_token_bucket():
+    limiter = HostRateLimiter(rate=20, burst=2, max_concurrency=4)
+    loop = asyncio.get_running_loop()
+    starts = []
+
+    async def hit():
+        async with limiter.slot("https://example.com/a"):
+            starts.append(loop.time())
+
+    t0 = loop.time()
+    await asyncio.gather(*(hit() for _ in range(4)))
+    # Burst of two immediately, then one every 50 ms
+    assert starts[1] - t0 < 0.03
+    assert starts[3] - t0 >= 0.09
+
+
+@pytest.mark.asyncio
+async def test_host_rate_limiter_retries_429_with_retry_after():
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.path)
+        if len(calls) == 1:
+            return httpx.Response(429, headers={"Retry-After": "0"})
+        return httpx.Response(200, text="ok")
+
+    limiter = HostRateLimiter()
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        resp = await limiter.get(client, "https://example.com/e/1")
+
+    assert resp.status_code == 200
+    assert len(calls) == 2
+
+
+def test_retry_after_parsing():
+    assert retry_after_seconds(httpx.Response(429, headers={"Retry-After": "7"})) == 7
+    assert retry_after_seconds(httpx.Response(429)) is None
+    past = "Wed, 21 Oct 2015 07:28:00 GMT"
+    assert retry_after_seconds(httpx.Response(429, headers={"Retry-After": past})) == 0
+
+
+# ── Eventbrite ────────────────────────────────────────────────────
+
+
+@pytest.mark.asyncio
+async def test_eventbrite_fetches_each_detail_page_once():
+    listing = (
+        '<a href="/e/concert-1?aff=x">1</a>'
+        '<a href="https://www.eventbrite.fr/e/concert-2">2</a>'
+    )
+    detail = (
+        '<script type="application/ld+json">'
+        + json.dumps({
+            "@type": "Event",
+            "name": "Concert",
+            "startDate": "2099-01-01T20:00:00",
+            "location": {"name": "Salle", "address": {"addressLocality": "Nice"}},
+        })
+        + "</script>"
+    )
+    detail_requests = []
+
+    def handler(request):
+        if "/e/" in request.url.path:
+            detail_requests.append(request.url.path)
+            return httpx.Response(200, text=detail)
+        return httpx.Response(200, text=listing)
+
+    transport = httpx.MockTransport(handler)
+    real_client = httpx.AsyncClient
+
+    def client_factory(**kwargs):
+        return real_client(transport=transport, **kwargs)
+
+    with patch("app.crawlers.eventbrite.httpx.AsyncClient", client_factory), \
+            patch("app.crawlers.eventbrite.REQUESTS_PER_SECOND", 0):
+        events = await EventbriteCrawler().crawl()
+
+    # Every listing links to the same two events
+    assert sorted(detail_requests) == ["/e/concert-1", "/e/concert-2"]
+    assert len(events) == 2
+
+
+@pytest.mark.asyncio
+async def test_eventbrite_skips_detail_pages_of_events_listed_later():
+    link_listing = '<a href="/e/concert-1">1</a><a href="/e/concert-2">2</a>'
+    ld_listing = (
+        '<script type="application/ld+json">'
+        + json.dumps({
+            "@type": "Event",
+            "name": "Concert 1",
+            "url": "https://www.eventbrite.fr/e/concert-1?aff=list",
+            "startDate": "2099-01-01T20:00:00",
+            "location": {"name": "Salle", "address": {"addressLocality": "Nice"}},
+        })
+        + "</script>"
+    )
+    detail = ld_listing.replace("Concert 1", "Concert 2")
+    detail_requests = []
+
+    async def handler(request):
+        if "/e/" in request.url.path:
+            detail_requests.append(request.url.path)
+            return httpx.Response(200, text=detail)
+        if "cannes" in request.url.path:
+            # Comes back after the first listing queued concert-1
+            await asyncio.sleep(0.05)
+            return httpx.Response(200, text=ld_listing)
+        return httpx.Response(200, text=link_listing)
+
+    transport = httpx.MockTransport(handler)
+    real_client = httpx.AsyncClient
+
+    def client_factory(**kwargs):
+        return real_client(transport=transport, **kwargs)
+
+    with patch("app.crawlers.eventbrite.httpx.AsyncClient", client_factory), \
+            patch("app.crawlers.eventbrite.REQUESTS_PER_SECOND", 0), \
+            patch("app.crawlers.eventbrite.EVENTBRITE_URLS", [
+                "https://www.eventbrite.fr/d/france--nice/events/",
+                "https://www.eventbrite.fr/d/france--cannes/events/",
+            ]):
+        events = await EventbriteCrawler().crawl()
+
+    assert detail_requests == ["/e/concert-2"]
+    assert sorted(e.title for e in events) == ["Concert 1", "Concert 2"]
+
+
+# ── nice.fr incremental crawl ─────────────────────────────────────
+
+
+def _wp_item(id_: int, modified: str) -> dict:
+    return {
+        "id": id_,
+        "title": {"rendered": f"Concert {id_}"},
+        "link": f"https://www.nice.fr/evenement/{id_}",
+        "modified_gmt": modified,
+        "acf": {"event_dates": [{"start_date": "20991231", "start_time": "20:00"}]},
+    }
+
+
+async def _crawl_nicefr(state: dict, items: list[dict], total_pages: int = 1):
+    requested = []
+
+    def handler(request):
+        requested.append(dict(request.url.params))
+        if request.url.params["page"] != "1":
+            return httpx.Response(502)
+        return httpx.Response(
+            200, json=items, headers={"X-WP-TotalPages": str(total_pages)}
+        )
+
+    transport = httpx.MockTransport(handler)
+    real_client = httpx.AsyncClient
+    save = AsyncMock()
+    expire = AsyncMock(return_value=0)
+
+    with patch(
+        "app.crawlers.nicefr.httpx.AsyncClient",
+        lambda **kw: real_client(transport=transport, **kw),
+    ), patch(
+        "app.crawlers.nicefr.load_crawl_state", AsyncMock(return_value=state)
+    ), patch("app.crawlers.nicefr.save_crawl_state", save), patch(
+        "app.crawlers.nicefr.expire_unlisted_events", expire
+    ):
+        events = await NiceFrCrawler().crawl()
+    return events, requested, save, expire
+
+
+@pytest.mark.asyncio
+async def test_nicefr_first_run_is_full_sync():
+    events, requested, save, expire = await _crawl_nicefr(
+        {}, [_wp_item(2, "2026-10-02T10:00:00"), _wp_item(1, "2026-10-01T10:00:00")]
+    )
+    assert len(events) == 2
+    assert "modified_after" not in requested[0]
+    kwargs = save.await_args.kwargs
+    assert kwargs["modified_after"] == "2026-10-02T10:00:00"
+    assert "last_full_sync" in kwargs
+    # Everything the agenda lists was seen: the rest is expired
+    expire.assert_awaited_once_with(
+        "nice_fr",
+        {"https://www.nice.fr/evenement/1", "https://www.nice.fr/evenement/2"},
+    )
+
+
+@pytest.mark.asyncio
+async def test_nicefr_incremental_uses_watermark():
+    state = {
+        "modified_after": "2026-10-01T10:00:00",
+        "last_full_sync": datetime.now().isoformat(),
+    }
+    events, requested, save, expire = await _crawl_nicefr(
+        state,
+        # The server-side filter may overlap the watermark
+        [_wp_item(2, "2026-10-02T10:00:00"), _wp_item(1, "2026-10-01T10:00:00")],
+    )
+    assert [e.title for e in events] == ["Concert 2"]
+    assert requested[0]["modified_after"] == "2026-10-01T10:00:00"
+    kwargs = save.await_args.kwargs
+    assert kwargs == {"modified_after": "2026-10-02T10:00:00"}
+    expire.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_nicefr_keeps_watermark_when_a_page_fails():
+    state = {
+        "modified_after": "2026-10-01T10:00:00",
+        "last_full_sync": datetime.now().isoformat(),
+    }
+    events, requested, save, _ = await _crawl_nicefr(
+        state, [_wp_item(3, "2026-10-03T10:00:00")], total_pages=2
+    )
+    # Page 1's events are still crawled, but page 2 may hold older changes
+    assert [e.title for e in events] == ["Concert 3"]
+    assert len(requested) == 2
+    save.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_nicefr_incomplete_full_sync_expires_nothing():
+    _, _, save, expire = await _crawl_nicefr(
+        {}, [_wp_item(3, "2026-10-03T10:00:00")], total_pages=2
+    )
+    save.assert_not_awaited()
+    expire.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_nicefr_full_resync_after_interval():
+    state = {
+        "modified_after": "2026-10-01T10:00:00",
+        "last_full_sync": (datetime.now() - timedelta(days=30)).isoformat(),
+    }
+    _, requested, _, _ = await _crawl_nicefr(state, [])
+    assert "modified_after" not in requested[0]
+
+
+# ── HTTP cache ────────────────────────────────────────────────────
+
+
+@pytest.mark.asyncio
+async def test_caching_transport_revalidates_with_etag(tmp_path):
+    cache = HttpCache(str(tmp_path))
+    seen_headers = []
+
+    def handler(request):
+        seen_headers.append(request.headers.get("if-none-match"))
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, text="<html>calendar</html>", headers={"ETag": '"v1"'})
+
+    transport = CachingTransport(cache, httpx.MockTransport(handler))
+    async with httpx.AsyncClient(transport=transport) as client:
+        first = await client.get("https://example.com/calendar")
+        second = await client.get("https://example.com/calendar")
+
+    assert seen_headers == [None, '"v1"']
+    assert second.status_code == 200
+    assert second.text == first.text == "<html>calendar</html>"
+    assert second.extensions["http_cache"] == "revalidated"
+
+
+def test_parsed_events_reused_while_body_unchanged(tmp_path):
+    cache = HttpCache(str(tmp_path))
+    future = datetime.now() + timedelta(days=3)
+    past = datetime.now() - timedelta(days=1)
+    parse = MagicMock(return_value=[
+        CrawledEvent(title="Match", date_start=future),
+        CrawledEvent(title="Old", date_start=past),
+    ])
+
+    first = cache.parsed_events("page", b"<html>v1</html>", parse)
+    again = cache.parsed_events("page", b"<html>v1</html>", parse)
+    assert parse.call_count == 1
+    assert [e.title for e in first] == ["Match", "Old"]
+    # Reused events that have since passed are dropped
+    assert [e.title for e in again] == ["Match"]
+    assert again[0].date_start == future
+
+    cache.parsed_events("page", b"<html>v2</html>", parse)
+    assert parse.call_count == 2
+
+
+def test_disabled_cache_always_parses():
+    cache = HttpCache("")
+    parse = MagicMock(return_value=[])
+    cache.parsed_events("page", b"x", parse)
+    cache.parsed_events("page", b"x", parse)
+    assert parse.call_count == 2
+    assert not isinstance(cache.transport(), CachingTransport)
+
+
+# ── HTML parsing ──────────────────────────────────────────────────
+
+
+def test_iter_json_ld_reads_scripts_without_dom():
+    html = (
+        "<html><head>"
+        '<script type="application/ld+json">{"@type": "Event", "name": "A"}</script>'
+        "<script type='application/ld+json' data-x=\"1\">[{\"name\": \"B\"}]</script>"
+        '<script type="application/ld+json">{not json</script>'
+        '<script type="text/javascript">{"name": "C"}</script>'
+        "</head></html>"
+    )
+    assert list(iter_json_ld(html)) == [
+        {"@type": "Event", "name": "A"},
+        [{"name": "B"}],
+    ]
+
+
+@pytest.mark.parametrize("backend", ["html.parser", "lxml"])
+def test_crawler_parsers_agree_across_backends(backend):
+    from app.crawlers import nikaia, parsing
+
+    html = (
+        '<article class="bloc-event"><meta itemprop="performer" content="Artiste">'
+        '<time itemprop="startDate" datetime="2099-04-01T20:00:00"></time>'
+        '<meta itemprop="offers" content="49€"></article>'
+    )
+    with patch.object(parsing, "HTML_PARSER", backend):
+        assert make_soup("<p>x</p>").builder.NAME == backend
+        events = nikaia._parse_page(html)
+    assert [(e.title, e.price_min) for e in events] == [("Artiste", 49.0)]
+
+
+# ── Streaming crawl pipeline ──────────────────────────────────────
+
+
+class _ListCrawler(BaseCrawler):
+    source_name = "list"
+
+    async def crawl(self):
+        return [CrawledEvent(title="A"), CrawledEvent(title="B")]
+
+
+class _StreamCrawler(BaseCrawler):
+    source_name = "stream"
+
+    def __init__(self, first_processed: asyncio.Event):
+        self.first_processed = first_processed
+
+    async def iter_events(self):
+        yield CrawledEvent(title="first")
+        # Only reachable if the pipeline handles events while crawling
+        await asyncio.wait_for(self.first_processed.wait(), timeout=1)
+        yield CrawledEvent(title="second")
+
+
+class _BrokenCrawler(BaseCrawler):
+    source_name = "broken"
+
+    async def iter_events(self):
+        yield CrawledEvent(title="partial")
+        raise RuntimeError("site down")
+
+
+def test_crawler_must_implement_crawl_or_iter_events():
+    with pytest.raises(TypeError):
+        type("NoopCrawler", (BaseCrawler,), {})
+
+
+@pytest.mark.asyncio
+async def test_crawl_and_iter_events_adapt_to_each_other():
+    assert [e.title async for e in _ListCrawler().iter_events()] == ["A", "B"]
+    done = asyncio.Event()
+    done.set()
+    assert [e.title for e in await _StreamCrawler(done).crawl()] == [
+        "first",
+        "second",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_pipeline_processes_events_while_crawling():
+    from app.scheduler import jobs
+
+    first_processed = asyncio.Event()
+    processed: list[str] = []
+
+    async def process(source_name, raw, progress):
+        processed.append(raw.title)
+        first_processed.set()
+        return raw.title != "B"
+
+    create_record = AsyncMock(return_value={})
+    record_source_run = AsyncMock()
+    crawlers = [
+        _StreamCrawler(first_processed),
+        _BrokenCrawler(),
+        _ListCrawler(),
+    ]
+    with (
+        patch.object(jobs, "_get_active_crawlers", return_value=crawlers),
+        patch.object(jobs, "_process_event", side_effect=process),
+        patch.object(jobs, "analyze_feedbacks", AsyncMock()),
+        patch.object(jobs, "refresh_learned_preferences", AsyncMock()),
+        patch.object(jobs, "_expire_past_events", AsyncMock(return_value=0)),
+        patch("app.analytics.archive.export_dataset", AsyncMock(return_value=0)),
+        patch(
+            "app.services.flight_deals.compact_flight_prices",
+            AsyncMock(return_value=0),
+        ),
+        patch.object(jobs, "purge_duplicates", AsyncMock(return_value=0)),
+        patch.object(jobs.browser_pool, "stop", AsyncMock()),
+        patch.object(jobs.pb_client, "create_record", create_record),
+        patch.object(jobs, "record_source_run", record_source_run),
+        patch(
+            "app.services.url_checker.purge_dead_urls",
+            AsyncMock(return_value=0),
+        ),
+    ):
+        await jobs.run_crawl_pipeline()
+
+    assert processed == ["first", "second", "partial", "A", "B"]
+    logs = {
+        c.args[1]["source"]: c.args[1]
+        for c in create_record.call_args_list
+        if c.args[0] == "crawl_logs"
+    }
+    assert (logs["stream"]["events_found"], logs["stream"]["events_new"]) == (2, 2)
+    assert logs["broken"]["status"] == "error"
+    assert logs["broken"]["error_message"] == "site down"
+    assert logs["broken"]["events_new"] == 1
+    assert (logs["list"]["events_found"], logs["list"]["events_new"]) == (2, 1)
+
+    # Each source's schedule is updated; a failed crawl keeps its interval
+    runs = {c.args[0]: c for c in record_source_run.call_args_list}
+    assert runs["stream"].args[1] == 2 and runs["stream"].kwargs["adapt"] is True
+    assert runs["broken"].kwargs["adapt"] is False
+
+
+@pytest.mark.asyncio
+async def test_pipeline_crawls_only_requested_sources_without_maintenance():
+    from app.scheduler import jobs
+
+    crawled: list[str] = []
+
+    class _Named(BaseCrawler):
+        def __init__(self, name):
+            self.source_name = name
+
+        async def crawl(self):
+            crawled.append(self.source_name)
+            return []
+
+    with (
+        patch.object(jobs, "_get_active_crawlers", lambda sources=None: [
+            c for c in [_Named("shotgun"), _Named("ogcn")]
+            if sources is None or c.source_name in sources
+        ]),
+        patch.object(jobs, "analyze_feedbacks", AsyncMock()) as analyze,
+        patch.object(jobs, "refresh_learned_preferences", AsyncMock()),
+        patch.object(jobs, "_expire_past_events", AsyncMock(return_value=0)),
+        patch.object(jobs, "_run_maintenance", AsyncMock()) as maintenance,
+        patch.object(jobs.browser_pool, "stop", AsyncMock()),
+        patch.object(jobs.pb_client, "create_record", AsyncMock(return_value={})),
+        patch.object(jobs, "record_source_run", AsyncMock()),
+    ):
+        await jobs.run_crawl_pipeline(sources=["shotgun"], maintenance=False)
+
+    assert crawled == ["shotgun"]
+    analyze.assert_not_called()
+    maintenance.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_pipeline_stops_when_job_is_cancelled():
+    from app.scheduler import jobs
+    from app.services import crawl_progress
+
+    class _Named(BaseCrawler):
+        def __init__(self, name):
+            self.source_name = name
+
+        async def crawl(self):
+            return [CrawledEvent(title=f"{self.source_name} gig")]
+
+    # Cancelled by the time the first source finishes
+    update = AsyncMock(
+        side_effect=[{"cancel_requested": False}] + [{"cancel_requested": True}] * 5
+    )
+    with (
+        patch.object(jobs, "_get_active_crawlers",
+                     return_value=[_Named("shotgun"), _Named("ogcn")]),
+        patch.object(jobs, "_process_event", AsyncMock(return_value=True)),
+        patch.object(jobs, "analyze_feedbacks", AsyncMock()),
+        patch.object(jobs, "refresh_learned_preferences", AsyncMock()),
+        patch.object(jobs, "_expire_past_events", AsyncMock(return_value=0)) as expire,
+        patch.object(jobs, "_run_maintenance", AsyncMock()) as maintenance,
+        patch.object(jobs.browser_pool, "stop", AsyncMock()) as stop,
+        patch.object(jobs.pb_client, "create_record", AsyncMock(return_value={})),
+        patch.object(jobs, "record_source_run", AsyncMock()),
+        patch.object(crawl_progress.pb_client, "update_record", update),
+    ):
+        with pytest.raises(crawl_progress.CrawlCancelled):
+            await jobs.run_crawl_pipeline(job_id="job1")
+
+    expire.assert_not_called()
+    maintenance.assert_not_called()
+    stop.assert_awaited()
+    # The last write carries the counters of the finished source
+    final = update.call_args.args[2]["progress"]
+    assert final["sources"]["shotgun"]["status"] == "done"
+    assert final["sources"]["shotgun"]["found"] == 1
+
+
+@pytest.mark.asyncio
+async def test_maintenance_archives_flight_prices_before_compacting():
+    from app.scheduler import jobs
+
+    calls: list[str] = []
+    export = AsyncMock(side_effect=lambda dataset: calls.append("export") or 3)
+    compact = AsyncMock(side_effect=lambda days: calls.append("compact") or 3)
+    with (
+        patch("app.analytics.archive.export_dataset", export),
+        patch("app.services.flight_deals.compact_flight_prices", compact),
+        patch.object(jobs, "purge_duplicates", AsyncMock(return_value=0)),
+        patch(
+            "app.services.url_checker.purge_dead_urls",
+            AsyncMock(return_value=0),
+        ),
+    ):
+        await jobs._run_maintenance()
+        assert calls == ["export", "compact"]
+        assert export.call_args.args[0].name == "flight_prices"
+
+        # Raw prices are only deleted once they are safely archived
+        calls.clear()
+        export.side_effect = OSError("disk full")
+        await jobs._run_maintenance()
+        assert calls == []
+        compact.assert_awaited_once()
+
+
+# ── Flight date grid ──────────────────────────────────────────────
+
+
+@pytest.mark.asyncio
+async def test_flight_grid_refreshes_only_stale_cells():
+    from app.crawlers import flight_deals
+    from app.services.flight_deals import FlightPrice
+
+    weekends = flight_deals._upcoming_weekends(3)
+    assert [d.weekday() for d, _ in weekends] == [4, 4, 4]
+    assert weekends[1][0] - weekends[0][0] == timedelta(weeks=1)
+
+    # Barcelona's first weekend was searched recently
+    first_dep, first_ret = weekends[0]
+    fresh = {
+        ("NCE-BCN", first_dep.date().isoformat(), first_ret.date().isoformat())
+    }
+    searched: list[tuple[str, datetime]] = []
+
+    async def crawl_route(page, route, departure, return_date):
+        searched.append((route["destination"], departure))
+        cheap = (route["destination"], departure) == ("LIS", weekends[2][0])
+        price = 40.0 if cheap else 100.0
+        return [
+            FlightPrice(
+                route=f"NCE-{route['destination']}",
+                origin="NCE",
+                destination=route["destination"],
+                destination_city=route["city"],
+                departure_date=departure,
+                return_date=return_date,
+                price=price,
+            )
+        ]
+
+    steps: list[str] = []
+
+    @asynccontextmanager
+    async def fake_page(*args, **kwargs):
+        steps.append("lease")
+        yield MagicMock()
+        steps.append("release")
+
+    async def wait(self, url):
+        steps.append("wait")
+
+    async def evaluate(prices):
+        return [(fp.price < 50, 100.0, 100.0 - fp.price) for fp in prices]
+
+    crawler = flight_deals.FlightDealsCrawler()
+    with (
+        patch.object(flight_deals.settings, "flight_grid_weekends", 3),
+        patch.object(
+            flight_deals, "recently_crawled_cells", AsyncMock(return_value=fresh)
+        ),
+        patch.object(flight_deals, "store_flight_prices", AsyncMock()) as store,
+        patch.object(flight_deals, "evaluate_deals", side_effect=evaluate),
+        patch.object(flight_deals.browser_pool, "page", fake_page),
+        patch.object(flight_deals.HostRateLimiter, "wait", wait),
+        patch.object(crawler, "_crawl_route", side_effect=crawl_route),
+    ):
+        events = await crawler.crawl()
+
+    # Searches are paced before a page is leased, not while holding one
+    assert steps == ["wait", "lease", "release"] * len(searched)
+
+    assert len(searched) == len(flight_deals.ROUTES) * 3 - 1
+    # One batched write for the whole run
+    store.assert_awaited_once()
+    assert len(store.await_args.args[0]) == len(searched)
+    assert ("BCN", first_dep) not in searched
+    assert len(events) == 1
+    assert events[0].date_start == weekends[2][0]
+
@@ -109,3 +109,79 @@ def test_featured_events(client, sample_event_record):
         data = resp.json()
         assert len(data) == 1
         assert data[0]["is_featured"] is True
+
+
+def test_list_events_returns_next_cursor(client, sample_event_record):
+    with patch("app.services.event_service.pb_client") as mock_pb:
+        mock_pb.list_records = AsyncMock(
+            return_value={
+                "items": [sample_event_record],
+                "totalItems": 3,
+                "page": 1,
+                "perPage": 1,
+            }
+        )
+        resp = client.get("/api/events?per_page=1")
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data["total"] == 3
+        assert data["next_cursor"]
+        call_kwargs = mock_pb.list_records.call_args.kwargs
+        assert call_kwargs["sort"] == "-interest_score,-id"
+        assert call_kwargs["skip_total"] is False
+
+
+def test_list_events_with_cursor(client, sample_event_record):
+    from app.services.event_service import encode_cursor
+
+    cursor = encode_cursor("-interest_score", sample_event_record)
+    with patch("app.services.event_service.pb_client") as mock_pb:
+        mock_pb.list_records = AsyncMock(
+            return_value={"items": [], "totalItems": -1, "page": 1, "perPage": 50}
+        )
+        resp = client.get(f"/api/events?cursor={cursor}&min_score=50")
+        assert resp.status_code == 200
+        assert resp.json()["next_cursor"] is None
+        call_kwargs = mock_pb.list_records.call_args.kwargs
+        assert call_kwargs["skip_total"] is True
+        assert call_kwargs["page"] == 1
+        assert (
+            '(interest_score < 95 || (interest_score = 95 && id < "evt_001"))'
+            in call_kwargs["filter_str"]
+        )
+        assert "interest_score >= 50" in call_kwargs["filter_str"]
+
+
+def test_list_events_cursor_sort_mismatch(client, sample_event_record):
+    from app.services.event_service import encode_cursor
+
+    cursor = encode_cursor("date_start", sample_event_record)
+    resp = client.get(f"/api/events?cursor={cursor}&sort=-interest_score")
+    assert resp.status_code == 400
+
+
+def test_list_events_invalid_cursor(client):
+    resp = client.get("/api/events?cursor=not-a-cursor")
+    assert resp.status_code == 400
+
+
+def test_fast_json_matches_pydantic_output(sample_event_record):
+    import json
+
+    from app.api.responses import FastJSONResponse
+    from app.services.event_service import _to_event_read
+
+    record = {
+        **sample_event_record,
+        "date_start": "2026-03-01 20:00:00.000Z",
+        "date_end": "",
+        "crawled_at": "",
+        "created": "2026-02-01 07:00:00.000Z",
+        "tags_deals": None,
+    }
+    event = _to_event_read(record)
+    assert event.date_end is None
+    assert event.tags_deals == []
+    assert json.loads(FastJSONResponse([event]).body) == [
+        json.loads(event.model_dump_json())
+    ]
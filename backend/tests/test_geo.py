@@ -0,0 +1,98 @@
+"""Tests for the geohash index and "near me" queries."""
+
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.services import event_service
+from app.services.geo_index import GeoIndex, encode_geohash, haversine_km
+
+# Reference points on the Côte d'Azur
+NICE = (43.7102, 7.2620)
+MONACO = (43.7384, 7.4246)
+CANNES = (43.5528, 7.0174)
+
+
+@pytest.fixture()
+def geo_indexed(sample_event_record):
+    tonight = (datetime.now() + timedelta(hours=1)).isoformat()
+    records = [
+        {**sample_event_record, "id": "nice", "latitude": NICE[0],
+         "longitude": NICE[1], "interest_score": 50, "date_start": tonight},
+        {**sample_event_record, "id": "monaco", "latitude": MONACO[0],
+         "longitude": MONACO[1], "interest_score": 90, "date_start": tonight},
+        {**sample_event_record, "id": "cannes", "latitude": CANNES[0],
+         "longitude": CANNES[1], "interest_score": 70},
+        {**sample_event_record, "id": "nowhere", "latitude": 0, "longitude": 0},
+    ]
+    for r in records:
+        event_service.index_record(r)
+    event_service.search_index.ready = True
+    yield
+    event_service._indexed_records.clear()
+    event_service.search_index.clear()
+    event_service.geo_index.clear()
+
+
+def test_encode_geohash_known_value():
+    # Reference value from the geohash spec examples
+    assert encode_geohash(57.64911, 10.40744, 11) == "u4pruydqqvj"
+
+
+def test_haversine_nice_monaco():
+    assert haversine_km(*NICE, *MONACO) == pytest.approx(13.5, abs=0.5)
+
+
+def test_geo_index_radius_query():
+    idx = GeoIndex()
+    idx.add("nice", *NICE)
+    idx.add("monaco", *MONACO)
+    idx.add("cannes", *CANNES)
+    assert [d for d, _ in idx.query(*NICE, 15)] == ["nice", "monaco"]
+    assert [d for d, _ in idx.query(*NICE, 50)] == ["nice", "monaco", "cannes"]
+
+
+def test_geo_index_remove():
+    idx = GeoIndex()
+    idx.add("nice", *NICE)
+    idx.remove("nice")
+    assert idx.query(*NICE, 10) == []
+    assert len(idx) == 0
+
+
+def test_list_events_near_sorted_by_distance(client, geo_indexed):
+    resp = client.get("/api/events?near=43.7102,7.2620&radius_km=15")
+    assert resp.status_code == 200
+    items = resp.json()["items"]
+    assert [e["id"] for e in items] == ["nice", "monaco"]
+    assert items[0]["distance_km"] == 0
+    assert items[1]["distance_km"] > 10
+
+
+def test_list_events_near_with_explicit_sort(client, geo_indexed):
+    resp = client.get("/api/events?near=43.7102,7.2620&radius_km=50&sort=-interest_score")
+    assert [e["id"] for e in resp.json()["items"]] == ["monaco", "cannes", "nice"]
+
+
+def test_list_events_near_invalid(client):
+    resp = client.get("/api/events?near=nice")
+    assert resp.status_code == 422
+
+
+def test_list_events_near_falls_back_to_bounding_box(client):
+    with patch("app.services.event_service.pb_client") as mock_pb:
+        mock_pb.list_records = AsyncMock(
+            return_value={"items": [], "totalItems": 0, "page": 1, "perPage": 50}
+        )
+        resp = client.get("/api/events?near=43.7102,7.2620&radius_km=5")
+        assert resp.status_code == 200
+        filter_str = mock_pb.list_records.call_args.kwargs["filter_str"]
+        assert "latitude >= 43.66" in filter_str
+
+
+@pytest.mark.asyncio
+async def test_closest_tonight(geo_indexed):
+    events = await event_service.get_closest_tonight(*MONACO, radius_km=30)
+    # Cannes is out of range, "nowhere" has no coordinates
+    assert [e.id for e in events] == ["monaco", "nice"]
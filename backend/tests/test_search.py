@@ -0,0 +1,142 @@
+"""Tests for the in-memory full-text search index."""
+
+import pytest
+
+from app.services import event_service
+from app.services.search_index import SearchIndex, fold, tokenize
+
+
+def _record(id_, title, description="", score=50, **extra):
+    return {
+        "id": id_,
+        "title": title,
+        "description": description,
+        "summary": "",
+        "location_name": "",
+        "interest_score": score,
+        "status": "published",
+        "date_start": "2026-03-01T20:00:00",
+        "crawled_at": "2026-02-01T07:00:00",
+        "hash": id_,
+        **extra,
+    }
+
+
+@pytest.fixture()
+def indexed(sample_event_record):
+    """Populate the shared index with a few events, then reset it."""
+    event_service.unindex_record(sample_event_record["id"])
+    records = [
+        sample_event_record,
+        _record("evt_002", "Soirée jazz au port", "Concert jazz", score=40),
+        _record("evt_003", "Match OGC Nice vs Lyon", "Ligue 1", score=80,
+                location_city="Nice"),
+    ]
+    for r in records:
+        event_service.index_record(r)
+    event_service.search_index.ready = True
+    yield
+    event_service._indexed_records.clear()
+    event_service.search_index.clear()
+    event_service.geo_index.clear()
+
+
+# ── Tokenizer ─────────────────────────────────────────────────────
+
+
+def test_fold_strips_accents():
+    assert fold("Soirée Électro à Nice") == "soiree electro a nice"
+
+
+def test_tokenize_drops_stopwords():
+    assert tokenize("La soirée de l'été") == ["soiree", "ete"]
+
+
+# ── Index ─────────────────────────────────────────────────────────
+
+
+def test_search_accent_insensitive():
+    idx = SearchIndex()
+    idx.add(_record("a", "Soirée électro"))
+    assert [d for d, _ in idx.search("soiree electro")] == ["a"]
+
+
+def test_search_prefix_on_last_token():
+    idx = SearchIndex()
+    idx.add(_record("a", "Concert Peggy Gou"))
+    idx.add(_record("b", "Concours de pétanque"))
+    assert {d for d, _ in idx.search("conc")} == {"a", "b"}
+    assert [d for d, _ in idx.search("peggy g")] == ["a"]
+
+
+def test_search_requires_all_tokens():
+    idx = SearchIndex()
+    idx.add(_record("a", "Jazz au port"))
+    idx.add(_record("b", "Jazz club"))
+    assert [d for d, _ in idx.search("jazz port")] == ["a"]
+
+
+def test_title_match_ranks_above_description():
+    idx = SearchIndex()
+    idx.add(_record("a", "Soirée salsa", "Apéro puis jazz"))
+    idx.add(_record("b", "Jazz à Juan", "Festival"))
+    assert idx.search("jazz")[0][0] == "b"
+
+
+def test_interest_score_breaks_ties():
+    idx = SearchIndex()
+    idx.add(_record("low", "DJ set", score=10))
+    idx.add(_record("high", "DJ set", score=90))
+    assert idx.search("dj")[0][0] == "high"
+
+
+def test_remove_and_reindex():
+    idx = SearchIndex()
+    idx.add(_record("a", "Concert rock"))
+    idx.add(_record("a", "Concert jazz"))
+    assert idx.search("rock") == []
+    idx.remove("a")
+    assert idx.search("concert") == []
+    assert len(idx) == 0
+
+
+# ── API ───────────────────────────────────────────────────────────
+
+
+def test_list_events_search_uses_index(client, indexed):
+    resp = client.get("/api/events?search=soiree")
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["total"] == 2
+    assert {e["id"] for e in data["items"]} == {"evt_001", "evt_002"}
+
+
+def test_list_events_search_with_filters(client, indexed):
+    resp = client.get("/api/events?search=nice&min_score=70&city=nice")
+    data = resp.json()
+    assert {e["id"] for e in data["items"]} == {"evt_001", "evt_003"}
+
+
+def test_list_events_search_sorted_by_text_field(client, indexed):
+    # A record without a location name must not break the comparison
+    event_service.index_record(
+        _record("evt_004", "Soirée salsa", location_name="")
+    )
+    event_service.index_record(
+        _record("evt_005", "Soirée rock", location_name="blue moon")
+    )
+    resp = client.get("/api/events?search=soiree&sort=location_name")
+    assert resp.status_code == 200
+    ids = [e["id"] for e in resp.json()["items"]]
+    assert ids[:2] == ["evt_005", "evt_001"]  # "blue moon" < "High Club"
+    assert set(ids[2:]) == {"evt_002", "evt_004"}  # no location: last
+
+    records = [{"id": "a", "title": "x"}, {"id": "b", "title": ""}]
+    event_service._sort_records(records, "-title", {})
+    assert [r["id"] for r in records] == ["a", "b"]
+
+
+def test_unpublished_events_are_not_indexed(indexed):
+    event_service.index_record(_record("evt_002", "Soirée jazz", status="cancelled"))
+    result = event_service.search_events("jazz")
+    assert result.total == 0
@@ -158,3 +158,464 @@ async def test_detect_deal_above_threshold():
         assert is_deal is True
         assert avg == 100.0
         assert discount == pytest.approx(60.0)
+
+
+@pytest.mark.asyncio
+async def test_detect_deal_reads_history_once_per_route():
+    records = [{"price": 100}] * 10
+    with patch("app.services.flight_deals.pb_client") as mock_pb:
+        mock_pb.list_records = AsyncMock(
+            return_value={"items": records, "totalItems": 10}
+        )
+        from app.services.flight_deals import detect_deal
+
+        for price in (90.0, 60.0, 40.0):
+            await detect_deal(price, "NCE-BCN")
+        assert mock_pb.list_records.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_store_flight_price_updates_route_stats(price_stats_store):
+    from app.services.flight_deals import FlightPrice, store_flight_price
+
+    with patch("app.services.flight_deals.pb_client") as mock_pb:
+        mock_pb.create_record = AsyncMock(return_value={"id": "fp_001"})
+        mock_pb.list_records = AsyncMock(
+            return_value={"items": [{"price": 50}, {"price": 70}], "totalItems": 2}
+        )
+        for price in (70.0, 90.0):
+            await store_flight_price(
+                FlightPrice(
+                    route="NCE-BCN",
+                    origin="NCE",
+                    destination="BCN",
+                    destination_city="Barcelone",
+                    departure_date=datetime(2026, 2, 20),
+                    return_date=datetime(2026, 2, 22),
+                    price=price,
+                )
+            )
+
+    # The first price is already in the history the stats are built from
+    stats = await price_stats_store.get("NCE-BCN")
+    assert stats.count == 3
+    assert stats.mean == pytest.approx(70.0)
+    assert stats.variance == pytest.approx(400.0)
+
+
+def test_route_stats_welford_and_window():
+    import statistics
+    from datetime import date
+
+    from app.services.price_stats import WINDOW_DAYS, RouteStats
+
+    today = date.today()
+    stats = RouteStats(route="NCE-BCN")
+    prices = [120.0, 80.0, 95.5, 60.0, 101.0]
+    for i, price in enumerate(prices):
+        stats.add(price, today - timedelta(days=i))
+    assert stats.mean == pytest.approx(statistics.mean(prices))
+    assert stats.variance == pytest.approx(statistics.variance(prices))
+
+    # Prices older than the window no longer count towards the average
+    stats.add(500.0, today - timedelta(days=WINDOW_DAYS + 1))
+    count, avg = stats.window(today)
+    assert count == len(prices)
+    assert avg == pytest.approx(statistics.mean(prices))
+    assert stats.count == len(prices) + 1
+
+
+@pytest.mark.asyncio
+async def test_price_stats_loaded_from_persisted_record(price_stats_store):
+    from datetime import date
+
+    from app.services import price_stats
+
+    saved = price_stats.RouteStats(route="NCE-LIS")
+    for price in (100.0, 100.0, 100.0):
+        saved.add(price, date.today())
+    record = {**saved.to_record(), "id": "stats_042"}
+    price_stats.pb_client.get_first_record = AsyncMock(return_value=record)
+
+    with patch("app.services.flight_deals.pb_client") as mock_pb:
+        mock_pb.list_records = AsyncMock()
+        from app.services.flight_deals import detect_deal
+
+        is_deal, avg, _ = await detect_deal(50.0, "NCE-LIS", min_history_days=3)
+        mock_pb.list_records.assert_not_called()
+    assert is_deal is True
+    assert avg == 100.0
+    assert (await price_stats_store.get("NCE-LIS")).record_id == "stats_042"
+
+
+# ── NumPy deal engine ─────────────────────────────────────────────
+
+
+def _price_record(route: str, price: float, days_ahead: int, day: int = 1) -> dict:
+    crawled = datetime(2026, 1, day, 7)
+    return {
+        "route": route,
+        "price": price,
+        "departure_date": (crawled + timedelta(days=days_ahead)).strftime(
+            "%Y-%m-%d 00:00:00.000Z"
+        ),
+        "crawled_at": crawled.strftime("%Y-%m-%d %H:%M:%S.000Z"),
+    }
+
+
+def _score(baselines, route, days_ahead, price, min_samples=5):
+    return baselines.score(
+        [route],
+        [days_ahead],
+        [price],
+        zscore_threshold=2.0,
+        percentile_threshold=10.0,
+        min_samples=min_samples,
+    )[0]
+
+
+def test_deal_engine_median_ignores_outlier():
+    from app.services.deal_engine import PriceBaselines
+
+    prices = [100, 104, 96, 102, 98, 101, 99, 2000]
+    baselines = PriceBaselines.from_records(
+        [_price_record("NCE-BCN", p, 3, day=i + 1) for i, p in enumerate(prices)]
+    )
+    score = _score(baselines, "NCE-BCN", 3, 80.0)
+    assert score.baseline == pytest.approx(100.5)
+    assert score.is_deal is True
+    assert score.zscore < -2
+    assert score.percentile_rank == 0.0
+    assert _score(baselines, "NCE-BCN", 3, 99.0).is_deal is False
+
+
+def test_deal_engine_buckets_by_days_to_departure():
+    from app.services.deal_engine import PriceBaselines
+
+    # Last-minute fares are much higher than fares booked weeks ahead
+    records = [_price_record("NCE-LIS", 200 + i, 2, day=i + 1) for i in range(6)]
+    records += [_price_record("NCE-LIS", 80 + i, 45, day=i + 1) for i in range(6)]
+    baselines = PriceBaselines.from_records(records)
+
+    last_minute = _score(baselines, "NCE-LIS", 3, 150.0)
+    assert last_minute.baseline == pytest.approx(202.5)
+    assert last_minute.is_deal is True
+    assert _score(baselines, "NCE-LIS", 40, 150.0).is_deal is False
+
+    # Too few prices in the 14-30 day bucket: route-wide baseline instead
+    assert _score(baselines, "NCE-LIS", 20, 150.0).baseline == pytest.approx(142.5)
+    # Unknown route or not enough history: no verdict
+    assert _score(baselines, "NCE-RAK", 3, 10.0).baseline is None
+    assert _score(baselines, "NCE-LIS", 3, 10.0, min_samples=50).is_deal is False
+    assert _score(PriceBaselines.from_records([]), "NCE-LIS", 3, 10.0).baseline is None
+
+
+@pytest.mark.asyncio
+async def test_evaluate_deals_scores_batch_with_one_history_load():
+    from app.services.flight_deals import FlightPrice, evaluate_deals
+
+    history = [_price_record("NCE-BCN", 100 + i % 5, 10, day=i + 1) for i in range(20)]
+    with (
+        patch("app.services.flight_deals.pb_client") as mock_pb,
+        patch("app.services.flight_deals.settings.flight_deal_engine", "numpy"),
+    ):
+        mock_pb.list_records = AsyncMock(return_value={"items": history})
+        prices = [
+            FlightPrice(
+                route="NCE-BCN",
+                origin="NCE",
+                destination="BCN",
+                destination_city="Barcelone",
+                departure_date=datetime(2026, 3, 11),
+                return_date=datetime(2026, 3, 13),
+                price=price,
+                crawled_at=datetime(2026, 3, 1, 7),
+            )
+            for price in (60.0, 102.0)
+        ]
+        verdicts = await evaluate_deals(prices)
+
+    assert mock_pb.list_records.await_count == 1
+    # Only the scored routes' recent prices are read
+    query = mock_pb.list_records.call_args.kwargs
+    assert query["skip_total"] is True
+    assert query["filter_str"].startswith('(route = "NCE-BCN") && crawled_at >= "')
+    assert [v[0] for v in verdicts] == [True, False]
+    assert verdicts[0][1] == pytest.approx(102.0)
+    assert verdicts[0][2] == pytest.approx((102 - 60) / 102 * 100)
+
+
+# ── Batched writes and compaction ─────────────────────────────────
+
+
+def _pb_with_transport(handler):
+    import httpx
+
+    from app.services.pocketbase import PocketBaseClient
+
+    client = PocketBaseClient()
+    client.token = "token"
+    client._client = httpx.AsyncClient(
+        base_url="http://pb", transport=httpx.MockTransport(handler)
+    )
+    return client
+
+
+@pytest.mark.asyncio
+async def test_pb_batch_chunks_requests():
+    import json
+
+    import httpx
+
+    from app.services import pocketbase
+
+    calls: list[int] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.url.path == "/api/batch"
+        chunk = json.loads(request.content)["requests"]
+        calls.append(len(chunk))
+        return httpx.Response(
+            200, json=[{"status": 200, "body": r["body"]} for r in chunk]
+        )
+
+    client = _pb_with_transport(handler)
+    requests = [
+        {"method": "POST", "url": "/api/collections/flight_prices/records",
+         "body": {"price": i}}
+        for i in range(pocketbase.PB_BATCH_SIZE + 5)
+    ]
+    results = await client.batch(requests)
+    assert calls == [pocketbase.PB_BATCH_SIZE, 5]
+    assert [r["price"] for r in results] == list(range(len(requests)))
+
+
+@pytest.mark.asyncio
+async def test_pb_batch_falls_back_to_single_requests():
+    import httpx
+
+    paths: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        paths.append(f"{request.method} {request.url.path}")
+        if request.url.path == "/api/batch":
+            return httpx.Response(403, json={"message": "Batch not allowed."})
+        if request.method == "DELETE":
+            return httpx.Response(204)
+        return httpx.Response(200, json={"id": "fp_1"})
+
+    client = _pb_with_transport(handler)
+    client._authenticate = AsyncMock()
+    results = await client.batch([
+        {"method": "POST", "url": "/api/collections/flight_prices/records",
+         "body": {"price": 10}},
+        {"method": "DELETE", "url": "/api/collections/flight_prices/records/x"},
+    ])
+    assert results == [{"id": "fp_1"}, {}]
+    # The batch endpoint is retried once after re-auth, then never again
+    await client.batch([{"method": "DELETE",
+                         "url": "/api/collections/flight_prices/records/y"}])
+    assert paths.count("POST /api/batch") == 2
+    assert paths[-1] == "DELETE /api/collections/flight_prices/records/y"
+
+
+@pytest.mark.asyncio
+async def test_compact_flight_prices_rolls_days_into_rows():
+    from app.services.flight_deals import compact_flight_prices
+
+    old = [
+        {"id": rid, "route": route, "price": price, "crawled_at": f"{day} 07:00:00.000Z"}
+        for rid, route, price, day in [
+            ("a", "NCE-BCN", 80, "2025-01-02"),
+            ("b", "NCE-BCN", 120, "2025-01-02"),
+            ("c", "NCE-BCN", 100, "2025-01-02"),
+            ("d", "NCE-LIS", 60, "2025-01-03"),
+        ]
+    ]
+    existing = {"id": "row_lis", "route": "NCE-LIS", "day": "2025-01-03",
+                "count": 1, "min": 70, "median": 70, "max": 70}
+
+    async def list_records(collection, **kwargs):
+        if collection == "flight_prices":
+            return {"items": old}
+        return {"items": [existing]}
+
+    with patch("app.services.flight_deals.pb_client") as mock_pb:
+        mock_pb.list_records = AsyncMock(side_effect=list_records)
+        mock_pb.batch = AsyncMock(return_value=[])
+        removed = await compact_flight_prices(90)
+
+    assert removed == 4
+    writes, deletes = [c.args[0] for c in mock_pb.batch.await_args_list]
+    bcn = next(w for w in writes if w["body"]["route"] == "NCE-BCN")
+    assert bcn["method"] == "POST"
+    assert {k: bcn["body"][k] for k in ("day", "count", "min", "median", "max")} == {
+        "day": "2025-01-02", "count": 3, "min": 80, "median": 100, "max": 120,
+    }
+    lis = next(w for w in writes if w["body"]["route"] == "NCE-LIS")
+    assert lis["method"] == "PATCH" and lis["url"].endswith("/row_lis")
+    assert lis["body"]["count"] == 2
+    assert (lis["body"]["min"], lis["body"]["median"]) == (60, 65)
+    assert sorted(d["url"].rsplit("/", 1)[1] for d in deletes) == ["a", "b", "c", "d"]
+
+
+
+# ── Adaptive source schedules ─────────────────────────────────────
+
+
+def test_adapt_interval_backs_off_and_speeds_up():
+    from app.services.sources import adapt_interval
+
+    assert adapt_interval(24.0, 0) == 36.0
+    assert adapt_interval(24.0, 2) == 24.0
+    assert adapt_interval(24.0, 10) == 12.0
+    # Clamped to the configured bounds
+    assert adapt_interval(160.0, 0) == 168.0
+    assert adapt_interval(1.5, 50) == 1.0
+
+
+def test_is_due_uses_adapted_interval():
+    from app.services.sources import is_due
+
+    now = datetime(2026, 3, 10, 12, 0)
+    source = {
+        "is_active": True,
+        "last_crawl": "2026-03-10 06:00:00.000Z",
+        "crawl_config": {"schedule": {"interval_hours": 3}},
+    }
+    assert is_due(source, 24.0, now)
+    source["crawl_config"]["schedule"]["interval_hours"] = 12
+    assert not is_due(source, 3.0, now)
+    # Never crawled, unknown or disabled sources
+    assert is_due({"is_active": True, "last_crawl": ""}, 24.0, now)
+    assert is_due(None, 24.0, now)
+    assert not is_due({**source, "is_active": False, "last_crawl": ""}, 24.0, now)
+
+
+@pytest.mark.asyncio
+async def test_record_source_run_keeps_other_crawl_state():
+    from app.services import sources
+
+    record = {
+        "id": "src1",
+        "name": "shotgun",
+        "crawl_config": {"watermark": "x", "schedule": {"interval_hours": 4}},
+    }
+    with patch.object(sources, "pb_client") as mock_pb:
+        mock_pb.get_first_record = AsyncMock(return_value=record)
+        mock_pb.update_record = AsyncMock(return_value={})
+        await sources.record_source_run("shotgun", 0, 3.0)
+        data = mock_pb.update_record.call_args.args[2]
+        assert data["crawl_config"]["watermark"] == "x"
+        assert data["crawl_config"]["schedule"]["interval_hours"] == 6.0
+        assert data["last_crawl"]
+
+        await sources.record_source_run("shotgun", 0, 3.0, adapt=False)
+        data = mock_pb.update_record.call_args.args[2]
+        assert data["crawl_config"]["schedule"]["interval_hours"] == 4.0
+
+
+@pytest.mark.asyncio
+async def test_due_sources_selects_elapsed_sources():
+    from app.scheduler import jobs
+
+    now = datetime.now()
+    recent = (now - timedelta(hours=1)).isoformat()
+    known = {
+        # Crawled an hour ago, every 3 hours: not due
+        "shotgun": {"name": "shotgun", "last_crawl": recent},
+        # Crawled an hour ago but adapted down to 30 minutes: due
+        "nice_fr": {
+            "name": "nice_fr",
+            "last_crawl": recent,
+            "crawl_config": {"schedule": {"interval_hours": 0.5}},
+        },
+    }
+    with patch.object(jobs, "list_sources", AsyncMock(return_value=known)):
+        due = await jobs.due_sources(now=now, exclude=["eventbrite"])
+
+    assert "nice_fr" in due
+    assert "shotgun" not in due
+    assert "eventbrite" not in due
+    # Never crawled yet
+    assert "ogcn" in due
+
+
+# ── Crawl job progress ────────────────────────────────────────────
+
+
+@pytest.mark.asyncio
+async def test_job_progress_counts_stages_and_estimates_eta():
+    from app.services import crawl_progress
+    from app.services.crawl_progress import CrawlCancelled, JobProgress
+
+    progress = JobProgress("job1", ["shotgun", "nicefr"])
+    assert progress.eta_seconds() is None
+
+    progress.start_source("shotgun")
+    progress.add("shotgun", "found", 3)
+    progress.add("shotgun", "deduped")
+    progress.add("shotgun", "stored", 2)
+    progress._started -= 10  # shotgun took ten seconds
+    progress.finish_source("shotgun")
+
+    snap = progress.snapshot()
+    assert snap["totals"]["found"] == 3 and snap["totals"]["stored"] == 2
+    assert snap["sources"]["shotgun"]["status"] == "done"
+    assert snap["sources"]["nicefr"]["status"] == "pending"
+    assert (snap["sources_done"], snap["sources_total"]) == (1, 2)
+    assert snap["eta_seconds"] == pytest.approx(10, abs=0.5)
+
+    update = AsyncMock(side_effect=[{"cancel_requested": False},
+                                    {"cancel_requested": True}])
+    with patch.object(crawl_progress.pb_client, "update_record", update):
+        await progress.checkpoint(force=True)
+        await progress.checkpoint()  # throttled: no write, no cancel
+        assert update.await_count == 1
+        with pytest.raises(CrawlCancelled):
+            await progress.checkpoint(force=True)
+    written = update.call_args.args[2]
+    assert written["progress"]["totals"]["found"] == 3
+    assert "updated_at" in written
+
+
+@pytest.mark.asyncio
+async def test_job_progress_without_job_only_counts():
+    from app.services import crawl_progress
+    from app.services.crawl_progress import JobProgress
+
+    progress = JobProgress(None, ["shotgun"])
+    with patch.object(crawl_progress.pb_client, "update_record", AsyncMock()) as update:
+        await progress.checkpoint(force=True)
+    update.assert_not_called()
+
+
+# ── Unlisted events ───────────────────────────────────────────────
+
+
+@pytest.mark.asyncio
+async def test_expire_unlisted_events():
+    from app.services.url_checker import expire_unlisted_events
+
+    stored = [
+        {"id": "e1", "source_url": "https://www.nice.fr/evenement/1"},
+        {"id": "e2", "source_url": "https://www.nice.fr/evenement/2"},
+    ]
+    with patch("app.services.pocketbase.pb_client") as mock_pb:
+        mock_pb.list_records = AsyncMock(return_value={"items": stored})
+        mock_pb.update_record = AsyncMock()
+        expired = await expire_unlisted_events(
+            "nice_fr", {"https://www.nice.fr/evenement/1"}
+        )
+        assert expired == 1
+        mock_pb.update_record.assert_awaited_once_with(
+            "events", "e2", {"status": "expired"}
+        )
+        assert 'source_name = "nice_fr"' in mock_pb.list_records.call_args.kwargs[
+            "filter_str"
+        ]
+
+        # An empty listing never expires the whole source
+        mock_pb.update_record.reset_mock()
+        assert await expire_unlisted_events("nice_fr", set()) == 0
+        mock_pb.update_record.assert_not_called()
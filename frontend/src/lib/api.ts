@@ -67,6 +67,10 @@ export async function getEvents(
   if (params?.min_score)
     searchParams.set("min_score", String(params.min_score));
   if (params?.search) searchParams.set("search", params.search);
+  if (params?.near) searchParams.set("near", params.near);
+  if (params?.radius_km)
+    searchParams.set("radius_km", String(params.radius_km));
+  if (params?.cursor) searchParams.set("cursor", params.cursor);
 
   const qs = searchParams.toString();
   return fetchAPI<EventListResponse>(`/api/events${qs ? `?${qs}` : ""}`);
@@ -33,13 +33,15 @@ export interface Event {
   status: EventStatus;
   crawled_at: string;
   hash: string;
+  distance_km?: number | null;
 }
 
 export interface EventListResponse {
   items: Event[];
-  total: number;
+  total: number; // -1 on cursor follow-up pages
   page: number;
   per_page: number;
+  next_cursor: string | null;
 }
 
 export interface DashboardDigest {
@@ -81,6 +83,30 @@ export interface CrawlStatusResponse {
   is_running: boolean;
   last_run: string | null;
   last_status: string | null;
+  job_id: string | null;
+  job_status: string | null;
+}
+
+export interface CrawlJobProgress {
+  sources: Record<string, Record<string, number | string>>;
+  totals: Record<string, number>;
+  sources_done: number;
+  sources_total: number;
+  elapsed_seconds: number;
+  eta_seconds: number | null;
+}
+
+export interface CrawlJob {
+  id: string;
+  trigger: string;
+  status: string;
+  sources: string[] | null;
+  created_at: string;
+  started_at: string | null;
+  finished_at: string | null;
+  error_message: string;
+  cancel_requested: boolean;
+  progress: CrawlJobProgress | null;
 }
 
 export type FeedbackRating = "excellent" | "ok" | "bad" | "block_type";
@@ -96,6 +122,9 @@ export interface EventFilters {
   tag_vibe?: string;
   min_score?: number;
   search?: string;
+  near?: string;
+  radius_km?: number;
+  cursor?: string;
   page?: number;
   per_page?: number;
   sort?: string;
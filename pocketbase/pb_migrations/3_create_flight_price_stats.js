@@ -0,0 +1,34 @@
+/// <reference path="../pb_data/types.d.ts" />
+migrate((app) => {
+  // ─────────────────────────────────────────────
+  // Collection: flight_price_stats
+  // Rolling per-route aggregates of flight_prices
+  // ─────────────────────────────────────────────
+  const flightPriceStats = new Collection({
+    name: "flight_price_stats",
+    type: "base",
+    listRule: "",
+    viewRule: "",
+    createRule: null,
+    updateRule: null,
+    deleteRule: null,
+    fields: [
+      { name: "route", type: "text", required: true },
+      { name: "count", type: "number", min: 0 },
+      { name: "mean", type: "number" },
+      { name: "m2", type: "number" },
+      { name: "buckets", type: "json" },
+      { name: "updated_at", type: "date" },
+    ],
+    indexes: [
+      "CREATE UNIQUE INDEX idx_flight_price_stats_route ON flight_price_stats (route)",
+    ],
+  })
+
+  app.save(flightPriceStats)
+}, (app) => {
+  // ─────────────────────────────────────────────
+  // Revert: delete flight_price_stats collection
+  // ─────────────────────────────────────────────
+  app.delete(app.findCollectionByNameOrId("flight_price_stats"))
+})
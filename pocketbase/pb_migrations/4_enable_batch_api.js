@@ -0,0 +1,18 @@
+/// <reference path="../pb_data/types.d.ts" />
+migrate((app) => {
+  // ─────────────────────────────────────────────
+  // Settings: enable the /api/batch endpoint
+  // (used for batched flight_prices writes)
+  // ─────────────────────────────────────────────
+  const settings = app.settings()
+  settings.batch.enabled = true
+  settings.batch.maxRequests = 50
+  app.save(settings)
+}, (app) => {
+  // ─────────────────────────────────────────────
+  // Revert: disable the batch API
+  // ─────────────────────────────────────────────
+  const settings = app.settings()
+  settings.batch.enabled = false
+  app.save(settings)
+})
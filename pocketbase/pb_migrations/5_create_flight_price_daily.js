@@ -0,0 +1,38 @@
+/// <reference path="../pb_data/types.d.ts" />
+migrate((app) => {
+  // ─────────────────────────────────────────────
+  // Collection: flight_price_daily
+  // Compacted flight_prices: one row per route and crawl day
+  // ─────────────────────────────────────────────
+  const flightPriceDaily = new Collection({
+    name: "flight_price_daily",
+    type: "base",
+    listRule: "",
+    viewRule: "",
+    createRule: null,
+    updateRule: null,
+    deleteRule: null,
+    fields: [
+      { name: "route", type: "text", required: true },
+      { name: "origin", type: "text" },
+      { name: "destination", type: "text" },
+      { name: "destination_city", type: "text" },
+      { name: "day", type: "text", required: true },
+      { name: "count", type: "number", min: 0 },
+      { name: "min", type: "number", min: 0 },
+      { name: "median", type: "number", min: 0 },
+      { name: "max", type: "number", min: 0 },
+      { name: "currency", type: "text" },
+    ],
+    indexes: [
+      "CREATE UNIQUE INDEX idx_flight_price_daily_route_day ON flight_price_daily (route, day)",
+    ],
+  })
+
+  app.save(flightPriceDaily)
+}, (app) => {
+  // ─────────────────────────────────────────────
+  // Revert: delete flight_price_daily collection
+  // ─────────────────────────────────────────────
+  app.delete(app.findCollectionByNameOrId("flight_price_daily"))
+})
@@ -0,0 +1,40 @@
+/// <reference path="../pb_data/types.d.ts" />
+migrate((app) => {
+  // ─────────────────────────────────────────────
+  // Collection: crawl_jobs
+  // Crawl queue: enqueued by the API, run by the worker
+  // ─────────────────────────────────────────────
+  const crawlJobs = new Collection({
+    name: "crawl_jobs",
+    type: "base",
+    listRule: "",
+    viewRule: "",
+    createRule: null,
+    updateRule: null,
+    deleteRule: null,
+    fields: [
+      { name: "trigger", type: "select", values: ["api", "schedule"] },
+      {
+        name: "status",
+        type: "select",
+        required: true,
+        values: ["queued", "running", "success", "error", "cancelled"],
+      },
+      { name: "created_at", type: "date", required: true },
+      { name: "started_at", type: "date" },
+      { name: "finished_at", type: "date" },
+      { name: "worker", type: "text" },
+      { name: "error_message", type: "text" },
+    ],
+    indexes: [
+      "CREATE INDEX idx_crawl_jobs_status ON crawl_jobs (status, created_at)",
+    ],
+  })
+
+  app.save(crawlJobs)
+}, (app) => {
+  // ─────────────────────────────────────────────
+  // Revert: delete crawl_jobs collection
+  // ─────────────────────────────────────────────
+  app.delete(app.findCollectionByNameOrId("crawl_jobs"))
+})
@@ -0,0 +1,23 @@
+/// <reference path="../pb_data/types.d.ts" />
+migrate((app) => {
+  // ─────────────────────────────────────────────
+  // crawl_jobs: sources to crawl (null = all) and
+  // whether to run the post-crawl maintenance
+  // ─────────────────────────────────────────────
+  const collection = app.findCollectionByNameOrId("crawl_jobs")
+
+  collection.fields.add(new Field({ name: "sources", type: "json" }))
+  collection.fields.add(new Field({ name: "maintenance", type: "bool" }))
+
+  app.save(collection)
+}, (app) => {
+  // ─────────────────────────────────────────────
+  // Revert: drop the crawl_jobs scope fields
+  // ─────────────────────────────────────────────
+  const collection = app.findCollectionByNameOrId("crawl_jobs")
+
+  collection.fields.removeByName("sources")
+  collection.fields.removeByName("maintenance")
+
+  app.save(collection)
+})
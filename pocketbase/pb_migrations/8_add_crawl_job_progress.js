@@ -0,0 +1,25 @@
+/// <reference path="../pb_data/types.d.ts" />
+migrate((app) => {
+  // ─────────────────────────────────────────────
+  // crawl_jobs: live progress counters written by
+  // the worker, and the operator's cancel flag
+  // ─────────────────────────────────────────────
+  const collection = app.findCollectionByNameOrId("crawl_jobs")
+
+  collection.fields.add(new Field({ name: "progress", type: "json" }))
+  collection.fields.add(new Field({ name: "cancel_requested", type: "bool" }))
+  collection.fields.add(new Field({ name: "updated_at", type: "date" }))
+
+  app.save(collection)
+}, (app) => {
+  // ─────────────────────────────────────────────
+  // Revert: drop the progress fields
+  // ─────────────────────────────────────────────
+  const collection = app.findCollectionByNameOrId("crawl_jobs")
+
+  collection.fields.removeByName("progress")
+  collection.fields.removeByName("cancel_requested")
+  collection.fields.removeByName("updated_at")
+
+  app.save(collection)
+})